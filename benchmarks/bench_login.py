@@ -0,0 +1,133 @@
+"""Login throughput under a login storm, alongside ordinary API traffic.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 32 --background 8
+
+Reports p50/p99 latency for logins and for concurrent calendar reads, plus
+the number of logins shed with 503. Compare runs with different
+--hash-workers values to see the effect of the bounded hashing pool.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from flask_app import create_app, db, bcrypt
+from flask_app.models import User, CalendarEvent
+from datetime import datetime
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_app(db_path, args):
+    app = create_app(test_config={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'TESTING': True,
+        'JWT_SECRET_KEY': 'bench-secret-key-of-at-least-32-bytes',
+        'BCRYPT_LOG_ROUNDS': args.rounds,
+        'LOGIN_HASH_WORKERS': args.hash_workers,
+        'LOGIN_HASH_QUEUE_SIZE': args.hash_queue,
+    })
+    with app.app_context():
+        db.create_all()
+        password_hash = bcrypt.generate_password_hash('bench-pass').decode('utf-8')
+        db.session.add_all([
+            User(username=f'bench{i}', password_hash=password_hash, role='student')
+            for i in range(args.concurrency)
+        ])
+        db.session.add(User(username='reader', password_hash=password_hash, role='student'))
+        db.session.add_all([
+            CalendarEvent(title=f'Event {i}', start_date=datetime(2026, 1, 1), type='event')
+            for i in range(50)
+        ])
+        db.session.commit()
+    return app
+
+
+def run(args):
+    fd, db_path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        app = build_app(db_path, args)
+        reader_token = app.test_client().post('/api/auth/login', json={
+            'username': 'reader', 'password': 'bench-pass',
+        }).get_json()['access_token']
+
+        login_latencies, read_latencies = [], []
+        shed = [0]
+        lock = threading.Lock()
+        remaining = [args.logins]
+        done = threading.Event()
+
+        def login_worker(i):
+            client = app.test_client()
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                start = time.perf_counter()
+                resp = client.post('/api/auth/login', json={'username': f'bench{i}', 'password': 'bench-pass'})
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if resp.status_code == 503:
+                        shed[0] += 1
+                    else:
+                        login_latencies.append(elapsed)
+
+        def read_worker():
+            client = app.test_client()
+            headers = {'Authorization': f'Bearer {reader_token}'}
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get('/api/calendar', headers=headers)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    read_latencies.append(elapsed)
+
+        readers = [threading.Thread(target=read_worker) for _ in range(args.background)]
+        logins = [threading.Thread(target=login_worker, args=(i,)) for i in range(args.concurrency)]
+        started = time.perf_counter()
+        for t in readers + logins:
+            t.start()
+        for t in logins:
+            t.join()
+        wall = time.perf_counter() - started
+        done.set()
+        for t in readers:
+            t.join()
+
+        print(f'hash workers={args.hash_workers} queue={args.hash_queue} rounds={args.rounds} '
+              f'concurrency={args.concurrency} background={args.background}')
+        print(f'logins: {len(login_latencies)} ok, {shed[0]} shed (503), '
+              f'{len(login_latencies) / wall:.1f}/s over {wall:.2f}s')
+        for name, samples in [('login', login_latencies), ('calendar', read_latencies)]:
+            print(f'{name:>9}: n={len(samples):<6} p50={percentile(samples, 50) * 1000:8.1f}ms '
+                  f'p99={percentile(samples, 99) * 1000:8.1f}ms '
+                  f'mean={(statistics.fmean(samples) if samples else 0) * 1000:8.1f}ms')
+    finally:
+        os.unlink(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--background', type=int, default=8, help='threads issuing calendar reads')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost of the seeded hashes')
+    parser.add_argument('--hash-workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--hash-queue', type=int, default=64)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Token refresh throughput for a single worker.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_refresh --refreshes 2000 --users 200
+
+Each refresh presents the refresh token returned by the previous one, as the
+client does. Two modes are compared: the user cache disabled (every
+refresh reads the users table) and the default user cache. Reports refreshes/s, p50/p99 latency and the
+number of SQL statements issued per refresh.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from flask_app import create_app, db, bcrypt, user_cache
+from flask_app.models import User
+from benchmarks.bench_login import percentile
+
+MODES = [
+    ('database', {'USER_CACHE_SIZE': 0}),
+    ('user cache', {}),
+]
+
+
+def build_app(db_path, args, extra_config):
+    app = create_app(test_config={
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'TESTING': True,
+        'JWT_SECRET_KEY': 'bench-secret-key-of-at-least-32-bytes',
+        'BCRYPT_LOG_ROUNDS': 4,
+        **extra_config,
+    })
+    with app.app_context():
+        db.create_all()
+        password_hash = bcrypt.generate_password_hash('bench-pass').decode('utf-8')
+        db.session.add_all([
+            User(username=f'bench{i}', password_hash=password_hash, role='student')
+            for i in range(args.users)
+        ])
+        db.session.commit()
+    return app
+
+
+def run_mode(name, extra_config, args):
+    fd, db_path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        app = build_app(db_path, args, extra_config)
+        client = app.test_client()
+        tokens = [
+            client.post('/api/auth/login', json={'username': f'bench{i}', 'password': 'bench-pass'})
+            .get_json()['refresh_token']
+            for i in range(args.users)
+        ]
+        user_cache.clear()
+
+        statements = [0]
+        with app.app_context():
+            engine = db.engine
+
+        def count(*_):
+            statements[0] += 1
+        event.listen(engine, 'before_cursor_execute', count)
+
+        latencies = []
+        started = time.perf_counter()
+        for n in range(args.refreshes):
+            i = n % args.users
+            start = time.perf_counter()
+            resp = client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {tokens[i]}'})
+            latencies.append(time.perf_counter() - start)
+            tokens[i] = resp.get_json()['refresh_token']
+        wall = time.perf_counter() - started
+        event.remove(engine, 'before_cursor_execute', count)
+
+        print(f'{name:>10}: {args.refreshes / wall:8.0f}/s '
+              f'p50={percentile(latencies, 50) * 1000:6.2f}ms '
+              f'p99={percentile(latencies, 99) * 1000:6.2f}ms '
+              f'queries/refresh={statements[0] / args.refreshes:.2f}')
+    finally:
+        os.unlink(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--refreshes', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+    for name, extra_config in MODES:
+        run_mode(name, extra_config, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""List serialization cost: ORM objects and to_dict() against column projection.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization --rows 10000 100000
+
+For each row count, document requests (half of them paid) and petitions are
+seeded into a temporary SQLite database. Each path is timed from query to
+JSON body. The ORM path loads model instances (with payments joined, as
+the old list handler did) and calls to_dict(). The projection path selects
+the columns as tuples and serializes them through flask_app.projection.
+Reports the best of --repeat runs and the speedup. A sparse fieldset row
+(the admin table view: id, status and timestamps, plus type for document
+requests) is compared against the full projection by time and body size.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import joinedload
+
+from flask_app import create_app, db
+from flask_app.models import DocumentRequest, GradeChangePetition, Payment
+from flask_app.projection import DOCUMENT_REQUEST, PETITION, serialize_document_requests, with_first_payment
+
+
+def seed(rows):
+    start = datetime(2025, 1, 1)
+    db.session.execute(DocumentRequest.__table__.insert(), [
+        {'user_id': f'user-{i % 500}', 'type': 'transcript', 'urgency': 'normal', 'status': 'completed',
+         'copies': 1, 'amount': 500, 'details': {'purpose': 'Graduate school application', 'address': 'Lahore'},
+         'created_at': start + timedelta(minutes=i), 'updated_at': start + timedelta(minutes=i)}
+        for i in range(rows)
+    ])
+    db.session.execute(Payment.__table__.insert(), [
+        {'request_id': i, 'amount': 500, 'status': 'paid', 'transaction_id': f'T{i:07d}',
+         'method': 'online', 'created_at': start + timedelta(minutes=i)}
+        for i in range(1, rows + 1, 2)
+    ])
+    db.session.execute(GradeChangePetition.__table__.insert(), [
+        {'instructor_id': f'user-{i % 50}', 'student_id': f'STU-{i:06d}', 'course_code': 'CS100',
+         'current_grade': 'B', 'new_grade': 'A', 'justification': 'Marks were mis-entered for the final exam. ' * 8,
+         'status': 'approved', 'created_at': start + timedelta(minutes=i), 'updated_at': start + timedelta(minutes=i)}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def orm_document_requests():
+    result = []
+    for req in DocumentRequest.query.options(joinedload(DocumentRequest.payments)) \
+            .order_by(DocumentRequest.created_at.desc()).all():
+        req_dict = req.to_dict()
+        if req.payments:
+            req_dict['payment'] = req.payments[0].to_dict()
+        result.append(req_dict)
+    return result
+
+
+def projected_document_requests():
+    query = with_first_payment(DOCUMENT_REQUEST.query(DocumentRequest.query))
+    return serialize_document_requests(query.order_by(DocumentRequest.created_at.desc()).all())
+
+
+def orm_petitions():
+    return [p.to_dict() for p in GradeChangePetition.query.order_by(GradeChangePetition.created_at.desc()).all()]
+
+
+def projected_petitions():
+    return PETITION.serialize(PETITION.query(GradeChangePetition.query)
+                              .order_by(GradeChangePetition.created_at.desc()).all())
+
+
+SPARSE_FIELDS = ['id', 'status', 'createdAt', 'updatedAt']
+
+
+def sparse_document_requests():
+    projection = DOCUMENT_REQUEST.only(SPARSE_FIELDS + ['type'])
+    return projection.serialize(projection.query(DocumentRequest.query)
+                                .order_by(DocumentRequest.created_at.desc()).all())
+
+
+def sparse_petitions():
+    projection = PETITION.only(SPARSE_FIELDS)
+    return projection.serialize(projection.query(GradeChangePetition.query)
+                                .order_by(GradeChangePetition.created_at.desc()).all())
+
+
+CASES = [
+    ('document requests', orm_document_requests, projected_document_requests, sparse_document_requests),
+    ('petitions', orm_petitions, projected_petitions, sparse_petitions),
+]
+
+
+def best_time(app, build, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        body = app.json.dumps(build())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def run(rows, args):
+    fd, db_path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        app = create_app(test_config={
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+            'TESTING': True,
+            'JWT_SECRET_KEY': 'bench-secret-key-of-at-least-32-bytes',
+        })
+        with app.app_context():
+            db.create_all()
+            seed(rows)
+            for name, orm, projected, sparse in CASES:
+                orm_time, orm_body = best_time(app, orm, args.repeat)
+                projected_time, projected_body = best_time(app, projected, args.repeat)
+                sparse_time, sparse_body = best_time(app, sparse, args.repeat)
+                assert orm_body == projected_body, f'{name}: projection output differs from to_dict()'
+                print(f'{rows:>7} {name:>17}: orm={orm_time * 1000:8.1f}ms '
+                      f'projection={projected_time * 1000:8.1f}ms '
+                      f'speedup={orm_time / projected_time:4.1f}x')
+                print(f'{rows:>7} {name + " fields":>17}: {sparse_time * 1000:8.1f}ms '
+                      f'{len(sparse_body) / 1e6:6.2f}MB vs {len(projected_body) / 1e6:6.2f}MB '
+                      f'({projected_time / sparse_time:4.1f}x faster, '
+                      f'{len(projected_body) / len(sparse_body):4.1f}x smaller)')
+            db.session.remove()
+    finally:
+        os.unlink(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    for rows in args.rows:
+        run(rows, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import { Link, useLocation } from "wouter";
 import { useAuth } from "@/hooks/use-auth";
+import { useServerEvents } from "@/hooks/use-server-events";
 import { 
   LayoutDashboard, 
   FileText, 
@@ -16,6 +17,7 @@ import { cn } from "@/lib/utils";
 
 export default function LayoutShell({ children }: { children: React.ReactNode }) {
   const { user, logout } = useAuth();
+  useServerEvents(!!user);
   const [location] = useLocation();
   const [sidebarOpen, setSidebarOpen] = useState(false);
 
@@ -1,6 +1,6 @@
 import { useEffect, useRef } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { apiRequest, setAccessToken, getAccessToken } from "@/lib/queryClient";
+import { apiRequest, setAccessToken, getAccessToken, setRefreshToken, getRefreshToken } from "@/lib/queryClient";
 
 type AuthUser = {
   id: string;
@@ -17,11 +17,32 @@ type AuthUser = {
   updatedAt: string | null;
 };
 
-const TOKEN_REFRESH_INTERVAL = 20 * 60 * 1000;
+const TOKEN_REFRESH_INTERVAL = 10 * 60 * 1000;
 
-async function refreshToken(): Promise<boolean> {
-  const token = getAccessToken();
+let refreshInFlight: Promise<boolean> | null = null;
+
+// Refresh tokens are single-use and shared by every tab through
+// localStorage. Callers in this tab share one request, and tabs take turns
+// under a Web Lock; a tab that finds the token already rotated by another
+// tab uses the new one instead of replaying its stale copy.
+function refreshToken(): Promise<boolean> {
+  if (!refreshInFlight) {
+    const seen = getRefreshToken();
+    refreshInFlight = withRefreshLock(() => rotateRefreshToken(seen)).finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+}
+
+function withRefreshLock(rotate: () => Promise<boolean>): Promise<boolean> {
+  return navigator.locks ? navigator.locks.request("auth-refresh", rotate) : rotate();
+}
+
+async function rotateRefreshToken(seen: string | null): Promise<boolean> {
+  const token = getRefreshToken();
   if (!token) return false;
+  if (token !== seen) return true;
 
   try {
     const response = await fetch("/api/auth/refresh", {
@@ -31,10 +52,12 @@ async function refreshToken(): Promise<boolean> {
       },
     });
 
-    if (!response.ok) return false;
+    // Without Web Locks another tab may have rotated the token meanwhile.
+    if (!response.ok) return getRefreshToken() !== token;
 
     const data = await response.json();
     setAccessToken(data.access_token);
+    setRefreshToken(data.refresh_token);
     return true;
   } catch {
     return false;
@@ -54,6 +77,7 @@ async function fetchUser(): Promise<AuthUser | null> {
   });
 
   if (response.status === 401) {
+    const stale = getRefreshToken();
     const refreshed = await refreshToken();
     if (refreshed) {
       const retryResponse = await fetch("/api/auth/user", {
@@ -65,7 +89,12 @@ async function fetchUser(): Promise<AuthUser | null> {
         return retryResponse.json();
       }
     }
-    setAccessToken(null);
+    // Only sign out if no other tab has signed in or rotated the tokens
+    // since; clearing them would sign that tab out too.
+    if (getRefreshToken() === stale) {
+      setAccessToken(null);
+      setRefreshToken(null);
+    }
     return null;
   }
 
@@ -112,6 +141,7 @@ export function useAuth() {
       const res = await apiRequest("POST", "/api/auth/login", credentials);
       const data = await res.json();
       setAccessToken(data.access_token);
+      setRefreshToken(data.refresh_token);
       return data.user;
     },
     onSuccess: (userData) => {
@@ -123,6 +153,7 @@ export function useAuth() {
     mutationFn: async () => {
       await apiRequest("POST", "/api/auth/logout");
       setAccessToken(null);
+      setRefreshToken(null);
     },
     onSuccess: () => {
       queryClient.setQueryData(["/api/auth/user"], null);
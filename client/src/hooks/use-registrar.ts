@@ -18,14 +18,53 @@ function authFetch(url: string) {
   return fetch(url, { headers });
 }
 
+type ListRow = { id: number; createdAt: string | null; updatedAt: string | null };
+
+type ChangeFeed<T> = { items: T[]; deleted: number[]; watermark: string; hasMore: boolean };
+
+const feedWatermarks = new Map<string, string>();
+
+// The first load fetches the whole list. Later refetches ask only for rows
+// changed since the last watermark (or, right after a full load, the newest
+// updatedAt in the cache) and merge them in. The server holds the watermark
+// back a few seconds, so recent rows can arrive again; merging by id keeps
+// the list correct.
+async function fetchListChanges<T extends ListRow>(path: string, cached: T[] | undefined, error: string): Promise<T[]> {
+  const since = cached && (feedWatermarks.get(path) ?? cached.reduce<string | null>(
+    (latest, row) => (row.updatedAt && (!latest || row.updatedAt > latest) ? row.updatedAt : latest),
+    null,
+  ));
+  if (!cached || !since) {
+    feedWatermarks.delete(path);
+    const res = await authFetch(path);
+    if (!res.ok) throw new Error(error);
+    return res.json();
+  }
+
+  const rows = new Map(cached.map((row) => [row.id, row]));
+  let watermark = since;
+  let hasMore = true;
+  while (hasMore) {
+    const res = await authFetch(`${path}?since=${encodeURIComponent(watermark)}&limit=500`);
+    if (!res.ok) throw new Error(error);
+    const feed: ChangeFeed<T> = await res.json();
+    feed.items.forEach((row) => rows.set(row.id, row));
+    feed.deleted.forEach((id) => rows.delete(id));
+    ({ watermark, hasMore } = feed);
+  }
+  feedWatermarks.set(path, watermark);
+  return Array.from(rows.values()).sort((a, b) => (b.createdAt ?? "").localeCompare(a.createdAt ?? ""));
+}
+
 export function useDocumentRequests() {
+  const queryClient = useQueryClient();
   return useQuery({
     queryKey: [api.documentRequests.list.path],
-    queryFn: async () => {
-      const res = await authFetch(api.documentRequests.list.path);
-      if (!res.ok) throw new Error("Failed to fetch requests");
-      return res.json();
-    },
+    queryFn: () => fetchListChanges(
+      api.documentRequests.list.path,
+      queryClient.getQueryData<ListRow[]>([api.documentRequests.list.path]),
+      "Failed to fetch requests",
+    ),
   });
 }
 
@@ -39,6 +78,7 @@ export function useCreateDocumentRequest() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.documentRequests.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Request Submitted", description: "Your document request has been received." });
     },
     onError: (err) => {
@@ -57,6 +97,7 @@ export function useProcessPayment() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.documentRequests.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Payment Successful", description: "Thank you for your payment." });
     },
     onError: (err) => {
@@ -76,19 +117,21 @@ export function useUpdateDocumentRequestStatus() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.documentRequests.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Status Updated", description: "Request status has been changed." });
     },
   });
 }
 
 export function usePetitions() {
+  const queryClient = useQueryClient();
   return useQuery({
     queryKey: [api.petitions.list.path],
-    queryFn: async () => {
-      const res = await authFetch(api.petitions.list.path);
-      if (!res.ok) throw new Error("Failed to fetch petitions");
-      return res.json();
-    },
+    queryFn: () => fetchListChanges(
+      api.petitions.list.path,
+      queryClient.getQueryData<ListRow[]>([api.petitions.list.path]),
+      "Failed to fetch petitions",
+    ),
   });
 }
 
@@ -102,6 +145,7 @@ export function useCreatePetition() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.petitions.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Petition Submitted", description: "Your grade change petition has been submitted for review." });
     },
     onError: (error: Error) => {
@@ -126,19 +170,21 @@ export function useUpdatePetitionStatus() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.petitions.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Status Updated", description: "Petition status has been changed." });
     },
   });
 }
 
 export function useMajorApplications() {
+  const queryClient = useQueryClient();
   return useQuery({
     queryKey: [api.majorApplications.list.path],
-    queryFn: async () => {
-      const res = await authFetch(api.majorApplications.list.path);
-      if (!res.ok) throw new Error("Failed to fetch applications");
-      return res.json();
-    },
+    queryFn: () => fetchListChanges(
+      api.majorApplications.list.path,
+      queryClient.getQueryData<ListRow[]>([api.majorApplications.list.path]),
+      "Failed to fetch applications",
+    ),
   });
 }
 
@@ -152,6 +198,7 @@ export function useCreateMajorApplication() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.majorApplications.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Application Submitted", description: "Your major declaration request is under review." });
     },
   });
@@ -168,16 +215,56 @@ export function useUpdateMajorApplicationStatus() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: [api.majorApplications.list.path] });
+      queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
       toast({ title: "Status Updated", description: "Application status has been changed." });
     },
   });
 }
 
-export function useCalendarEvents() {
+export function useDashboardSummary(recent = 4) {
   return useQuery({
-    queryKey: [api.calendar.list.path],
+    queryKey: [api.dashboard.summary.path, recent],
     queryFn: async () => {
-      const res = await authFetch(api.calendar.list.path);
+      const res = await authFetch(`${api.dashboard.summary.path}?recent=${recent}`);
+      if (!res.ok) throw new Error("Failed to fetch dashboard summary");
+      return res.json();
+    },
+  });
+}
+
+export function useUnreadNotificationCount() {
+  return useQuery({
+    queryKey: [api.notifications.unreadCount.path],
+    queryFn: async () => {
+      const res = await authFetch(api.notifications.unreadCount.path);
+      if (!res.ok) throw new Error("Failed to fetch unread notifications");
+      return res.json() as Promise<{ count: number }>;
+    },
+  });
+}
+
+export function useMarkNotificationsRead() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: async (data: { ids?: number[]; before?: string }) => {
+      const res = await apiRequest("PATCH", api.notifications.markRead.path, data);
+      return res.json();
+    },
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: [api.notifications.unreadCount.path] });
+      queryClient.invalidateQueries({ queryKey: [api.notifications.list.path] });
+    },
+  });
+}
+
+export function useCalendarEvents(range?: { from: string; to: string }) {
+  return useQuery({
+    queryKey: range ? [api.calendar.list.path, range.from, range.to] : [api.calendar.list.path],
+    queryFn: async () => {
+      const url = range
+        ? `${api.calendar.list.path}?from=${encodeURIComponent(range.from)}&to=${encodeURIComponent(range.to)}`
+        : api.calendar.list.path;
+      const res = await authFetch(url);
       if (!res.ok) throw new Error("Failed to fetch calendar");
       return res.json();
     },
@@ -192,9 +279,17 @@ export function useCreateCalendarEvent() {
       const res = await apiRequest("POST", api.calendar.create.path, data);
       return res.json();
     },
-    onSuccess: () => {
+    onSuccess: (event: { conflicts?: { title: string }[] }) => {
       queryClient.invalidateQueries({ queryKey: [api.calendar.list.path] });
-      toast({ title: "Event Created", description: "Calendar event has been added." });
+      if (event.conflicts?.length) {
+        toast({
+          title: "Event Created With Conflicts",
+          description: `Overlaps ${event.conflicts.map((c) => c.title).join(", ")}.`,
+          variant: "destructive",
+        });
+      } else {
+        toast({ title: "Event Created", description: "Calendar event has been added." });
+      }
     },
   });
 }
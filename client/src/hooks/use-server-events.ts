@@ -0,0 +1,71 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { api } from "@shared/routes";
+import { apiRequest, getAccessToken } from "@/lib/queryClient";
+
+const RECONNECT_DELAY = 5000;
+
+const STATUS_QUERIES: Record<string, string> = {
+  document_requests: api.documentRequests.list.path,
+  petitions: api.petitions.list.path,
+  major_applications: api.majorApplications.list.path,
+};
+
+export function useServerEvents(enabled: boolean) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+    let source: EventSource | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const retry = () => {
+      if (!closed) timer = setTimeout(connect, RECONNECT_DELAY);
+    };
+
+    // EventSource cannot send an Authorization header; exchange the access
+    // token for a short-lived, single-use ticket so the token stays out of
+    // the URL.
+    const connect = async () => {
+      if (!getAccessToken()) return;
+      let ticket: string;
+      try {
+        const res = await apiRequest(api.events.ticket.method, api.events.ticket.path);
+        ({ ticket } = await res.json());
+      } catch {
+        retry();
+        return;
+      }
+      if (closed) return;
+      source = new EventSource(`${api.events.stream.path}?ticket=${encodeURIComponent(ticket)}`);
+
+      source.addEventListener("status", (event) => {
+        const { module } = JSON.parse((event as MessageEvent).data);
+        if (STATUS_QUERIES[module]) {
+          queryClient.invalidateQueries({ queryKey: [STATUS_QUERIES[module]] });
+        }
+        queryClient.invalidateQueries({ queryKey: [api.dashboard.summary.path] });
+      });
+
+      source.addEventListener("notification", () => {
+        queryClient.invalidateQueries({ queryKey: [api.notifications.list.path] });
+        queryClient.invalidateQueries({ queryKey: [api.notifications.unreadCount.path] });
+      });
+
+      // The ticket in the URL has been used; reconnect with a fresh one
+      // rather than letting EventSource retry the stale URL.
+      source.onerror = () => {
+        source?.close();
+        retry();
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (timer) clearTimeout(timer);
+      source?.close();
+    };
+  }, [enabled, queryClient]);
+}
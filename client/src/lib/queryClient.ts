@@ -1,9 +1,8 @@
 import { QueryClient, QueryFunction } from "@tanstack/react-query";
 
-let accessToken: string | null = localStorage.getItem('access_token');
-
+// Tokens are read from localStorage on every use rather than cached per
+// tab: refresh tokens are single-use, and another tab may have rotated them.
 export function setAccessToken(token: string | null) {
-  accessToken = token;
   if (token) {
     localStorage.setItem('access_token', token);
   } else {
@@ -12,7 +11,19 @@ export function setAccessToken(token: string | null) {
 }
 
 export function getAccessToken(): string | null {
-  return accessToken;
+  return localStorage.getItem('access_token');
+}
+
+export function setRefreshToken(token: string | null) {
+  if (token) {
+    localStorage.setItem('refresh_token', token);
+  } else {
+    localStorage.removeItem('refresh_token');
+  }
+}
+
+export function getRefreshToken(): string | null {
+  return localStorage.getItem('refresh_token');
 }
 
 async function throwIfResNotOk(res: Response) {
@@ -31,6 +42,7 @@ export async function apiRequest(
   if (data) {
     headers["Content-Type"] = "application/json";
   }
+  const accessToken = getAccessToken();
   if (accessToken) {
     headers["Authorization"] = `Bearer ${accessToken}`;
   }
@@ -52,6 +64,7 @@ export const getQueryFn: <T>(options: {
   ({ on401: unauthorizedBehavior }) =>
   async ({ queryKey }) => {
     const headers: Record<string, string> = {};
+    const accessToken = getAccessToken();
     if (accessToken) {
       headers["Authorization"] = `Bearer ${accessToken}`;
     }
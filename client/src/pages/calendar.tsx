@@ -20,6 +20,7 @@ const formSchema = z.object({
   type: z.enum(["holiday", "exam", "deadline", "event"]),
   startDate: z.coerce.date(),
   endDate: z.coerce.date().optional(),
+  recurrence: z.string().optional(),
 });
 
 export default function CalendarPage() {
@@ -39,7 +40,8 @@ export default function CalendarPage() {
   });
 
   async function onSubmit(data: z.infer<typeof formSchema>) {
-    await createEvent.mutateAsync(data as any);
+    const { recurrence, ...event } = data;
+    await createEvent.mutateAsync({ ...event, recurrence: recurrence && recurrence !== "none" ? recurrence : undefined } as any);
     setOpen(false);
     form.reset();
   }
@@ -159,6 +161,30 @@ export default function CalendarPage() {
                     />
                   </div>
 
+                  <FormField
+                    control={form.control}
+                    name="recurrence"
+                    render={({ field }) => (
+                      <FormItem>
+                        <FormLabel>Repeats</FormLabel>
+                        <Select onValueChange={field.onChange} defaultValue={field.value ?? "none"}>
+                          <FormControl>
+                            <SelectTrigger data-testid="select-event-recurrence">
+                              <SelectValue placeholder="Does not repeat" />
+                            </SelectTrigger>
+                          </FormControl>
+                          <SelectContent>
+                            <SelectItem value="none">Does not repeat</SelectItem>
+                            <SelectItem value="FREQ=WEEKLY">Weekly</SelectItem>
+                            <SelectItem value="FREQ=MONTHLY">Monthly</SelectItem>
+                            <SelectItem value="FREQ=YEARLY">Yearly</SelectItem>
+                          </SelectContent>
+                        </Select>
+                        <FormMessage />
+                      </FormItem>
+                    )}
+                  />
+
                   <DialogFooter>
                     <Button type="submit" disabled={createEvent.isPending} data-testid="button-submit-event">
                       {createEvent.isPending ? <Loader2 className="w-4 h-4 animate-spin mr-2" /> : null}
@@ -177,7 +203,7 @@ export default function CalendarPage() {
           <div className="col-span-full flex justify-center p-12"><Loader2 className="w-8 h-8 animate-spin text-primary" /></div>
         ) : (
           events?.map((event: any) => (
-            <Card key={event.id} className="relative" style={{ borderLeftWidth: '4px', borderLeftColor: getTypeBorderColor(event.type) }} data-testid={`card-event-${event.id}`}>
+            <Card key={`${event.id}-${event.startDate}`} className="relative" style={{ borderLeftWidth: '4px', borderLeftColor: getTypeBorderColor(event.type) }} data-testid={`card-event-${event.id}`}>
               <div className="absolute top-0 right-0 p-3 opacity-10">
                 <CalendarIcon className="w-24 h-24" />
               </div>
@@ -194,6 +220,9 @@ export default function CalendarPage() {
                   <Clock className="w-4 h-4 mr-2" />
                   <span className="font-medium">{format(new Date(event.startDate), "EEEE, MMMM do, yyyy")}</span>
                 </div>
+                {event.recurrence && (
+                  <p className="mt-1 text-xs text-muted-foreground">Repeats {event.recurrence.replace("FREQ=", "").split(";")[0].toLowerCase()}</p>
+                )}
                 {event.description && (
                   <p className="mt-3 text-sm text-muted-foreground/80 line-clamp-2">{event.description}</p>
                 )}
@@ -1,5 +1,5 @@
 import { useAuth } from "@/hooks/use-auth";
-import { useDocumentRequests, usePetitions, useMajorApplications } from "@/hooks/use-registrar";
+import { useDashboardSummary } from "@/hooks/use-registrar";
 import LayoutShell from "@/components/layout-shell";
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -10,11 +10,7 @@ import { format } from "date-fns";
 
 export default function Dashboard() {
   const { user } = useAuth();
-  const { data: requests, isLoading: loadingRequests } = useDocumentRequests();
-  const { data: petitions, isLoading: loadingPetitions } = usePetitions();
-  const { data: majorApps, isLoading: loadingMajors } = useMajorApplications();
-
-  const isLoading = loadingRequests || loadingPetitions || loadingMajors;
+  const { data: summary, isLoading } = useDashboardSummary(4);
 
   if (isLoading) {
     return (
@@ -26,11 +22,18 @@ export default function Dashboard() {
     );
   }
 
-  const pendingRequests = requests?.filter((r: any) => !["completed", "rejected"].includes(r.status)) || [];
-  const pendingPetitions = petitions?.filter((p: any) => !["approved", "rejected"].includes(p.status)) || [];
-  const completedCount = (requests?.filter((r: any) => r.status === "completed").length || 0) +
-    (petitions?.filter((p: any) => p.status === "approved").length || 0) +
-    (majorApps?.filter((a: any) => a.status === "approved").length || 0);
+  const countOf = (module: any, status: string) => module?.counts?.[status] || 0;
+  const requests = summary?.documentRequests?.recent;
+  const petitions = summary?.petitions?.recent;
+  const majorApps = summary?.majorApplications?.recent;
+
+  const pendingRequestsCount = (summary?.documentRequests?.total || 0) -
+    countOf(summary?.documentRequests, "completed") - countOf(summary?.documentRequests, "rejected");
+  const pendingPetitionsCount = (summary?.petitions?.total || 0) -
+    countOf(summary?.petitions, "approved") - countOf(summary?.petitions, "rejected");
+  const completedCount = countOf(summary?.documentRequests, "completed") +
+    countOf(summary?.petitions, "approved") +
+    countOf(summary?.majorApplications, "approved");
 
   const roleLabel = user?.role === "admin" ? "Administrator" : user?.role === "instructor" ? "Instructor" : "Student";
 
@@ -64,7 +67,7 @@ export default function Dashboard() {
               <CardContent className="p-6 flex items-center justify-between gap-4">
                 <div>
                   <p className="text-sm font-medium text-muted-foreground mb-1">Active Requests</p>
-                  <p className="text-3xl font-bold font-display" data-testid="text-active-requests">{pendingRequests.length}</p>
+                  <p className="text-3xl font-bold font-display" data-testid="text-active-requests">{pendingRequestsCount}</p>
                 </div>
                 <div className="p-4 rounded-full bg-blue-50 dark:bg-blue-950">
                   <FileText className="w-6 h-6 text-blue-600 dark:text-blue-400" />
@@ -77,7 +80,7 @@ export default function Dashboard() {
               <CardContent className="p-6 flex items-center justify-between gap-4">
                 <div>
                   <p className="text-sm font-medium text-muted-foreground mb-1">Pending Petitions</p>
-                  <p className="text-3xl font-bold font-display" data-testid="text-pending-petitions">{pendingPetitions.length}</p>
+                  <p className="text-3xl font-bold font-display" data-testid="text-pending-petitions">{pendingPetitionsCount}</p>
                 </div>
                 <div className="p-4 rounded-full bg-amber-50 dark:bg-amber-950">
                   <GraduationCap className="w-6 h-6 text-amber-600 dark:text-amber-400" />
@@ -3,11 +3,25 @@ from flask_cors import CORS
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from flask_app.user_cache import UserCache
+from flask_app.token_revocation import TokenRevocations
+from flask_app.refresh_families import RefreshFamilies
+from flask_app.hashing import PasswordHashPool
+from flask_app.calendar_cache import CalendarCache
+from flask_app.notification_writer import NotificationWriter
+from flask_app.pubsub import PubSub
 import os
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 jwt = JWTManager()
+user_cache = UserCache()
+token_revocations = TokenRevocations()
+refresh_families = RefreshFamilies()
+password_pool = PasswordHashPool()
+calendar_cache = CalendarCache()
+notification_writer = NotificationWriter()
+pubsub = PubSub()
 
 def create_app(test_config=None):
     static_dir = os.path.join(os.getcwd(), 'dist', 'public')
@@ -22,10 +36,14 @@ def create_app(test_config=None):
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', '')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('SESSION_SECRET', 'dev-secret-key')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 1800
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', '900'))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', '86400'))
     app.config['JWT_TOKEN_LOCATION'] = ['headers']
     app.config['JWT_HEADER_NAME'] = 'Authorization'
     app.config['JWT_HEADER_TYPE'] = 'Bearer'
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', '12'))
+    app.config['PUBSUB_BACKEND'] = os.environ.get('PUBSUB_BACKEND', 'memory')
+    app.config['PUBSUB_MAX_SUBSCRIBERS'] = int(os.environ.get('PUBSUB_MAX_SUBSCRIBERS', '200'))
 
     if test_config:
         app.config.update(test_config)
@@ -33,6 +51,13 @@ def create_app(test_config=None):
     db.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    user_cache.init_app(app)
+    token_revocations.init_app(app)
+    refresh_families.init_app(app)
+    password_pool.init_app(app)
+    calendar_cache.init_app(app)
+    notification_writer.init_app(app)
+    pubsub.init_app(app)
     CORS(app, supports_credentials=True, origins=["*"])
 
     from flask import jsonify
@@ -56,6 +81,8 @@ def create_app(test_config=None):
     from flask_app.routes.calendar import cal_bp
     from flask_app.routes.payments import pay_bp
     from flask_app.routes.notifications import notif_bp
+    from flask_app.routes.dashboard import dash_bp
+    from flask_app.routes.events import events_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(doc_bp, url_prefix='/api')
@@ -64,6 +91,19 @@ def create_app(test_config=None):
     app.register_blueprint(cal_bp, url_prefix='/api')
     app.register_blueprint(pay_bp, url_prefix='/api')
     app.register_blueprint(notif_bp, url_prefix='/api')
+    app.register_blueprint(dash_bp, url_prefix='/api')
+    app.register_blueprint(events_bp, url_prefix='/api')
+
+    from flask_app.counters import rebuild_status_counters_command
+    from flask_app.migrations import migrate_cli
+    from flask_app.index_check import check_indexes_command
+    from flask_app.hashing import calibrate_bcrypt_command
+    from flask_app.notification_retention import compact_notifications_command
+    app.cli.add_command(rebuild_status_counters_command)
+    app.cli.add_command(compact_notifications_command)
+    app.cli.add_command(calibrate_bcrypt_command)
+    migrate_cli.add_command(check_indexes_command)
+    app.cli.add_command(migrate_cli)
 
     if is_production and os.path.isdir(static_dir):
         @app.route('/', defaults={'path': ''})
@@ -76,7 +116,9 @@ def create_app(test_config=None):
 
     if not app.config.get('TESTING'):
         with app.app_context():
+            from flask_app.migrations import upgrade
             from flask_app.seed import seed_data
+            upgrade()
             seed_data()
 
     return app
@@ -0,0 +1,124 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from flask_app import db
+from flask_app.counters import MODULES, apply_status_deltas
+from flask_app.notifications import notify_status_change, publish_bulk_status_change
+from flask_app.constraints import is_unique_violation
+
+MAX_BULK_IDS = 1000
+
+
+class BulkUpdateError(ValueError):
+    pass
+
+
+def parse_bulk_request(data, valid_statuses):
+    """Validate a bulk status body. Returns (ids, status, comment_given, comment)."""
+    if not data:
+        raise BulkUpdateError('Missing request body')
+
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise BulkUpdateError('ids must be a non-empty list')
+    if len(ids) > MAX_BULK_IDS:
+        raise BulkUpdateError(f'At most {MAX_BULK_IDS} ids can be updated at once')
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise BulkUpdateError('ids must be integers')
+
+    status = data.get('status')
+    if status not in valid_statuses:
+        raise BulkUpdateError('Invalid status')
+
+    return list(dict.fromkeys(ids)), status, 'adminComment' in data, data.get('adminComment')
+
+
+def _update_rows(model, row_ids, values):
+    db.session.execute(
+        update(model).where(model.id.in_(row_ids)).values(**values),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def _apply_status(model, changed, values, pending_index):
+    """UPDATE `changed` to the new status. Returns the ids that could not be
+    moved because of the one-pending-request index.
+
+    The batch is tried as one UPDATE in a savepoint. If that violates the
+    index, each row is retried in its own savepoint (in id order) so the rest
+    of the batch is still applied.
+    """
+    try:
+        with db.session.begin_nested():
+            _update_rows(model, changed, values)
+        return set()
+    except IntegrityError as e:
+        if not is_unique_violation(e, pending_index):
+            raise
+
+    conflicts = set()
+    for row_id in changed:
+        try:
+            with db.session.begin_nested():
+                _update_rows(model, [row_id], values)
+        except IntegrityError as e:
+            if not is_unique_violation(e, pending_index):
+                raise
+            conflicts.add(row_id)
+    return conflicts
+
+
+def bulk_update_status(module, ids, status, comment_given, comment, pending_index):
+    """Move every row in `ids` to `status` with one UPDATE ... WHERE id IN and
+    commit. Rows already at `status` keep it but still get `comment` if one
+    was given. Rows that would give their owner a second pending request are
+    reported as conflicts and the rest of the batch is applied. Returns
+    per-id outcomes in request order."""
+    model, owner_column = MODULES[module]
+    # Locked (in id order, so concurrent bulk updates cannot deadlock) so the
+    # counter deltas are taken from the statuses this update replaces.
+    rows = db.session.query(model.id, owner_column, model.status).filter(model.id.in_(ids)) \
+        .order_by(model.id).with_for_update().all()
+    current = {row_id: (owner_id, old_status) for row_id, owner_id, old_status in rows}
+    changed = [row_id for row_id, (_, old_status) in current.items() if old_status != status]
+    unchanged = [row_id for row_id, (_, old_status) in current.items() if old_status == status]
+
+    values = {}
+    if comment_given:
+        values['admin_comment'] = comment
+    if hasattr(model, 'updated_at'):
+        values['updated_at'] = datetime.utcnow()
+
+    conflicts = set()
+    try:
+        if changed:
+            conflicts = _apply_status(model, changed, {**values, 'status': status}, pending_index)
+        if comment_given and unchanged:
+            _update_rows(model, unchanged, values)
+
+        applied = [row_id for row_id in changed if row_id not in conflicts]
+        deltas = {}
+        for row_id in applied:
+            owner_id, old_status = current[row_id]
+            deltas[(owner_id, old_status)] = deltas.get((owner_id, old_status), 0) - 1
+            deltas[(owner_id, status)] = deltas.get((owner_id, status), 0) + 1
+            notify_status_change(module, owner_id, row_id, status, admin=False)
+        if applied:
+            apply_status_deltas(module, deltas)
+            publish_bulk_status_change(module, applied, status)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    results = []
+    for row_id in ids:
+        if row_id not in current:
+            results.append({'id': row_id, 'outcome': 'not_found'})
+        elif row_id in conflicts:
+            results.append({'id': row_id, 'outcome': 'conflict', 'previousStatus': current[row_id][1]})
+        elif current[row_id][1] == status:
+            results.append({'id': row_id, 'outcome': 'unchanged', 'commentApplied': comment_given})
+        else:
+            results.append({'id': row_id, 'outcome': 'updated', 'previousStatus': current[row_id][1]})
+    return results
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class CalendarCache:
+    """Per-process cache of serialized calendar responses.
+
+    Every user gets the same calendar payload, so responses are cached by
+    query string under the current calendar version. The version is bumped
+    after any commit that inserted, updated or deleted a CalendarEvent in
+    this process (see the mapper events in models.py), which drops every
+    entry. Entries also expire after a short TTL so that writes made by
+    other worker processes are picked up.
+    """
+
+    def __init__(self, max_size=64, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('CALENDAR_CACHE_SIZE', 64)
+        self.ttl = app.config.setdefault('CALENDAR_CACHE_TTL', 30)
+        self.clear()
+
+    def get(self, key):
+        """Return (body, etag) for `key` at the current version, or None."""
+        with self._lock:
+            entry = self._entries.get((self.version, key))
+            if entry is not None:
+                body, etag, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end((self.version, key))
+                    self.hits += 1
+                    return body, etag
+                del self._entries[(self.version, key)]
+            self.misses += 1
+            return None
+
+    def set(self, version, key, body):
+        """Store `body` built while the calendar was at `version`. A body built
+        before a concurrent bump is returned but never cached."""
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        if self.max_size <= 0:
+            return body, etag
+        with self._lock:
+            if version == self.version:
+                self._entries[(version, key)] = (body, etag, time.monotonic() + self.ttl)
+                self._entries.move_to_end((version, key))
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return body, etag
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,57 @@
+import heapq
+from collections import namedtuple
+from datetime import timedelta
+
+# Pairs of event types that must not overlap. General events never conflict.
+CONFLICTING_TYPES = {
+    frozenset(['exam']),
+    frozenset(['exam', 'holiday']),
+    frozenset(['deadline', 'holiday']),
+}
+CONFLICT_PRONE_TYPES = set().union(*CONFLICTING_TYPES)
+
+Occurrence = namedtuple('Occurrence', 'id title type start end')
+
+
+def types_conflict(a, b):
+    return frozenset([a, b]) in CONFLICTING_TYPES
+
+
+def occurrence_span(occurrence):
+    """Half-open [start, end) interval an occurrence blocks. The calendar
+    shows events by day, so one without an end blocks its whole start day."""
+    if occurrence.end is not None and occurrence.end > occurrence.start:
+        return occurrence.start, occurrence.end
+    day = occurrence.start.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day, day + timedelta(days=1)
+
+
+def conflicting_pairs(occurrences):
+    """Return (a, b) pairs of overlapping occurrences whose types conflict,
+    ordered by the later one's start. Sweeps the occurrences in start order
+    keeping a heap of those still running, so cost is O(n log n) plus the
+    overlaps found."""
+    spans = sorted(
+        (occurrence_span(o) + (o,) for o in occurrences if o.type in CONFLICT_PRONE_TYPES),
+        key=lambda item: (item[0], item[2].id),
+    )
+    pairs = []
+    running = []
+    for index, (start, end, occurrence) in enumerate(spans):
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        for _, _, other in running:
+            if other.id != occurrence.id and types_conflict(other.type, occurrence.type):
+                pairs.append((other, occurrence))
+        heapq.heappush(running, (end, index, occurrence))
+    return pairs
+
+
+def occurrence_dict(occurrence):
+    return {
+        'id': occurrence.id,
+        'title': occurrence.title,
+        'type': occurrence.type,
+        'startDate': occurrence.start.isoformat(),
+        'endDate': occurrence.end.isoformat() if occurrence.end else None,
+    }
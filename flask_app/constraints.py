@@ -0,0 +1,17 @@
+PENDING_DOCUMENT_REQUEST_INDEX = 'uq_document_requests_one_pending'
+PENDING_PETITION_INDEX = 'uq_grade_change_petitions_one_pending'
+PENDING_MAJOR_APPLICATION_INDEX = 'uq_major_applications_one_pending'
+
+
+def is_unique_violation(error, index_name):
+    """True if an IntegrityError was raised by the unique index `index_name`.
+
+    Postgres reports the violated constraint by name. SQLite only reports the
+    columns, so there any unique violation is taken to match.
+    """
+    orig = getattr(error, 'orig', None)
+    pgcode = getattr(orig, 'pgcode', None)
+    if pgcode is not None:
+        diag = getattr(orig, 'diag', None)
+        return pgcode == '23505' and getattr(diag, 'constraint_name', None) == index_name
+    return 'UNIQUE constraint failed' in str(orig)
@@ -0,0 +1,111 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from flask_app import db
+from flask_app.models import DocumentRequest, GradeChangePetition, MajorApplication, StatusCounter
+
+# Global (all owners) counts are stored under this owner id.
+ALL_OWNERS = ''
+
+MODULES = {
+    'document_requests': (DocumentRequest, DocumentRequest.user_id),
+    'petitions': (GradeChangePetition, GradeChangePetition.instructor_id),
+    'major_applications': (MajorApplication, MajorApplication.student_id),
+}
+
+
+def _insert(table):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'Status counters are not supported on {dialect}')
+    return insert(table)
+
+
+def apply_status_deltas(module, deltas):
+    """Add {(owner_id, status): delta} to the counters in the current
+    transaction. Every delta is applied to both the owner's row and the
+    module-wide row."""
+    totals = {}
+    for (owner_id, status), delta in deltas.items():
+        for key in ((owner_id, status), (ALL_OWNERS, status)):
+            totals[key] = totals.get(key, 0) + delta
+
+    rows = [
+        {'module': module, 'owner_id': owner_id, 'status': status, 'count': delta}
+        for (owner_id, status), delta in totals.items() if delta
+    ]
+    if not rows:
+        return
+
+    table = StatusCounter.__table__
+    stmt = _insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.module, table.c.owner_id, table.c.status],
+        set_={'count': table.c.count + stmt.excluded.count},
+    )
+    db.session.execute(stmt)
+
+
+def get_for_status_change(model, row_id):
+    """Load a row whose status is about to change, locked until commit.
+
+    record_status_change takes its delta from the row's current status, so
+    the row must be locked: otherwise two concurrent updates could both
+    read the same old status and the counters would drift.
+    """
+    return db.session.get(model, row_id, with_for_update=True)
+
+
+def record_status_change(module, owner_id, old_status, new_status):
+    if old_status == new_status:
+        return
+    deltas = {}
+    if old_status is not None:
+        deltas[(owner_id, old_status)] = -1
+    if new_status is not None:
+        deltas[(owner_id, new_status)] = 1
+    apply_status_deltas(module, deltas)
+
+
+def get_status_counts(module, owner_id=ALL_OWNERS):
+    rows = StatusCounter.query.with_entities(StatusCounter.status, StatusCounter.count).filter(
+        StatusCounter.module == module,
+        StatusCounter.owner_id == owner_id,
+        StatusCounter.count > 0,
+    ).all()
+    return {status: count for status, count in rows}
+
+
+def rebuild_status_counters():
+    """Recompute every counter from the source tables, replacing whatever is
+    stored. Returns the number of counter rows written."""
+    StatusCounter.query.delete(synchronize_session=False)
+
+    rows = []
+    for module, (model, owner_column) in MODULES.items():
+        grouped = db.session.query(owner_column, model.status, func.count(model.id)).group_by(owner_column, model.status).all()
+        totals = {}
+        for owner_id, status, count in grouped:
+            rows.append({'module': module, 'owner_id': owner_id, 'status': status, 'count': count})
+            totals[status] = totals.get(status, 0) + count
+        rows.extend(
+            {'module': module, 'owner_id': ALL_OWNERS, 'status': status, 'count': count}
+            for status, count in totals.items()
+        )
+
+    if rows:
+        db.session.execute(StatusCounter.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+@click.command('rebuild-status-counters')
+@with_appcontext
+def rebuild_status_counters_command():
+    """Recompute status counters from the source tables."""
+    written = rebuild_status_counters()
+    click.echo(f'Rebuilt {written} status counter rows.')
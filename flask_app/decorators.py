@@ -1,15 +1,51 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_app import db, user_cache, token_revocations
 from flask_app.models import User
 
 
+class TokenUser:
+    """Minimal stand-in for User built from access token claims, passed as
+    current_user by role_required when JWT_STATELESS_AUTH is enabled."""
+
+    is_active = True
+
+    def __init__(self, user_id, role, token_generation=0):
+        self.id = user_id
+        self.role = role
+        self.token_generation = token_generation
+
+
+def user_claims(user):
+    return {'role': user.role, 'gen': user.token_generation or 0}
+
+
+def load_user(user_id):
+    user = user_cache.get(user_id)
+    if user is None:
+        user = User.query.get(user_id)
+        if user:
+            db.session.expunge(user)
+            user_cache.set(user_id, user)
+    return user
+
+
+def load_token_user(user_id):
+    claims = get_jwt()
+    if 'role' not in claims or 'gen' not in claims:
+        return None
+    if token_revocations.is_revoked(user_id, claims['gen']):
+        return None
+    return TokenUser(user_id, claims['role'], claims['gen'])
+
+
 def jwt_required_with_user(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = load_user(user_id)
         if not user:
             return jsonify({'message': 'User not found'}), 404
         if not user.is_active:
@@ -25,7 +61,11 @@ def role_required(*roles):
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
             user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            user = None
+            if current_app.config.get('JWT_STATELESS_AUTH'):
+                user = load_token_user(user_id)
+            if user is None:
+                user = load_user(user_id)
             if not user:
                 return jsonify({'message': 'User not found'}), 404
             if not user.is_active:
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from flask import request
+
+
+class FilterError(ValueError):
+    pass
+
+
+def parse_datetime_param(name, end_of_day=False):
+    """Parse an ISO date or datetime query parameter into naive UTC. A bare
+    date used as an upper bound covers the whole day."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw.replace('Z', '+00:00'))
+    except ValueError:
+        raise FilterError(f'Invalid {name}')
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_of_day and len(raw) == 10:
+        try:
+            value += timedelta(days=1)
+        except OverflowError:
+            raise FilterError(f'Invalid {name}')
+    return value
+
+
+def apply_filters(query, fields, date_column=None):
+    """Narrow `query` by the request's filter parameters.
+
+    `fields` maps a query parameter to (column, allowed values or None).
+    Parameters accept comma-separated values. `from`/`to` bound
+    `date_column`; a bare `to` date is inclusive.
+    """
+    for param, (column, allowed) in fields.items():
+        raw = request.args.get(param)
+        if not raw:
+            continue
+        values = [v.strip() for v in raw.split(',') if v.strip()]
+        if allowed is not None and any(v not in allowed for v in values):
+            raise FilterError(f'Invalid {param}')
+        query = query.filter(column.in_(values) if len(values) > 1 else column == values[0])
+
+    if date_column is not None:
+        start = parse_datetime_param('from')
+        end = parse_datetime_param('to', end_of_day=True)
+        if start is not None:
+            query = query.filter(date_column >= start)
+        if end is not None:
+            query = query.filter(date_column < end if len(request.args['to']) == 10 else date_column <= end)
+    return query
+
+
+def sort_descending(default='-createdAt'):
+    """Read `sort` (createdAt or -createdAt) and return True for descending."""
+    sort = request.args.get('sort', default)
+    if sort not in ('createdAt', '-createdAt'):
+        raise FilterError('Invalid sort')
+    return sort.startswith('-')
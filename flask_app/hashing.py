@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import click
+
+
+class HashPoolSaturated(RuntimeError):
+    pass
+
+
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt work with admission control.
+
+    bcrypt releases the GIL, so capping the number of pool threads caps how
+    many cores password hashing can occupy at once. Callers beyond
+    `workers + queue_size` are rejected immediately with HashPoolSaturated
+    instead of queueing behind a login storm. The executor is created lazily
+    so that each forked gunicorn worker gets its own threads.
+    """
+
+    @staticmethod
+    def _executor_class():
+        # Under gevent workers threading.Thread is a greenlet, so bcrypt would
+        # block the whole worker; gevent's pool runs on native threads.
+        try:
+            from gevent import monkey
+        except ImportError:
+            return ThreadPoolExecutor
+        if not monkey.is_module_patched('threading'):
+            return ThreadPoolExecutor
+        from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+        return NativeThreadPoolExecutor
+
+    def __init__(self):
+        self.workers = 1
+        self.queue_size = 0
+        self.timeout = None
+        self.retry_after = 1
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        default_workers = max(1, (os.cpu_count() or 2) // 2)
+        self.workers = app.config.setdefault('LOGIN_HASH_WORKERS', default_workers)
+        self.queue_size = app.config.setdefault('LOGIN_HASH_QUEUE_SIZE', 64)
+        self.timeout = app.config.setdefault('LOGIN_HASH_TIMEOUT', 30)
+        self.retry_after = app.config.setdefault('LOGIN_RETRY_AFTER', 1)
+        self.shutdown()
+
+    def _ensure_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+                    self._executor = self._executor_class()(
+                        max_workers=self.workers, thread_name_prefix='password-hash')
+        return self._executor
+
+    def run(self, fn, *args):
+        executor = self._ensure_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashPoolSaturated()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result(timeout=self.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+
+def hash_cost(pw_hash):
+    """Return the cost factor encoded in a bcrypt hash ($2b$<cost>$...)."""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(pw_hash, rounds):
+    return hash_cost(pw_hash) != rounds
+
+
+def time_hash(rounds, samples=3):
+    """Median seconds to verify a password hashed with `rounds`."""
+    pw_hash = bcrypt.hashpw(b'calibration-password', bcrypt.gensalt(rounds))
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.checkpw(b'calibration-password', pw_hash)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_rounds(target_seconds, min_rounds=4, max_rounds=16):
+    """Pick the highest cost whose verify time stays within target_seconds.
+    Returns (rounds, {rounds: seconds}) for the costs measured."""
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = time_hash(rounds)
+        if timings[rounds] > target_seconds:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+@click.command('calibrate-bcrypt')
+@click.option('--target-ms', default=250, show_default=True, help='Target verify time per login.')
+@click.option('--min-rounds', default=4, show_default=True)
+@click.option('--max-rounds', default=16, show_default=True)
+def calibrate_bcrypt_command(target_ms, min_rounds, max_rounds):
+    """Measure bcrypt on this machine and recommend BCRYPT_LOG_ROUNDS."""
+    rounds, timings = calibrate_rounds(target_ms / 1000, min_rounds, max_rounds)
+    for cost, seconds in timings.items():
+        click.echo(f'cost {cost:>2}: {seconds * 1000:8.1f} ms')
+    click.echo(f'Recommended BCRYPT_LOG_ROUNDS={rounds} (target {target_ms} ms)')
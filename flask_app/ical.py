@@ -0,0 +1,75 @@
+from datetime import datetime
+
+PRODID = '-//LUMS Registrar Office//Academic Calendar//EN'
+UID_DOMAIN = 'lums-ro'
+CHUNK_SIZE = 64 * 1024
+
+
+def escape_text(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_line(line):
+    """Fold a content line to 75 octets per RFC 5545 section 3.1."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_datetime(value):
+    # Timestamps are stored as naive UTC.
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_lines(event_id, title, description, start_date, end_date, event_type, recurrence, created_at):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:calendar-event-{event_id}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_datetime(created_at or datetime.utcnow())}',
+        f'DTSTART:{format_datetime(start_date)}',
+    ]
+    if end_date:
+        lines.append(f'DTEND:{format_datetime(end_date)}')
+    if recurrence:
+        lines.append(f'RRULE:{recurrence}')
+    lines.append(f'SUMMARY:{escape_text(title)}')
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    lines.append(f'CATEGORIES:{event_type.upper()}')
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def stream_calendar(rows, name='LUMS Academic Calendar'):
+    """Yield an iCalendar document chunk by chunk from an iterable of
+    (id, title, description, start_date, end_date, type, recurrence,
+    created_at) rows. Recurring events are written once with an RRULE."""
+    yield ''.join(fold_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ])
+    buffer, size = [], 0
+    for row in rows:
+        lines = event_lines(*row)
+        buffer.append(lines)
+        size += len(lines)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(fold_line('END:VCALENDAR'))
+    yield ''.join(buffer)
@@ -0,0 +1,137 @@
+import json
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, text, tuple_
+from flask_app import db
+from flask_app.models import (
+    DocumentRequest, GradeChangePetition, MajorApplication,
+    CalendarEvent, Notification, StatusCounter,
+)
+from flask_app.routes.calendar import calendar_window
+from flask_app.projection import DOCUMENT_REQUEST, with_first_payment
+
+
+def hot_queries():
+    """Representative statements for the queries issued by the blueprints."""
+    user_id = 'user-id'
+    return [
+        ('list document requests (admin)',
+         select(DocumentRequest).order_by(DocumentRequest.created_at.desc(), DocumentRequest.id.desc()).limit(50)),
+        ('list document requests (student)',
+         select(DocumentRequest).where(DocumentRequest.user_id == user_id)
+         .order_by(DocumentRequest.created_at.desc(), DocumentRequest.id.desc())),
+        ('filter document requests by status (admin)',
+         select(DocumentRequest).where(DocumentRequest.status == 'pending_approval',
+                                       DocumentRequest.urgency == 'urgent',
+                                       DocumentRequest.type == 'transcript')
+         .order_by(DocumentRequest.created_at.desc(), DocumentRequest.id.desc()).limit(50)),
+        ('list document requests with first payment (admin)',
+         with_first_payment(select(*DOCUMENT_REQUEST.columns))
+         .order_by(DocumentRequest.created_at.desc(), DocumentRequest.id.desc()).limit(50)),
+        ('list petitions (admin)',
+         select(GradeChangePetition).order_by(GradeChangePetition.created_at.desc(), GradeChangePetition.id.desc()).limit(50)),
+        ('list petitions (instructor)',
+         select(GradeChangePetition).where(GradeChangePetition.instructor_id == user_id)
+         .order_by(GradeChangePetition.created_at.desc(), GradeChangePetition.id.desc())),
+        ('filter petitions by status (admin)',
+         select(GradeChangePetition).where(GradeChangePetition.status == 'submitted')
+         .order_by(GradeChangePetition.created_at.desc(), GradeChangePetition.id.desc()).limit(50)),
+        ('filter petitions by course code (admin)',
+         select(GradeChangePetition).where(GradeChangePetition.course_code == 'CS100')
+         .order_by(GradeChangePetition.created_at.desc(), GradeChangePetition.id.desc()).limit(50)),
+        ('list major applications (admin)',
+         select(MajorApplication).order_by(MajorApplication.created_at.desc(), MajorApplication.id.desc()).limit(50)),
+        ('list major applications (student)',
+         select(MajorApplication).where(MajorApplication.student_id == user_id)
+         .order_by(MajorApplication.created_at.desc(), MajorApplication.id.desc())),
+        ('filter major applications by status (admin)',
+         select(MajorApplication).where(MajorApplication.status == 'submitted')
+         .order_by(MajorApplication.created_at.desc(), MajorApplication.id.desc()).limit(50)),
+        ('latest approved major application',
+         select(MajorApplication).where(MajorApplication.student_id == user_id, MajorApplication.status == 'approved')
+         .order_by(MajorApplication.created_at.desc()).limit(1)),
+        ('document request changes (admin)',
+         select(DocumentRequest).where(tuple_(DocumentRequest.updated_at, DocumentRequest.id) > tuple_(datetime(2026, 1, 1), 0))
+         .order_by(DocumentRequest.updated_at.asc(), DocumentRequest.id.asc()).limit(50)),
+        ('document request changes (student)',
+         select(DocumentRequest).where(DocumentRequest.user_id == user_id,
+                                       tuple_(DocumentRequest.updated_at, DocumentRequest.id) > tuple_(datetime(2026, 1, 1), 0))
+         .order_by(DocumentRequest.updated_at.asc(), DocumentRequest.id.asc()).limit(50)),
+        ('petition changes (instructor)',
+         select(GradeChangePetition).where(GradeChangePetition.instructor_id == user_id,
+                                           tuple_(GradeChangePetition.updated_at, GradeChangePetition.id) > tuple_(datetime(2026, 1, 1), 0))
+         .order_by(GradeChangePetition.updated_at.asc(), GradeChangePetition.id.asc()).limit(50)),
+        ('major application changes (admin)',
+         select(MajorApplication).where(tuple_(MajorApplication.updated_at, MajorApplication.id) > tuple_(datetime(2026, 1, 1), 0))
+         .order_by(MajorApplication.updated_at.asc(), MajorApplication.id.asc()).limit(50)),
+        ('list calendar events',
+         select(CalendarEvent).order_by(CalendarEvent.start_date.asc(), CalendarEvent.id.asc()).limit(50)),
+        ('calendar events in a window',
+         calendar_window(select(CalendarEvent), datetime(2026, 3, 1), datetime(2026, 4, 1))
+         .order_by(CalendarEvent.start_date.asc(), CalendarEvent.id.asc())),
+        ('list notifications',
+         select(Notification).where(Notification.user_id == user_id)
+         .order_by(Notification.created_at.desc(), Notification.id.desc())),
+        ('unread notification count',
+         select(func.count()).select_from(Notification)
+         .where(Notification.user_id == user_id, Notification.is_read == False)),  # noqa: E712
+        ('expired read notifications',
+         select(Notification.id).where(Notification.is_read == True,  # noqa: E712
+                                       Notification.created_at < datetime(2026, 1, 1)).limit(1000)),
+        ('notification retention boundary',
+         select(Notification.created_at, Notification.id).where(Notification.user_id == user_id)
+         .order_by(Notification.created_at.desc(), Notification.id.desc()).offset(200).limit(1)),
+        ('status counter lookup',
+         select(StatusCounter).where(StatusCounter.module == 'document_requests', StatusCounter.owner_id == '')),
+    ]
+
+
+def _plan_uses_index(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'sqlite':
+        details = [row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        uses_index = all(
+            'USING' in d and ('INDEX' in d or 'PRIMARY KEY' in d)
+            for d in details if d.startswith(('SCAN', 'SEARCH'))
+        )
+        return uses_index, '; '.join(details)
+
+    if conn.dialect.name == 'postgresql':
+        # With seq scans disabled the planner only falls back to one when no
+        # index can serve the query, which is exactly what we want to detect.
+        conn.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = conn.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        node_types = []
+        stack = [plan[0]['Plan']]
+        while stack:
+            node = stack.pop()
+            node_types.append(node['Node Type'])
+            stack.extend(node.get('Plans', []))
+        return 'Seq Scan' not in node_types, ' > '.join(node_types)
+
+    raise RuntimeError(f'Index check is not supported on {conn.dialect.name}')
+
+
+def check_indexes():
+    """EXPLAIN every hot query. Returns [(name, uses_index, plan)]."""
+    results = []
+    with db.engine.connect() as conn:
+        for name, statement in hot_queries():
+            with conn.begin():
+                uses_index, plan = _plan_uses_index(conn, statement)
+            results.append((name, uses_index, plan))
+    return results
+
+
+@click.command('check-indexes')
+@with_appcontext
+def check_indexes_command():
+    """EXPLAIN the blueprints' hot queries and fail if any needs a full scan."""
+    failed = False
+    for name, uses_index, plan in check_indexes():
+        click.echo(f"{'ok  ' if uses_index else 'SCAN'} {name}: {plan}")
+        failed = failed or not uses_index
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,254 @@
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, inspect, literal, select, text
+from flask_app import db
+from flask_app.counters import ALL_OWNERS, MODULES
+from flask_app.models import StatusCounter
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent workers starting up
+# apply migrations one at a time.
+MIGRATION_LOCK_KEY = 741852963
+
+
+def _add_column(conn, table, column, ddl):
+    columns = {c['name'] for c in inspect(conn).get_columns(table)}
+    if column not in columns:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def _create_indexes(conn, indexes):
+    for name, table, columns in indexes:
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})'))
+
+
+def _0001_token_generation_and_status_counters(conn):
+    _add_column(conn, 'users', 'token_generation', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS status_counters ("
+        "module TEXT NOT NULL, "
+        "owner_id VARCHAR NOT NULL DEFAULT '', "
+        "status TEXT NOT NULL, "
+        "count INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (module, owner_id, status))"
+    ))
+    _backfill_status_counters(conn)
+
+
+def _backfill_status_counters(conn):
+    """Count existing rows into an empty status_counters table, per owner and
+    module-wide, the same rows rebuild-status-counters writes."""
+    counters = StatusCounter.__table__
+    if conn.execute(select(func.count()).select_from(counters)).scalar():
+        return
+    columns = ['module', 'owner_id', 'status', 'count']
+    for module, (model, owner_column) in MODULES.items():
+        table = model.__table__
+        owner, status = table.c[owner_column.key], table.c.status
+        conn.execute(counters.insert().from_select(
+            columns, select(literal(module), owner, status, func.count()).group_by(owner, status)))
+        conn.execute(counters.insert().from_select(
+            columns, select(literal(module), literal(ALL_OWNERS), status, func.count()).group_by(status)))
+
+
+def _0002_query_indexes(conn):
+    _create_indexes(conn, [
+        ('ix_payments_request_id', 'payments', 'request_id'),
+        ('ix_document_requests_created_at_id', 'document_requests', 'created_at, id'),
+        ('ix_document_requests_user_id_created_at_id', 'document_requests', 'user_id, created_at, id'),
+        ('ix_document_requests_user_id_status', 'document_requests', 'user_id, status'),
+        ('ix_grade_change_petitions_created_at_id', 'grade_change_petitions', 'created_at, id'),
+        ('ix_grade_change_petitions_instructor_id_created_at_id', 'grade_change_petitions', 'instructor_id, created_at, id'),
+        ('ix_grade_change_petitions_instructor_student_course_status', 'grade_change_petitions', 'instructor_id, student_id, course_code, status'),
+        ('ix_major_applications_created_at_id', 'major_applications', 'created_at, id'),
+        ('ix_major_applications_student_id_created_at_id', 'major_applications', 'student_id, created_at, id'),
+        ('ix_major_applications_student_id_status_created_at', 'major_applications', 'student_id, status, created_at'),
+        ('ix_calendar_events_start_date_id', 'calendar_events', 'start_date, id'),
+        ('ix_notifications_user_id_created_at_id', 'notifications', 'user_id, created_at, id'),
+    ])
+
+
+PENDING_UNIQUE_INDEXES = [
+    ('uq_document_requests_one_pending', 'document_requests', ('user_id',),
+     "status IN ('submitted', 'payment_pending', 'pending_approval')"),
+    ('uq_grade_change_petitions_one_pending', 'grade_change_petitions', ('instructor_id', 'student_id', 'course_code'),
+     "status IN ('submitted', 'pending_approval')"),
+    ('uq_major_applications_one_pending', 'major_applications', ('student_id',),
+     "status IN ('submitted', 'pending_approval')"),
+]
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def _duplicate_ids(conn, table, columns, where):
+    """Ids of rows matching `where` that share `columns` with another such row."""
+    same_key = ' AND '.join(f'o.{column} = t.{column}' for column in columns)
+    return conn.execute(text(
+        f'SELECT t.id FROM {table} t WHERE t.{where} AND EXISTS ('
+        f'SELECT 1 FROM {table} o WHERE o.{where} AND {same_key} AND o.id <> t.id) ORDER BY t.id'
+    )).scalars().all()
+
+
+def _0003_pending_unique_indexes(conn):
+    # Rows from before the pending checks were enforced can already collide.
+    # Which one to keep is an administrative decision, so stop and name them
+    # rather than fail inside CREATE INDEX or pick a winner here.
+    duplicates = []
+    for name, table, columns, where in PENDING_UNIQUE_INDEXES:
+        ids = _duplicate_ids(conn, table, columns, where)
+        if ids:
+            duplicates.append(f"{table} ids {', '.join(map(str, ids))}")
+    if duplicates:
+        raise MigrationError(
+            'Cannot create one-pending unique indexes; resolve the duplicate pending rows first: '
+            + '; '.join(duplicates)
+        )
+    for name, table, columns, where in PENDING_UNIQUE_INDEXES:
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)}) WHERE {where}"))
+    # Only the query-then-insert pending checks used these.
+    conn.execute(text('DROP INDEX IF EXISTS ix_document_requests_user_id_status'))
+    conn.execute(text('DROP INDEX IF EXISTS ix_grade_change_petitions_instructor_student_course_status'))
+
+
+def _0004_filter_indexes(conn):
+    _create_indexes(conn, [
+        ('ix_document_requests_status_created_at_id', 'document_requests', 'status, created_at, id'),
+        ('ix_grade_change_petitions_status_created_at_id', 'grade_change_petitions', 'status, created_at, id'),
+        ('ix_grade_change_petitions_course_code_created_at_id', 'grade_change_petitions', 'course_code, created_at, id'),
+        ('ix_major_applications_status_created_at_id', 'major_applications', 'status, created_at, id'),
+    ])
+
+
+def _0005_calendar_window_index(conn):
+    _create_indexes(conn, [
+        ('ix_calendar_events_end_date_start_date', 'calendar_events', 'end_date, start_date'),
+    ])
+
+
+def _0006_calendar_recurrence(conn):
+    _add_column(conn, 'calendar_events', 'recurrence', 'TEXT')
+    _add_column(conn, 'calendar_events', 'recurrence_end', 'TIMESTAMP')
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_calendar_events_recurring_start_date ON calendar_events (start_date) '
+        'WHERE recurrence IS NOT NULL'
+    ))
+
+
+def _0007_unread_notifications_index(conn):
+    unread = 'is_read = false' if conn.dialect.name == 'postgresql' else 'is_read = 0'
+    conn.execute(text(
+        f'CREATE INDEX IF NOT EXISTS ix_notifications_unread_user_id ON notifications (user_id) WHERE {unread}'
+    ))
+
+
+def _0008_notification_archive(conn):
+    read = 'is_read = true' if conn.dialect.name == 'postgresql' else 'is_read = 1'
+    conn.execute(text(
+        f'CREATE INDEX IF NOT EXISTS ix_notifications_read_created_at ON notifications (created_at) WHERE {read}'
+    ))
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS notifications_archive ('
+        'id INTEGER PRIMARY KEY, '
+        'user_id VARCHAR NOT NULL, '
+        'title TEXT NOT NULL, '
+        'message TEXT NOT NULL, '
+        'type TEXT, '
+        'is_read BOOLEAN NOT NULL DEFAULT true, '
+        'created_at TIMESTAMP, '
+        'archived_at TIMESTAMP)'
+    ))
+    _create_indexes(conn, [
+        ('ix_notifications_archive_user_id_created_at', 'notifications_archive', 'user_id, created_at'),
+    ])
+
+
+def _0009_change_feed_indexes(conn):
+    _add_column(conn, 'major_applications', 'updated_at', 'TIMESTAMP')
+    for table in ('document_requests', 'grade_change_petitions', 'major_applications'):
+        conn.execute(text(f'UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL'))
+    _create_indexes(conn, [
+        ('ix_document_requests_updated_at_id', 'document_requests', 'updated_at, id'),
+        ('ix_document_requests_user_id_updated_at_id', 'document_requests', 'user_id, updated_at, id'),
+        ('ix_grade_change_petitions_updated_at_id', 'grade_change_petitions', 'updated_at, id'),
+        ('ix_grade_change_petitions_instructor_id_updated_at_id', 'grade_change_petitions', 'instructor_id, updated_at, id'),
+        ('ix_major_applications_updated_at_id', 'major_applications', 'updated_at, id'),
+        ('ix_major_applications_student_id_updated_at_id', 'major_applications', 'student_id, updated_at, id'),
+    ])
+
+
+# Append only. Each migration must be idempotent so that it is safe to run
+# against databases whose schema was already pushed from shared/schema.ts.
+MIGRATIONS = [
+    ('0001', 'Add users.token_generation and status_counters', _0001_token_generation_and_status_counters),
+    ('0002', 'Add indexes for list, pending and payment lookups', _0002_query_indexes),
+    ('0003', 'Enforce one pending request with partial unique indexes', _0003_pending_unique_indexes),
+    ('0004', 'Add indexes for list status and course filters', _0004_filter_indexes),
+    ('0005', 'Add index for calendar date windows', _0005_calendar_window_index),
+    ('0006', 'Add recurrence rules to calendar events', _0006_calendar_recurrence),
+    ('0007', 'Add partial index for unread notifications', _0007_unread_notifications_index),
+    ('0008', 'Add notification archive for retention', _0008_notification_archive),
+    ('0009', 'Add updated_at indexes for list change feeds', _0009_change_feed_indexes),
+]
+
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version TEXT PRIMARY KEY, '
+        'description TEXT NOT NULL, '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+
+
+def applied_versions():
+    with db.engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def upgrade():
+    """Apply pending migrations in order, each in its own transaction.
+    Returns the list of versions applied."""
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        with db.engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            _ensure_migrations_table(conn)
+            done = conn.execute(text('SELECT 1 FROM schema_migrations WHERE version = :v'), {'v': version}).first()
+            if done:
+                continue
+            migrate(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)'),
+                {'v': version, 'd': description, 't': datetime.utcnow()},
+            )
+        applied.append(version)
+    return applied
+
+
+migrate_cli = AppGroup('migrate', help='Versioned schema migrations.')
+
+
+@migrate_cli.command('upgrade')
+def upgrade_command():
+    """Apply all pending migrations."""
+    try:
+        applied = upgrade()
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(applied)}")
+    else:
+        click.echo('Database is up to date.')
+
+
+@migrate_cli.command('status')
+def status_command():
+    """List migrations and whether they have been applied."""
+    applied = applied_versions()
+    for version, description, _ in MIGRATIONS:
+        marker = 'x' if version in applied else ' '
+        click.echo(f'[{marker}] {version} {description}')
@@ -1,7 +1,12 @@
-from flask_app import db
+from flask_app import db, user_cache, token_revocations, calendar_cache, notification_writer, pubsub
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from datetime import datetime
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -17,6 +22,7 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, nullable=False, server_default=db.text('true'))
     student_id = db.Column(db.Text, nullable=True)
     department = db.Column(db.Text, nullable=True)
+    token_generation = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -37,8 +43,41 @@ class User(db.Model):
         }
 
 
+@event.listens_for(User, 'before_update')
+def _bump_token_generation(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.role.history.has_changes() or attrs.is_active.history.has_changes():
+        target.token_generation = (target.token_generation or 0) + 1
+
+
+@event.listens_for(User, 'after_update')
+def _revoke_stale_tokens(mapper, connection, target):
+    token_revocations.revoke_before(target.id, target.token_generation or 0)
+
+
+@event.listens_for(User, 'after_delete')
+def _revoke_deleted_user_tokens(mapper, connection, target):
+    token_revocations.revoke_before(target.id, (target.token_generation or 0) + 1)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_user_changed(mapper, connection, target):
+    inspect(target).session.info.setdefault('changed_users', set()).add(target.id)
+
+
 class DocumentRequest(db.Model):
     __tablename__ = 'document_requests'
+    __table_args__ = (
+        db.Index('ix_document_requests_created_at_id', 'created_at', 'id'),
+        db.Index('ix_document_requests_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_document_requests_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_document_requests_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_document_requests_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+        db.Index('uq_document_requests_one_pending', 'user_id', unique=True,
+                 postgresql_where=db.text("status IN ('submitted', 'payment_pending', 'pending_approval')"),
+                 sqlite_where=db.text("status IN ('submitted', 'payment_pending', 'pending_approval')")),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String, nullable=False)
@@ -52,6 +91,13 @@ class DocumentRequest(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    payments = db.relationship(
+        'Payment',
+        primaryjoin='DocumentRequest.id == foreign(Payment.request_id)',
+        order_by='Payment.id',
+        viewonly=True,
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -72,7 +118,7 @@ class Payment(db.Model):
     __tablename__ = 'payments'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    request_id = db.Column(db.Integer, nullable=True)
+    request_id = db.Column(db.Integer, nullable=True, index=True)
     amount = db.Column(db.Integer, nullable=False)
     status = db.Column(db.Text, nullable=False, server_default='pending')
     transaction_id = db.Column(db.Text, nullable=True)
@@ -93,6 +139,17 @@ class Payment(db.Model):
 
 class GradeChangePetition(db.Model):
     __tablename__ = 'grade_change_petitions'
+    __table_args__ = (
+        db.Index('ix_grade_change_petitions_created_at_id', 'created_at', 'id'),
+        db.Index('ix_grade_change_petitions_instructor_id_created_at_id', 'instructor_id', 'created_at', 'id'),
+        db.Index('ix_grade_change_petitions_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_grade_change_petitions_course_code_created_at_id', 'course_code', 'created_at', 'id'),
+        db.Index('ix_grade_change_petitions_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_grade_change_petitions_instructor_id_updated_at_id', 'instructor_id', 'updated_at', 'id'),
+        db.Index('uq_grade_change_petitions_one_pending', 'instructor_id', 'student_id', 'course_code', unique=True,
+                 postgresql_where=db.text("status IN ('submitted', 'pending_approval')"),
+                 sqlite_where=db.text("status IN ('submitted', 'pending_approval')")),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     instructor_id = db.Column(db.String, nullable=False)
@@ -124,6 +181,17 @@ class GradeChangePetition(db.Model):
 
 class MajorApplication(db.Model):
     __tablename__ = 'major_applications'
+    __table_args__ = (
+        db.Index('ix_major_applications_created_at_id', 'created_at', 'id'),
+        db.Index('ix_major_applications_student_id_created_at_id', 'student_id', 'created_at', 'id'),
+        db.Index('ix_major_applications_student_id_status_created_at', 'student_id', 'status', 'created_at'),
+        db.Index('ix_major_applications_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_major_applications_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_major_applications_student_id_updated_at_id', 'student_id', 'updated_at', 'id'),
+        db.Index('uq_major_applications_one_pending', 'student_id', unique=True,
+                 postgresql_where=db.text("status IN ('submitted', 'pending_approval')"),
+                 sqlite_where=db.text("status IN ('submitted', 'pending_approval')")),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     student_id = db.Column(db.String, nullable=False)
@@ -134,6 +202,7 @@ class MajorApplication(db.Model):
     status = db.Column(db.Text, nullable=False, server_default='submitted')
     admin_comment = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
         return {
@@ -146,11 +215,38 @@ class MajorApplication(db.Model):
             'status': self.status,
             'adminComment': self.admin_comment,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class StatusCounter(db.Model):
+    __tablename__ = 'status_counters'
+
+    module = db.Column(db.Text, primary_key=True)
+    owner_id = db.Column(db.String, primary_key=True, default='')
+    status = db.Column(db.Text, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+
+    def to_dict(self):
+        return {
+            'module': self.module,
+            'ownerId': self.owner_id or None,
+            'status': self.status,
+            'count': self.count,
         }
 
 
 class CalendarEvent(db.Model):
     __tablename__ = 'calendar_events'
+    __table_args__ = (
+        db.Index('ix_calendar_events_start_date_id', 'start_date', 'id'),
+        db.Index('ix_calendar_events_end_date_start_date', 'end_date', 'start_date'),
+        db.Index(
+            'ix_calendar_events_recurring_start_date', 'start_date',
+            postgresql_where=db.text('recurrence IS NOT NULL'),
+            sqlite_where=db.text('recurrence IS NOT NULL'),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.Text, nullable=False)
@@ -158,6 +254,8 @@ class CalendarEvent(db.Model):
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime, nullable=True)
     type = db.Column(db.Text, nullable=False)
+    recurrence = db.Column(db.Text, nullable=True)
+    recurrence_end = db.Column(db.DateTime, nullable=True)
     created_by = db.Column(db.String, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -169,13 +267,78 @@ class CalendarEvent(db.Model):
             'startDate': self.start_date.isoformat() if self.start_date else None,
             'endDate': self.end_date.isoformat() if self.end_date else None,
             'type': self.type,
+            'recurrence': self.recurrence,
             'createdBy': self.created_by,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
 
 
+@event.listens_for(CalendarEvent, 'after_insert')
+@event.listens_for(CalendarEvent, 'after_update')
+@event.listens_for(CalendarEvent, 'after_delete')
+def _mark_calendar_changed(mapper, connection, target):
+    inspect(target).session.info['calendar_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_calendar_version(session):
+    if session.info.pop('calendar_changed', False):
+        calendar_cache.bump()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_calendar_change(session):
+    session.info.pop('calendar_changed', None)
+
+
+# The cached rows are dropped once the transaction ends, not at flush time:
+# a request that read the user between the flush and the commit would put
+# the pre-change row back in the cache. A rolled-back change is dropped too,
+# in case this session cached its own uncommitted row.
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_users', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _submit_pending_notifications(session):
+    notification_writer.submit(session.info.pop('pending_notifications', None))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_pending_notifications(session):
+    session.info.pop('pending_notifications', None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_events(session):
+    events = session.info.pop('pending_events', None)
+    if not events:
+        return
+    try:
+        pubsub.publish_many(events)
+    except Exception:
+        logger.exception('Failed to publish %d events', len(events))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_pending_events(session):
+    session.info.pop('pending_events', None)
+
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_notifications_unread_user_id', 'user_id',
+                 postgresql_where=db.text('is_read = false'),
+                 sqlite_where=db.text('is_read = 0')),
+        db.Index('ix_notifications_read_created_at', 'created_at',
+                 postgresql_where=db.text('is_read = true'),
+                 sqlite_where=db.text('is_read = 1')),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String, nullable=False)
@@ -195,3 +358,19 @@ class Notification(db.Model):
             'isRead': self.is_read,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class ArchivedNotification(db.Model):
+    __tablename__ = 'notifications_archive'
+    __table_args__ = (
+        db.Index('ix_notifications_archive_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.String, nullable=False)
+    title = db.Column(db.Text, nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    type = db.Column(db.Text, nullable=True)
+    is_read = db.Column(db.Boolean, nullable=False, server_default=db.text('true'))
+    created_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
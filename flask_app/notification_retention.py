@@ -0,0 +1,96 @@
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from flask_app import db
+from flask_app.models import ArchivedNotification, Notification
+
+ARCHIVED_COLUMNS = ['id', 'user_id', 'title', 'message', 'type', 'is_read', 'created_at']
+
+
+def _move(conn, ids, archive):
+    if archive:
+        table = Notification.__table__
+        conn.execute(insert(ArchivedNotification).from_select(
+            ARCHIVED_COLUMNS + ['archived_at'],
+            select(*[table.c[name] for name in ARCHIVED_COLUMNS], literal(datetime.utcnow()))
+            .where(table.c.id.in_(ids)),
+        ))
+    conn.execute(delete(Notification).where(Notification.id.in_(ids)))
+
+
+def _compact(condition, batch_size, archive, pause):
+    """Move rows matching `condition` in chunks of `batch_size`, one short
+    transaction per chunk, so no lock is held for the whole run."""
+    moved = 0
+    while True:
+        with db.engine.begin() as conn:
+            ids = conn.execute(select(Notification.id).where(condition).limit(batch_size)).scalars().all()
+            if ids:
+                _move(conn, ids, archive)
+        moved += len(ids)
+        if len(ids) < batch_size:
+            return moved
+        if pause:
+            time.sleep(pause)
+
+
+def _cap_boundaries(cap):
+    """Yield (user_id, created_at, id) of the newest notification past each
+    user's cap. Rows at or before it are outside the retained window."""
+    with db.engine.connect() as conn:
+        user_ids = conn.execute(
+            select(Notification.user_id).group_by(Notification.user_id).having(func.count() > cap)
+        ).scalars().all()
+    for user_id in user_ids:
+        with db.engine.connect() as conn:
+            boundary = conn.execute(
+                select(Notification.created_at, Notification.id).where(Notification.user_id == user_id)
+                .order_by(Notification.created_at.desc(), Notification.id.desc()).offset(cap).limit(1)
+            ).first()
+        if boundary is not None:
+            yield user_id, boundary.created_at, boundary.id
+
+
+def compact_notifications(max_age_days=None, per_user_cap=None, batch_size=None, archive=None, pause=0):
+    """Archive (or delete) read notifications that are older than
+    `max_age_days` or fall outside each user's newest `per_user_cap`.
+    Unread notifications are never touched. Returns counts per rule."""
+    config = current_app.config
+    max_age_days = config.get('NOTIFICATION_RETENTION_DAYS', 90) if max_age_days is None else max_age_days
+    per_user_cap = config.get('NOTIFICATION_USER_CAP', 200) if per_user_cap is None else per_user_cap
+    batch_size = batch_size or config.get('NOTIFICATION_COMPACTION_BATCH', 1000)
+    archive = config.get('NOTIFICATION_ARCHIVE', True) if archive is None else archive
+
+    is_read = Notification.is_read == True  # noqa: E712
+    expired = 0
+    if max_age_days:
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        expired = _compact(and_(is_read, Notification.created_at < cutoff), batch_size, archive, pause)
+
+    over_cap = 0
+    if per_user_cap:
+        for user_id, created_at, last_id in _cap_boundaries(per_user_cap):
+            over_cap += _compact(and_(
+                Notification.user_id == user_id,
+                is_read,
+                or_(Notification.created_at < created_at,
+                    and_(Notification.created_at == created_at, Notification.id <= last_id)),
+            ), batch_size, archive, pause)
+    return {'expired': expired, 'over_cap': over_cap}
+
+
+@click.command('compact-notifications')
+@click.option('--days', type=int, default=None, help='Retain read notifications for this many days (default NOTIFICATION_RETENTION_DAYS).')
+@click.option('--cap', type=int, default=None, help='Keep at most this many notifications per user (default NOTIFICATION_USER_CAP).')
+@click.option('--batch-size', type=int, default=None, help='Rows moved per transaction.')
+@click.option('--delete', 'delete_rows', is_flag=True, help='Delete instead of archiving.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+@with_appcontext
+def compact_notifications_command(days, cap, batch_size, delete_rows, pause):
+    """Archive read notifications outside the retention policy."""
+    counts = compact_notifications(days, cap, batch_size, archive=False if delete_rows else None, pause=pause)
+    action = 'Deleted' if delete_rows or not current_app.config.get('NOTIFICATION_ARCHIVE', True) else 'Archived'
+    click.echo(f"{action} {counts['expired']} expired and {counts['over_cap']} over-cap notifications.")
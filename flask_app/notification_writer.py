@@ -0,0 +1,135 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationWriter:
+    """Writes notifications in multi-row INSERTs off the request path.
+
+    Handlers queue notification rows on the session (see notifications.py).
+    When that transaction commits, its rows are handed to this writer as one
+    batch, and rows from a rollback are dropped. A daemon thread collects
+    batches for up to `flush_interval` seconds and writes them with one
+    INSERT per `batch_size` rows in its own transaction. With `background`
+    off (the default under TESTING), each batch is written as soon as it is
+    submitted.
+
+    Delivery is at most once. A failed write is retried once and then
+    logged and dropped. On a normal exit (atexit, and gunicorn's worker_exit
+    hook) `shutdown` writes whatever is still queued, waiting up to
+    `shutdown_timeout` seconds; a process that is killed outright loses its
+    queue.
+    """
+
+    def __init__(self):
+        self.batch_size = 1000
+        self.flush_interval = 0.2
+        self.background = True
+        self.shutdown_timeout = 10
+        self.batches_written = 0
+        self._app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def init_app(self, app):
+        self.batch_size = app.config.setdefault('NOTIFICATION_BATCH_SIZE', 1000)
+        self.flush_interval = app.config.setdefault('NOTIFICATION_FLUSH_INTERVAL', 0.2)
+        self.background = app.config.setdefault('NOTIFICATION_WRITER_BACKGROUND', not app.config.get('TESTING'))
+        self.shutdown_timeout = app.config.setdefault('NOTIFICATION_SHUTDOWN_TIMEOUT', 10)
+        self.shutdown()
+        self._app = app
+        self.batches_written = 0
+
+    def submit(self, rows):
+        if not rows:
+            return
+        if not self.background:
+            self._write_with_retry(rows)
+            return
+        self._ensure_thread()
+        self._queue.put(rows)
+
+    def drain(self):
+        """Block until every submitted batch has been written."""
+        self._queue.join()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='notification-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            rows = self._queue.get()
+            if rows is None:
+                self._queue.task_done()
+                return
+            taken = 1
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                try:
+                    more = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                taken += 1
+                if more is None:
+                    stop = True
+                    break
+                rows = rows + more
+            try:
+                self._write_with_retry(rows)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_with_retry(self, rows):
+        # The INSERTs run in one transaction, so a retry cannot duplicate rows.
+        try:
+            self._write(rows)
+            return
+        except Exception:
+            logger.warning('Failed to write %d notifications, retrying', len(rows), exc_info=True)
+        try:
+            self._write(rows)
+        except Exception:
+            logger.exception('Dropped %d notifications after a failed retry', len(rows))
+
+    def _write(self, rows):
+        from sqlalchemy import insert
+        from flask_app import db, pubsub
+        from flask_app.models import Notification
+        from flask_app.pubsub import user_channel
+        with self._app.app_context():
+            with db.engine.begin() as conn:
+                for start in range(0, len(rows), self.batch_size):
+                    conn.execute(insert(Notification).values(rows[start:start + self.batch_size]))
+                    self.batches_written += 1
+        try:
+            pubsub.publish_many([(user_channel(row['user_id']), 'notification', {
+                'title': row['title'],
+                'message': row['message'],
+                'type': row['type'],
+                'createdAt': row['created_at'].isoformat(),
+            }) for row in rows])
+        except Exception:
+            logger.exception('Failed to publish %d notification events', len(rows))
+
+    def shutdown(self):
+        with self._lock:
+            if self._thread is not None:
+                # The sentinel is queued behind every pending batch, so the
+                # thread writes them all before it stops.
+                self._queue.put(None)
+                self._thread.join(timeout=self.shutdown_timeout)
+            self._thread = None
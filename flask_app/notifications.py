@@ -0,0 +1,52 @@
+from datetime import datetime
+from flask_app import db
+from flask_app.pubsub import ADMIN_CHANNEL, user_channel
+
+PENDING_KEY = 'pending_notifications'
+PENDING_EVENTS_KEY = 'pending_events'
+
+MODULE_LABELS = {
+    'document_requests': ('document_request', 'Document request'),
+    'petitions': ('petition', 'Grade change petition'),
+    'major_applications': ('major_application', 'Major application'),
+}
+
+
+def notify(user_id, title, message, type=None):
+    """Queue a notification on the current session. It is written by the
+    notification writer after the transaction commits, and dropped if it
+    rolls back."""
+    db.session.info.setdefault(PENDING_KEY, []).append({
+        'user_id': user_id,
+        'title': title,
+        'message': message,
+        'type': type,
+        'is_read': False,
+        'created_at': datetime.utcnow(),
+    })
+
+
+def publish_after_commit(channel, event, data):
+    """Queue a server-sent event on the current session; it is published
+    once the transaction commits."""
+    db.session.info.setdefault(PENDING_EVENTS_KEY, []).append((channel, event, data))
+
+
+def publish_status_change(module, owner_id, record_id, status, admin=True):
+    """Tell the owner (and, unless `admin` is False, admins) about a status
+    change. Bulk updates send admins one summary instead."""
+    data = {'module': module, 'id': record_id, 'status': status}
+    publish_after_commit(user_channel(owner_id), 'status', data)
+    if admin:
+        publish_after_commit(ADMIN_CHANNEL, 'status', data)
+
+
+def publish_bulk_status_change(module, record_ids, status):
+    publish_after_commit(ADMIN_CHANNEL, 'status', {'module': module, 'ids': record_ids, 'status': status})
+
+
+def notify_status_change(module, owner_id, record_id, status, admin=True):
+    notification_type, label = MODULE_LABELS[module]
+    readable = status.replace('_', ' ')
+    notify(owner_id, f'{label} {readable}', f'{label} #{record_id} is now {readable}.', notification_type)
+    publish_status_change(module, owner_id, record_id, status, admin)
@@ -0,0 +1,142 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from flask import current_app, request
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id):
+    payload = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(payload)
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+def is_paginated():
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def parse_limit():
+    raw = request.args.get('limit')
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError('Invalid limit')
+    if limit < 1:
+        raise PaginationError('Invalid limit')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _after(sort_column, id_column, sort_value, row_id, descending):
+    """Rows after (sort_value, row_id) in paginate's order. NULL sort values
+    come first when descending and last when ascending, which is the order a
+    default index on (sort_column, id_column) is scanned in on Postgres."""
+    if sort_value is None:
+        later_id = id_column < row_id if descending else id_column > row_id
+        rest = and_(sort_column.is_(None), later_id)
+        return or_(rest, sort_column.isnot(None)) if descending else rest
+    key = tuple_(sort_column, id_column)
+    if descending:
+        return key < tuple_(sort_value, row_id)
+    return or_(key > tuple_(sort_value, row_id), sort_column.is_(None))
+
+
+def paginate(query, sort_column, id_column, descending=True):
+    """Apply keyset pagination on (sort_column, id_column) using the request's
+    `limit` and `cursor` arguments. Returns (rows, next_cursor)."""
+    limit = parse_limit()
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.filter(_after(sort_column, id_column, *decode_cursor(cursor), descending))
+
+    if descending:
+        query = query.order_by(sort_column.desc().nulls_first(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc().nulls_last(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def is_change_feed():
+    return 'since' in request.args
+
+
+def parse_since():
+    """Read `since`, either an ISO timestamp or the `watermark` of a previous
+    change feed response, as an exclusive (updated_at, id) bound."""
+    raw = request.args['since']
+    try:
+        value = datetime.fromisoformat(raw.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            bound = decode_cursor(raw)
+        except PaginationError:
+            raise PaginationError('Invalid since')
+        if bound[0] is None:
+            raise PaginationError('Invalid since')
+        return bound
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value, 0
+
+
+def change_feed(scoped, filtered, updated_column, id_column):
+    """Return rows of `scoped` changed after the request's `since` bound,
+    oldest change first and at most `limit` of them, as (rows, deleted_ids,
+    watermark, has_more). Changed rows that `filtered` no longer matches are
+    returned only as deleted_ids, so clients can drop them from a filtered
+    view. Pass `watermark` back as `since` to continue.
+
+    updated_at is stamped before commit, so a transaction that commits late
+    can make a row appear behind rows already returned. The watermark is
+    therefore never later than CHANGE_FEED_SAFETY_MARGIN seconds ago: changes
+    newer than that are returned but re-scanned on the next call, and clients
+    merge them by id."""
+    limit = parse_limit()
+    since = parse_since()
+    key = tuple_(updated_column, id_column)
+    changed = scoped.filter(key > tuple_(*since)) \
+        .order_by(updated_column.asc(), id_column.asc()).limit(limit + 1).all()
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+    if not changed:
+        return [], [], request.args['since'], False
+
+    ids = [getattr(row, id_column.key) for row in changed]
+    matching = {row_id for row_id, in filtered.with_entities(id_column).filter(id_column.in_(ids))}
+    last = changed[-1]
+    bound = (getattr(last, updated_column.key), getattr(last, id_column.key))
+    margin = timedelta(seconds=current_app.config.get('CHANGE_FEED_SAFETY_MARGIN', 10))
+    horizon = (datetime.utcnow() - margin, 0)
+    if bound > horizon:
+        # Held back: the next call starts inside the window already returned,
+        # so stop paging rather than loop over the same rows.
+        bound = max(horizon, since)
+        has_more = False
+    watermark = encode_cursor(*bound)
+    rows = [row for row in changed if getattr(row, id_column.key) in matching]
+    deleted = [row_id for row_id in ids if row_id not in matching]
+    return rows, deleted, watermark, has_more
@@ -0,0 +1,207 @@
+import json
+import logging
+import queue
+import select
+import threading
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CHANNEL = 'admins'
+PG_CHANNEL = 'registrar_events'
+# NOTIFY payloads must stay under 8000 bytes.
+PG_PAYLOAD_LIMIT = 7500
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class PubSubFull(RuntimeError):
+    pass
+
+
+class Subscription:
+    """A subscriber's bounded mailbox. Messages that arrive while it is
+    full are dropped; clients refetch on reconnect anyway."""
+
+    def __init__(self, pubsub, channels, max_queue):
+        self.channels = channels
+        self.dropped = 0
+        self._pubsub = pubsub
+        self._queue = queue.Queue(maxsize=max_queue)
+
+    def put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._pubsub.unsubscribe(self)
+
+
+class PubSub:
+    """Per-process fan-out of events to server-sent event subscribers.
+
+    Each subscriber owns a small queue, so an idle connection costs one
+    blocked thread (or greenlet) and no database connection. With the
+    default 'memory' backend, events only reach subscribers in the
+    publishing process. The 'postgres' backend relays events between
+    worker processes with LISTEN/NOTIFY on the application's database.
+    Each process runs one listener thread that delivers what it hears
+    locally.
+    """
+
+    def __init__(self):
+        self.backend = 'memory'
+        self.max_queue = 100
+        self.max_subscribers = 200
+        self._app = None
+        self._channels = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._relay = None
+
+    def init_app(self, app):
+        self.backend = app.config.setdefault('PUBSUB_BACKEND', 'memory')
+        self.max_queue = app.config.setdefault('PUBSUB_QUEUE_SIZE', 100)
+        self.max_subscribers = app.config.setdefault('PUBSUB_MAX_SUBSCRIBERS', 200)
+        if self.backend not in ('memory', 'postgres'):
+            raise ValueError(f'Unknown PUBSUB_BACKEND {self.backend!r}')
+        if self._relay is not None:
+            self._relay.stop()
+        self._relay = PostgresRelay(self, app) if self.backend == 'postgres' else None
+        self._app = app
+        with self._lock:
+            self._channels = {}
+            self._count = 0
+
+    def subscribe(self, channels):
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise PubSubFull()
+            subscription = Subscription(self, list(channels), self.max_queue)
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+            self._count += 1
+        if self._relay is not None:
+            self._relay.ensure_listening()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            removed = False
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers and subscription in subscribers:
+                    subscribers.discard(subscription)
+                    removed = True
+                    if not subscribers:
+                        del self._channels[channel]
+            if removed:
+                self._count -= 1
+
+    def publish(self, channel, event, data):
+        self.publish_many([(channel, event, data)])
+
+    def publish_many(self, events):
+        """Publish (channel, event, data) tuples together; with the postgres
+        backend they share one NOTIFY round-trip."""
+        messages = [{'channel': channel, 'event': event, 'data': data} for channel, event, data in events]
+        if not messages:
+            return
+        if self._relay is not None:
+            self._relay.send(messages)
+        else:
+            for message in messages:
+                self.deliver(message)
+
+    def deliver(self, message):
+        with self._lock:
+            subscribers = list(self._channels.get(message['channel'], ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscriber_count(self):
+        with self._lock:
+            return self._count
+
+
+class PostgresRelay:
+    """Relays PubSub messages between processes with LISTEN/NOTIFY. A
+    publisher's own process receives its NOTIFY too, so messages are
+    delivered locally only by the listener thread."""
+
+    def __init__(self, pubsub, app):
+        self.pubsub = pubsub
+        self.app = app
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _payloads(messages):
+        """Pack messages into JSON arrays that each fit in one NOTIFY."""
+        payloads, batch, size = [], [], 2
+        for message in messages:
+            encoded = json.dumps(message, default=str)
+            if batch and size + len(encoded) + 1 > PG_PAYLOAD_LIMIT:
+                payloads.append(f"[{','.join(batch)}]")
+                batch, size = [], 2
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            payloads.append(f"[{','.join(batch)}]")
+        return payloads
+
+    def send(self, messages):
+        from sqlalchemy import text
+        from flask_app import db
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload'),
+                    {'channel': PG_CHANNEL, 'payloads': self._payloads(messages)},
+                )
+
+    def ensure_listening(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._listen, name='pubsub-listener', daemon=True)
+                    self._thread.start()
+
+    def _listen(self):
+        from flask_app import db
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    raw = db.engine.raw_connection()
+                # Keep the autocommit LISTEN connection out of the pool.
+                raw.detach()
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    connection.cursor().execute(f'LISTEN {PG_CHANNEL}')
+                    while not self._stop.is_set():
+                        if select.select([connection], [], [], 5) == ([], [], []):
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            notify = connection.notifies.pop(0)
+                            for message in json.loads(notify.payload):
+                                self.pubsub.deliver(message)
+                finally:
+                    raw.close()
+            except Exception:
+                logger.exception('Pub/sub listener failed; reconnecting')
+                self._stop.wait(1)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,143 @@
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+EXPANSION_CACHE_SIZE = 4096
+# Upper bound on occurrences expanded per event and window, whatever the rule.
+MAX_OCCURRENCES = 1000
+
+
+class RecurrenceError(ValueError):
+    pass
+
+
+def parse_rule(text):
+    """Parse the supported RRULE subset (FREQ, INTERVAL, COUNT, UNTIL) into
+    a dict. Raises RecurrenceError for anything else."""
+    rule = {'freq': None, 'interval': 1, 'count': None, 'until': None}
+    try:
+        parts = dict(part.split('=', 1) for part in text.upper().strip().split(';') if part)
+    except (AttributeError, ValueError):
+        raise RecurrenceError('Invalid recurrence')
+    for key, value in parts.items():
+        try:
+            if key == 'FREQ':
+                if value not in FREQUENCIES:
+                    raise ValueError
+                rule['freq'] = value
+            elif key == 'INTERVAL':
+                rule['interval'] = int(value)
+                if rule['interval'] < 1:
+                    raise ValueError
+            elif key == 'COUNT':
+                rule['count'] = int(value)
+                if rule['count'] < 1:
+                    raise ValueError
+            elif key == 'UNTIL':
+                rule['until'] = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S' if 'T' in value else '%Y%m%d')
+            else:
+                raise ValueError
+        except ValueError:
+            raise RecurrenceError(f'Unsupported recurrence {key}')
+    if rule['freq'] is None:
+        raise RecurrenceError('Recurrence FREQ is required')
+    if rule['count'] and rule['until']:
+        raise RecurrenceError('Recurrence cannot have both COUNT and UNTIL')
+    return rule
+
+
+def format_rule(rule):
+    parts = [f"FREQ={rule['freq']}"]
+    if rule['interval'] != 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule['count']:
+        parts.append(f"COUNT={rule['count']}")
+    if rule['until']:
+        parts.append(f"UNTIL={rule['until'].strftime('%Y%m%dT%H%M%SZ')}")
+    return ';'.join(parts)
+
+
+def _add_months(value, months):
+    """Shift `value` by whole months, or return None if the day does not
+    exist in the target month (RFC 5545 skips such occurrences)."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if year > 9999 or value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+
+def _starts(rule, start_date, not_before=None):
+    """Yield occurrence start times in order, skipping ahead to roughly
+    `not_before` for fixed-length frequencies."""
+    interval = rule['interval']
+    n = 0
+    if rule['freq'] in ('DAILY', 'WEEKLY'):
+        step_days = interval * (7 if rule['freq'] == 'WEEKLY' else 1)
+        if not_before is not None and not_before > start_date:
+            n = (not_before - start_date).days // step_days
+        while True:
+            try:
+                yield n, start_date + timedelta(days=n * step_days)
+            except OverflowError:
+                return
+            n += 1
+    else:
+        months = interval * (12 if rule['freq'] == 'YEARLY' else 1)
+        k = 0
+        while True:
+            if start_date.year + (start_date.month - 1 + k * months) // 12 > 9999:
+                return
+            value = _add_months(start_date, k * months)
+            k += 1
+            if value is not None:
+                yield n, value
+                n += 1
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def expand(rule_text, start_date, end_date, window_start, window_end, end_inclusive=False):
+    """Return (start, end) pairs for occurrences overlapping the window,
+    at most MAX_OCCURRENCES of them.
+
+    Results are cached on the rule and the event's own dates as well as the
+    window, so a changed event never hits a stale expansion.
+    """
+    rule = parse_rule(rule_text)
+    duration = (end_date - start_date) if end_date else None
+    lookback = duration or timedelta(0)
+    not_before = window_start - lookback if window_start - datetime.min > lookback else datetime.min
+    occurrences = []
+    for n, occurrence_start in _starts(rule, start_date, not_before):
+        if rule['count'] is not None and n >= rule['count']:
+            break
+        if rule['until'] is not None and occurrence_start > rule['until']:
+            break
+        if occurrence_start > window_end or (occurrence_start == window_end and not end_inclusive):
+            break
+        try:
+            occurrence_end = occurrence_start + duration if duration is not None else None
+        except OverflowError:
+            break
+        if (occurrence_end or occurrence_start) >= window_start:
+            occurrences.append((occurrence_start, occurrence_end))
+            if len(occurrences) >= MAX_OCCURRENCES:
+                break
+    return tuple(occurrences)
+
+
+def series_end(rule_text, start_date, end_date):
+    """End of the last occurrence, or None if the series never ends."""
+    rule = parse_rule(rule_text)
+    duration = (end_date - start_date) if end_date else timedelta(0)
+    if rule['until'] is not None:
+        return rule['until'] + duration
+    if rule['count'] is None:
+        return None
+    last = None
+    for n, occurrence_start in _starts(rule, start_date):
+        if n >= rule['count']:
+            break
+        last = occurrence_start
+    return last + duration
@@ -0,0 +1,66 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+
+
+class RefreshFamilies:
+    """Per-process LRU of login sessions ("families") -> the sequence number
+    of the newest refresh token issued in each.
+
+    A refresh token carries its family and sequence number. Presenting the
+    newest one advances the family; presenting an older one means the token
+    was copied and replayed, so the family is revoked and every token in it
+    stops working. Nothing is written to the database. A family this process
+    has not seen (issued by another worker, evicted, or from before a
+    restart), or has only seen at an older sequence number, is adopted at
+    the presented one, so a replay is caught by any worker that already
+    served a later refresh in the family.
+    """
+
+    REVOKED = -1
+
+    def __init__(self, max_size=10000, ttl=86400):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('REFRESH_FAMILY_CACHE_SIZE', 10000)
+        ttl = app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 86400)
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
+        self.clear()
+
+    def _set(self, family, seq):
+        if self.max_size <= 0:
+            return
+        self._entries[family] = (seq, time.monotonic() + self.ttl)
+        self._entries.move_to_end(family)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def start(self):
+        """Open a family for a new login. Returns (family, seq)."""
+        family = uuid.uuid4().hex
+        with self._lock:
+            self._set(family, 0)
+        return family, 0
+
+    def rotate(self, family, seq):
+        """Advance `family` past `seq`. Returns the next sequence number, or
+        None if a newer token was already presented (the family is revoked)."""
+        with self._lock:
+            entry = self._entries.get(family)
+            if entry is not None and entry[1] > time.monotonic():
+                newest = entry[0]
+                if newest == self.REVOKED or seq < newest:
+                    self._set(family, self.REVOKED)
+                    return None
+            self._set(family, seq + 1)
+            return seq + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
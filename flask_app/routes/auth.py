@@ -1,12 +1,17 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, get_jwt_identity, verify_jwt_in_request, jwt_required
-from flask_app import db, bcrypt
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, get_jwt_identity, jwt_required
+from flask_app import db, bcrypt, user_cache, password_pool, refresh_families
+from flask_app.hashing import HashPoolSaturated, needs_rehash
 from flask_app.models import User
-from flask_app.decorators import jwt_required_with_user
+from flask_app.decorators import jwt_required_with_user, role_required, user_claims, load_user
 
 auth_bp = Blueprint('auth', __name__)
 
 
+def _refresh_token(user, claims, family, seq):
+    return create_refresh_token(identity=user.id, additional_claims={**claims, 'fam': family, 'seq': seq})
+
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -23,15 +28,30 @@ def login():
     if not user:
         return jsonify({'message': 'Invalid credentials'}), 401
 
-    if not bcrypt.check_password_hash(user.password_hash, password):
+    try:
+        password_ok = password_pool.run(bcrypt.check_password_hash, user.password_hash, password)
+    except (HashPoolSaturated, TimeoutError):
+        response = jsonify({'message': 'Too many logins in progress, please retry shortly'})
+        response.headers['Retry-After'] = str(password_pool.retry_after)
+        return response, 503
+    if not password_ok:
         return jsonify({'message': 'Invalid credentials'}), 401
 
     if not user.is_active:
         return jsonify({'message': 'Account is deactivated'}), 403
 
-    access_token = create_access_token(identity=user.id)
+    rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+    if needs_rehash(user.password_hash, rounds):
+        try:
+            user.password_hash = password_pool.run(bcrypt.generate_password_hash, password, rounds).decode('utf-8')
+            db.session.commit()
+        except (HashPoolSaturated, TimeoutError):
+            pass
+
+    claims = user_claims(user)
     return jsonify({
-        'access_token': access_token,
+        'access_token': create_access_token(identity=user.id, additional_claims=claims),
+        'refresh_token': _refresh_token(user, claims, *refresh_families.start()),
         'user': user.to_dict()
     }), 200
 
@@ -43,14 +63,38 @@ def get_current_user(current_user=None):
 
 
 @auth_bp.route('/refresh', methods=['POST'])
-@jwt_required()
+@jwt_required(refresh=True)
 def refresh_token():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    # Rotation: each refresh token belongs to a login session (family) and
+    # carries a sequence number. Presenting one older than the newest this
+    # worker has issued in the family is a replay and revokes the family
+    # (see RefreshFamilies). The role and generation in the new tokens always
+    # come from the user cache or the users table, never from the presented
+    # token, so a demotion or deactivation made by any worker is picked up
+    # here within USER_CACHE_TTL. Nothing is written, and the database is
+    # only read on a user cache miss.
+    token = get_jwt()
+    family, seq = token.get('fam'), token.get('seq')
+    if family is None or not isinstance(seq, int):
+        return jsonify({'message': 'Invalid token'}), 401
+    seq = refresh_families.rotate(family, seq)
+    if seq is None:
+        return jsonify({'message': 'Refresh token has already been used'}), 401
+    user = load_user(get_jwt_identity())
     if not user or not user.is_active:
         return jsonify({'message': 'User not found or inactive'}), 401
-    new_token = create_access_token(identity=user.id)
-    return jsonify({'access_token': new_token}), 200
+
+    claims = user_claims(user)
+    return jsonify({
+        'access_token': create_access_token(identity=user.id, additional_claims=claims),
+        'refresh_token': _refresh_token(user, claims, family, seq),
+    }), 200
+
+
+@auth_bp.route('/user-cache', methods=['GET'])
+@role_required('admin')
+def user_cache_stats(current_user=None):
+    return jsonify(user_cache.stats()), 200
 
 
 @auth_bp.route('/logout', methods=['POST'])
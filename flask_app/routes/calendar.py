@@ -1,17 +1,173 @@
-from flask import Blueprint, request, jsonify
-from flask_app import db
+import hashlib
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeSerializer
+from flask_app import db, calendar_cache
 from flask_app.models import CalendarEvent
-from flask_app.decorators import jwt_required_with_user, role_required
-from datetime import datetime
+from flask_app.decorators import jwt_required_with_user, role_required, load_user
+from flask_app.pagination import PaginationError, is_paginated, paginate
+from flask_app.filters import FilterError, parse_datetime_param
+from flask_app.ical import stream_calendar
+from flask_app.recurrence import RecurrenceError, expand, format_rule, parse_rule, series_end
+from flask_app.calendar_conflicts import CONFLICT_PRONE_TYPES, Occurrence, conflicting_pairs, occurrence_dict, occurrence_span
+from sqlalchemy import func, or_, select, union
+from datetime import datetime, timedelta, timezone
 
 cal_bp = Blueprint('calendar', __name__)
 
+EVENT_TYPES = ['holiday', 'exam', 'deadline', 'event']
+FEED_BATCH_SIZE = 500
+# How far ahead an open-ended recurring event is checked for conflicts, and
+# the default span of the conflicts report.
+CONFLICT_HORIZON = timedelta(days=366)
+# Longest from/to window a request may ask for; recurring events are
+# expanded across it.
+MAX_WINDOW = timedelta(days=366)
+
+
+def calendar_window(query, start=None, end=None, end_inclusive=False):
+    """Limit `query` to events overlapping the window. An event spans
+    start_date to end_date, or just start_date when end_date is null.
+
+    Overlapping events are those starting inside the window, those that
+    started before it and are still running, and recurring series that
+    started before it and have not ended. The sets are collected separately
+    and unioned so each is a range search on its own index: (start_date, id),
+    (end_date, start_date) and the partial index of recurring events.
+    """
+    before_end = None
+    if end is not None:
+        before_end = CalendarEvent.start_date <= end if end_inclusive else CalendarEvent.start_date < end
+    if start is None:
+        return query if before_end is None else query.filter(before_end)
+
+    starts_inside = select(CalendarEvent.id).where(CalendarEvent.start_date >= start)
+    if before_end is not None:
+        starts_inside = starts_inside.where(before_end)
+    still_running = select(CalendarEvent.id).where(CalendarEvent.end_date >= start, CalendarEvent.start_date < start)
+    recurring = select(CalendarEvent.id).where(
+        CalendarEvent.recurrence.isnot(None),
+        CalendarEvent.start_date < start,
+        or_(CalendarEvent.recurrence_end.is_(None), CalendarEvent.recurrence_end >= start),
+    )
+    return query.filter(CalendarEvent.id.in_(union(starts_inside, still_running, recurring)))
+
+
+def _request_window():
+    start = parse_datetime_param('from')
+    end = parse_datetime_param('to', end_of_day=True)
+    if start is not None and end is not None:
+        if end < start:
+            raise FilterError('from must not be after to')
+        if end - start > MAX_WINDOW:
+            raise FilterError(f'from/to may span at most {MAX_WINDOW.days} days')
+    end_inclusive = end is not None and len(request.args['to']) != 10
+    return start, end, end_inclusive
+
+
+def expand_occurrences(events, start, end, end_inclusive=False):
+    """Serialize `events`, replacing each recurring event with its
+    occurrences inside the window, ordered by occurrence start."""
+    items = []
+    for event in events:
+        data = event.to_dict()
+        if not event.recurrence:
+            items.append((event.start_date, event.id, data))
+            continue
+        for occurrence_start, occurrence_end in expand(
+                event.recurrence, event.start_date, event.end_date, start, end, end_inclusive):
+            items.append((occurrence_start, event.id, {
+                **data,
+                'startDate': occurrence_start.isoformat(),
+                'endDate': occurrence_end.isoformat() if occurrence_end else None,
+            }))
+    items.sort(key=lambda item: item[:2])
+    return [data for _, _, data in items]
+
+
+def event_occurrences(events, start, end):
+    """Yield an Occurrence for each event, or for each occurrence of a
+    recurring event within [start, end]."""
+    for event in events:
+        if event.recurrence:
+            spans = expand(event.recurrence, event.start_date, event.end_date, start, end, True)
+        else:
+            spans = [(event.start_date, event.end_date)]
+        for occurrence_start, occurrence_end in spans:
+            yield Occurrence(event.id, event.title, event.type, occurrence_start, occurrence_end)
+
+
+def _conflict_candidates(start, end, exclude_id=None):
+    # Widened by a day because events without an end block their whole day.
+    start, end = start - timedelta(days=1), end + timedelta(days=1)
+    query = CalendarEvent.query.filter(CalendarEvent.type.in_(CONFLICT_PRONE_TYPES))
+    if exclude_id is not None:
+        query = query.filter(CalendarEvent.id != exclude_id)
+    return calendar_window(query, start, end, True).all(), start, end
+
+
+def find_conflicts(event):
+    """Occurrences of other events that conflict with `event`."""
+    if event.type not in CONFLICT_PRONE_TYPES:
+        return []
+    if event.recurrence:
+        last = event.start_date + CONFLICT_HORIZON
+        if event.recurrence_end is not None:
+            last = min(last, event.recurrence_end)
+    else:
+        last = event.end_date or event.start_date
+    candidates, start, end = _conflict_candidates(event.start_date, last, exclude_id=event.id)
+    if not candidates:
+        return []
+
+    conflicts = {}
+    for a, b in conflicting_pairs(event_occurrences([event] + candidates, start, end)):
+        if (a.id == event.id) == (b.id == event.id):
+            continue
+        other = b if a.id == event.id else a
+        conflicts[(other.start, other.id)] = occurrence_dict(other)
+    return [conflicts[key] for key in sorted(conflicts)]
+
+
+def _parse_timestamp(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 @cal_bp.route('/calendar', methods=['GET'])
 @jwt_required_with_user
 def list_calendar_events(current_user=None):
-    events = CalendarEvent.query.order_by(CalendarEvent.start_date.asc()).all()
-    return jsonify([e.to_dict() for e in events]), 200
+    # The payload is the same for every user, so it is served from the
+    # calendar cache and revalidated with a strong ETag.
+    key = request.query_string
+    cached = calendar_cache.get(key)
+    if cached is None:
+        version = calendar_cache.version
+        try:
+            start, end, end_inclusive = _request_window()
+            query = calendar_window(CalendarEvent.query, start, end, end_inclusive)
+            if is_paginated():
+                # Pages are keyed on stored rows, so recurring events are
+                # returned once with their rule rather than expanded.
+                events, next_cursor = paginate(query, CalendarEvent.start_date, CalendarEvent.id, descending=False)
+                payload = {'items': [e.to_dict() for e in events], 'nextCursor': next_cursor}
+            else:
+                events = query.order_by(CalendarEvent.start_date.asc(), CalendarEvent.id.asc()).all()
+                if start is not None and end is not None:
+                    payload = expand_occurrences(events, start, end, end_inclusive)
+                else:
+                    payload = [e.to_dict() for e in events]
+        except (FilterError, PaginationError) as e:
+            return jsonify({'message': str(e)}), 400
+        cached = calendar_cache.set(version, key, jsonify(payload).get_data())
+
+    body, etag = cached
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 
 @cal_bp.route('/calendar', methods=['POST'])
@@ -25,31 +181,130 @@ def create_calendar_event(current_user=None):
         return jsonify({'message': 'title, startDate, and type are required'}), 400
 
     event_type = data['type']
-    if event_type not in ['holiday', 'exam', 'deadline', 'event']:
+    if event_type not in EVENT_TYPES:
         return jsonify({'message': 'Invalid event type'}), 400
 
     try:
-        start_date = datetime.fromisoformat(data['startDate'].replace('Z', '+00:00'))
+        start_date = _parse_timestamp(data['startDate'])
     except (ValueError, AttributeError):
         return jsonify({'message': 'Invalid startDate format'}), 400
 
     end_date = None
     if data.get('endDate'):
         try:
-            end_date = datetime.fromisoformat(data['endDate'].replace('Z', '+00:00'))
+            end_date = _parse_timestamp(data['endDate'])
         except (ValueError, AttributeError):
             return jsonify({'message': 'Invalid endDate format'}), 400
 
+    recurrence = recurrence_end = None
+    if data.get('recurrence'):
+        try:
+            recurrence = format_rule(parse_rule(data['recurrence']))
+        except RecurrenceError as e:
+            return jsonify({'message': str(e)}), 400
+        recurrence_end = series_end(recurrence, start_date, end_date)
+
     event = CalendarEvent(
         title=data['title'],
         description=data.get('description'),
         start_date=start_date,
         end_date=end_date,
         type=event_type,
+        recurrence=recurrence,
+        recurrence_end=recurrence_end,
         created_by=current_user.id,
         created_at=datetime.utcnow(),
     )
     db.session.add(event)
     db.session.commit()
 
-    return jsonify(event.to_dict()), 201
+    return jsonify({**event.to_dict(), 'conflicts': find_conflicts(event)}), 201
+
+
+@cal_bp.route('/calendar/conflicts', methods=['GET'])
+@role_required('admin')
+def calendar_conflicts(current_user=None):
+    try:
+        start, end, _ = _request_window()
+    except FilterError as e:
+        return jsonify({'message': str(e)}), 400
+    if start is None:
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    if end is None:
+        end = start + CONFLICT_HORIZON
+
+    events, expand_start, expand_end = _conflict_candidates(start, end)
+    report = []
+    for a, b in conflicting_pairs(event_occurrences(events, expand_start, expand_end)):
+        (a_start, a_end), (b_start, b_end) = occurrence_span(a), occurrence_span(b)
+        if max(a_start, b_start) < end and min(a_end, b_end) > start:
+            report.append({'first': occurrence_dict(a), 'second': occurrence_dict(b)})
+    return jsonify({'from': start.isoformat(), 'to': end.isoformat(), 'conflicts': report}), 200
+
+
+def _feed_serializer():
+    return URLSafeSerializer(current_app.config['JWT_SECRET_KEY'], salt='calendar-feed')
+
+
+@cal_bp.route('/calendar/feed-token', methods=['GET'])
+@jwt_required_with_user
+def calendar_feed_token(current_user=None):
+    # Calendar apps cannot send a bearer header or refresh a short-lived
+    # token, so subscriptions use a signed token tied to the user's token
+    # generation; deactivating the user or changing their role revokes it.
+    token = _feed_serializer().dumps({'sub': current_user.id, 'gen': current_user.token_generation or 0})
+    return jsonify({'token': token, 'url': f'/api/calendar.ics?token={token}'}), 200
+
+
+def _feed_user():
+    token = request.args.get('token')
+    if token:
+        try:
+            data = _feed_serializer().loads(token)
+        except BadSignature:
+            return None
+        user = load_user(data.get('sub'))
+        if user is None or (user.token_generation or 0) > data.get('gen', 0):
+            return None
+        return user
+    verify_jwt_in_request()
+    return load_user(get_jwt_identity())
+
+
+@cal_bp.route('/calendar.ics', methods=['GET'])
+def calendar_feed():
+    user = _feed_user()
+    if user is None:
+        return jsonify({'message': 'Missing or invalid token'}), 401
+    if not user.is_active:
+        return jsonify({'message': 'Account is deactivated'}), 403
+
+    types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()]
+    if any(t not in EVENT_TYPES for t in types):
+        return jsonify({'message': 'Invalid type'}), 400
+    conditions = [CalendarEvent.type.in_(types)] if types else []
+
+    # Validators come from one aggregate query so polling clients get a 304
+    # without the feed being generated.
+    count, last_id, last_created = db.session.query(
+        func.count(CalendarEvent.id), func.max(CalendarEvent.id), func.max(CalendarEvent.created_at),
+    ).filter(*conditions).one()
+    etag = hashlib.sha256(f"{','.join(sorted(types))}:{count}:{last_id}:{last_created}".encode()).hexdigest()[:32]
+
+    def rows():
+        statement = (
+            select(CalendarEvent.id, CalendarEvent.title, CalendarEvent.description, CalendarEvent.start_date,
+                   CalendarEvent.end_date, CalendarEvent.type, CalendarEvent.recurrence, CalendarEvent.created_at)
+            .where(*conditions)
+            .order_by(CalendarEvent.start_date.asc(), CalendarEvent.id.asc())
+            .execution_options(yield_per=FEED_BATCH_SIZE)
+        )
+        yield from db.session.execute(statement)
+
+    response = Response(stream_with_context(stream_calendar(rows())), mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="academic-calendar.ics"'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    if last_created is not None:
+        response.last_modified = last_created
+    return response.make_conditional(request)
@@ -0,0 +1,58 @@
+from flask import Blueprint, request, jsonify
+from flask_app.decorators import jwt_required_with_user
+from flask_app.counters import ALL_OWNERS, MODULES, get_status_counts
+
+dash_bp = Blueprint('dashboard', __name__)
+
+DEFAULT_RECENT = 5
+MAX_RECENT = 50
+
+SUMMARY_MODULES = [
+    ('documentRequests', 'document_requests'),
+    ('petitions', 'petitions'),
+    ('majorApplications', 'major_applications'),
+]
+
+
+def _owner_scope(current_user, module):
+    if current_user.role == 'admin':
+        return ALL_OWNERS
+    if module == 'petitions' and current_user.role != 'instructor':
+        return None
+    return current_user.id
+
+
+def _module_summary(module, owner_id, recent):
+    if owner_id is None:
+        return {'counts': {}, 'total': 0, 'recent': []}
+
+    model, owner_column = MODULES[module]
+    counts = get_status_counts(module, owner_id)
+
+    recent_rows = []
+    if recent:
+        recent_query = model.query
+        if owner_id != ALL_OWNERS:
+            recent_query = recent_query.filter(owner_column == owner_id)
+        recent_rows = recent_query.order_by(model.created_at.desc(), model.id.desc()).limit(recent).all()
+
+    return {
+        'counts': counts,
+        'total': sum(counts.values()),
+        'recent': [row.to_dict() for row in recent_rows],
+    }
+
+
+@dash_bp.route('/dashboard/summary', methods=['GET'])
+@jwt_required_with_user
+def dashboard_summary(current_user=None):
+    try:
+        recent = int(request.args.get('recent', DEFAULT_RECENT))
+    except ValueError:
+        return jsonify({'message': 'Invalid recent'}), 400
+    recent = max(0, min(recent, MAX_RECENT))
+
+    return jsonify({
+        key: _module_summary(module, _owner_scope(current_user, module), recent)
+        for key, module in SUMMARY_MODULES
+    }), 200
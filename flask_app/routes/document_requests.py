@@ -1,28 +1,62 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from flask_app import db
-from flask_app.models import DocumentRequest, Payment
+from flask_app.models import DocumentRequest
 from flask_app.decorators import jwt_required_with_user, role_required
+from flask_app.pagination import PaginationError, change_feed, is_change_feed, is_paginated, paginate
+from flask_app.filters import FilterError, apply_filters, sort_descending
+from flask_app.counters import record_status_change, get_for_status_change
+from flask_app.notifications import notify_status_change
+from flask_app.constraints import PENDING_DOCUMENT_REQUEST_INDEX, is_unique_violation
+from flask_app.bulk import BulkUpdateError, bulk_update_status, parse_bulk_request
+from flask_app.projection import DOCUMENT_REQUEST, select_fields, serialize_document_requests, with_first_payment
 from datetime import datetime
 
 doc_bp = Blueprint('document_requests', __name__)
 
+VALID_STATUSES = ['submitted', 'payment_pending', 'pending_approval', 'approved', 'completed', 'rejected']
+VALID_TYPES = ['transcript', 'degree', 'letter', 'duplicate_degree']
+VALID_URGENCIES = ['normal', 'urgent']
+
+LIST_FILTERS = {
+    'status': (DocumentRequest.status, VALID_STATUSES),
+    'type': (DocumentRequest.type, VALID_TYPES),
+    'urgency': (DocumentRequest.urgency, VALID_URGENCIES),
+}
+
 
 @doc_bp.route('/document-requests', methods=['GET'])
 @jwt_required_with_user
 def list_document_requests(current_user=None):
-    if current_user.role == 'admin':
-        requests = DocumentRequest.query.order_by(DocumentRequest.created_at.desc()).all()
-    else:
-        requests = DocumentRequest.query.filter_by(user_id=current_user.id).order_by(DocumentRequest.created_at.desc()).all()
-
-    result = []
-    for req in requests:
-        req_dict = req.to_dict()
-        payment = Payment.query.filter_by(request_id=req.id).first()
-        if payment:
-            req_dict['payment'] = payment.to_dict()
-        result.append(req_dict)
-
+    next_cursor = None
+    try:
+        projection, extra = select_fields(DOCUMENT_REQUEST, extra=('payment',))
+        query = projection.query(DocumentRequest.query)
+        if 'payment' in extra:
+            query = with_first_payment(query)
+        if current_user.role != 'admin':
+            query = query.filter(DocumentRequest.user_id == current_user.id)
+        scoped = query
+
+        query = apply_filters(query, LIST_FILTERS, DocumentRequest.created_at)
+        descending = sort_descending()
+        if is_change_feed():
+            requests, deleted, watermark, has_more = change_feed(
+                scoped, query, DocumentRequest.updated_at, DocumentRequest.id)
+        elif is_paginated():
+            requests, next_cursor = paginate(query, DocumentRequest.created_at, DocumentRequest.id, descending)
+        else:
+            order = DocumentRequest.created_at.desc() if descending else DocumentRequest.created_at.asc()
+            requests = query.order_by(order).all()
+    except (FilterError, PaginationError) as e:
+        return jsonify({'message': str(e)}), 400
+
+    result = serialize_document_requests(requests, projection, 'payment' in extra)
+
+    if is_change_feed():
+        return jsonify({'items': result, 'deleted': deleted, 'watermark': watermark, 'hasMore': has_more}), 200
+    if is_paginated():
+        return jsonify({'items': result, 'nextCursor': next_cursor}), 200
     return jsonify(result), 200
 
 
@@ -34,21 +68,13 @@ def create_document_request(current_user=None):
         return jsonify({'message': 'Missing request body'}), 400
 
     doc_type = data.get('type')
-    if doc_type not in ['transcript', 'degree', 'letter', 'duplicate_degree']:
+    if doc_type not in VALID_TYPES:
         return jsonify({'message': 'Invalid document type'}), 400
 
     urgency = data.get('urgency', 'normal')
-    if urgency not in ['normal', 'urgent']:
+    if urgency not in VALID_URGENCIES:
         return jsonify({'message': 'Invalid urgency'}), 400
 
-    pending_statuses = ['submitted', 'payment_pending', 'pending_approval']
-    existing_pending = DocumentRequest.query.filter(
-        DocumentRequest.user_id == current_user.id,
-        DocumentRequest.status.in_(pending_statuses)
-    ).first()
-    if existing_pending:
-        return jsonify({'message': 'You already have a pending document request. Please wait until it is approved or rejected before submitting a new one.'}), 400
-
     copies = data.get('copies', 1)
     amount = data.get('amount')
     details = data.get('details')
@@ -65,6 +91,14 @@ def create_document_request(current_user=None):
         updated_at=datetime.utcnow(),
     )
     db.session.add(new_request)
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_DOCUMENT_REQUEST_INDEX):
+            return jsonify({'message': 'You already have a pending document request. Please wait until it is approved or rejected before submitting a new one.'}), 400
+        raise
+    record_status_change('document_requests', current_user.id, None, new_request.status)
     db.session.commit()
 
     return jsonify(new_request.to_dict()), 201
@@ -73,19 +107,40 @@ def create_document_request(current_user=None):
 @doc_bp.route('/document-requests/<int:req_id>/status', methods=['PATCH'])
 @role_required('admin')
 def update_document_request_status(req_id, current_user=None):
-    doc_req = DocumentRequest.query.get(req_id)
+    doc_req = get_for_status_change(DocumentRequest, req_id)
     if not doc_req:
         return jsonify({'message': 'Request not found'}), 404
 
     data = request.get_json()
     status = data.get('status')
-    valid_statuses = ['submitted', 'payment_pending', 'pending_approval', 'approved', 'completed', 'rejected']
-    if status not in valid_statuses:
+    if status not in VALID_STATUSES:
         return jsonify({'message': 'Invalid status'}), 400
 
+    if status != doc_req.status:
+        notify_status_change('document_requests', doc_req.user_id, doc_req.id, status)
+    record_status_change('document_requests', doc_req.user_id, doc_req.status, status)
     doc_req.status = status
     doc_req.admin_comment = data.get('adminComment', doc_req.admin_comment)
     doc_req.updated_at = datetime.utcnow()
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_DOCUMENT_REQUEST_INDEX):
+            return jsonify({'message': 'Another pending document request for this student already exists'}), 400
+        raise
 
     return jsonify(doc_req.to_dict()), 200
+
+
+@doc_bp.route('/document-requests/bulk-status', methods=['PATCH'])
+@role_required('admin')
+def bulk_update_document_request_status(current_user=None):
+    try:
+        ids, status, comment_given, comment = parse_bulk_request(request.get_json(), VALID_STATUSES)
+        results = bulk_update_status('document_requests', ids, status, comment_given, comment, PENDING_DOCUMENT_REQUEST_INDEX)
+    except BulkUpdateError as e:
+        return jsonify({'message': str(e)}), 400
+
+    updated = sum(1 for r in results if r['outcome'] == 'updated')
+    return jsonify({'status': status, 'updated': updated, 'results': results}), 200
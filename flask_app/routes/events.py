@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+import uuid
+from flask import Blueprint, Response, current_app, request, jsonify
+from flask_jwt_extended import get_jwt, jwt_required, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask_app import pubsub, token_revocations
+from flask_app.decorators import load_user
+from flask_app.pubsub import ADMIN_CHANNEL, PubSubFull, user_channel
+
+events_bp = Blueprint('events', __name__)
+
+# Nonces of tickets this process has already accepted, with their expiry.
+_used_tickets = {}
+_used_tickets_lock = threading.Lock()
+
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='event-stream')
+
+
+@events_bp.route('/events/ticket', methods=['POST'])
+@jwt_required()
+def event_ticket():
+    # EventSource cannot send an Authorization header, so the stream is
+    # opened with a short-lived, single-use ticket in the URL instead of the
+    # access token; URLs end up in access logs and browser history.
+    claims = get_jwt()
+    ticket = _ticket_serializer().dumps({
+        'sub': claims['sub'], 'gen': claims.get('gen', 0), 'exp': claims.get('exp'),
+        'nonce': uuid.uuid4().hex,
+    })
+    return jsonify({'ticket': ticket}), 200
+
+
+def _redeem_ticket(ticket):
+    max_age = current_app.config.get('EVENT_TICKET_MAX_AGE', 30)
+    try:
+        data = _ticket_serializer().loads(ticket, max_age=max_age)
+    except BadSignature:
+        return None
+    now = time.time()
+    with _used_tickets_lock:
+        for nonce in [n for n, expires in _used_tickets.items() if expires <= now]:
+            del _used_tickets[nonce]
+        if data.get('nonce') in _used_tickets:
+            return None
+        _used_tickets[data.get('nonce')] = now + max_age
+    return data
+
+
+def _stream_claims():
+    ticket = request.args.get('ticket')
+    if not ticket:
+        verify_jwt_in_request()
+        return get_jwt()
+    return _redeem_ticket(ticket)
+
+
+def _format(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+@events_bp.route('/events', methods=['GET'])
+def event_stream():
+    claims = _stream_claims()
+    generation = claims.get('gen', 0) if claims else 0
+    if claims is None or token_revocations.is_revoked(claims['sub'], generation):
+        return jsonify({'message': 'Missing or invalid token'}), 401
+    user = load_user(claims['sub'])
+    if user is None:
+        return jsonify({'message': 'Missing or invalid token'}), 401
+    if not user.is_active:
+        return jsonify({'message': 'Account is deactivated'}), 403
+
+    channels = [user_channel(user.id)]
+    if user.role == 'admin':
+        channels.append(ADMIN_CHANNEL)
+    try:
+        subscription = pubsub.subscribe(channels)
+    except PubSubFull:
+        response = jsonify({'message': 'Too many open event streams'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    app = current_app._get_current_object()
+    heartbeat = app.config.get('SSE_HEARTBEAT_INTERVAL', 15)
+    expires_at = claims.get('exp')
+
+    def revoked():
+        # Reloading the revocation map may read the users table.
+        with app.app_context():
+            return token_revocations.is_revoked(user.id, generation)
+
+    # Deliberately not wrapped in stream_with_context: the stream holds no
+    # app context or database session while it waits. It ends when the token
+    # expires or is revoked, and the client reconnects with its current one.
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            next_check = time.monotonic() + heartbeat
+            while True:
+                timeout = heartbeat
+                if expires_at is not None:
+                    timeout = min(timeout, expires_at - time.time())
+                    if timeout <= 0:
+                        return
+                message = subscription.get(timeout=timeout)
+                if time.monotonic() >= next_check:
+                    if revoked():
+                        return
+                    next_check = time.monotonic() + heartbeat
+                if message is not None:
+                    yield _format(message)
+                elif expires_at is None or time.time() < expires_at:
+                    yield ': keep-alive\n\n'
+        finally:
+            subscription.close()
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
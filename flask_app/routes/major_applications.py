@@ -1,21 +1,53 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from flask_app import db
 from flask_app.models import MajorApplication
 from flask_app.decorators import jwt_required_with_user, role_required
+from flask_app.pagination import PaginationError, change_feed, is_change_feed, is_paginated, paginate
+from flask_app.filters import FilterError, apply_filters, sort_descending
+from flask_app.counters import record_status_change, get_for_status_change
+from flask_app.notifications import notify_status_change
+from flask_app.constraints import PENDING_MAJOR_APPLICATION_INDEX, is_unique_violation
+from flask_app.bulk import BulkUpdateError, bulk_update_status, parse_bulk_request
+from flask_app.projection import MAJOR_APPLICATION, select_fields
 from datetime import datetime
 
 major_bp = Blueprint('major_applications', __name__)
 
+VALID_STATUSES = ['pending_approval', 'approved', 'rejected']
+
+LIST_FILTERS = {
+    'status': (MajorApplication.status, ['submitted'] + VALID_STATUSES),
+    'school': (MajorApplication.school, None),
+}
+
 
 @major_bp.route('/major-applications', methods=['GET'])
 @jwt_required_with_user
 def list_major_applications(current_user=None):
-    if current_user.role == 'admin':
-        applications = MajorApplication.query.order_by(MajorApplication.created_at.desc()).all()
-    else:
-        applications = MajorApplication.query.filter_by(student_id=current_user.id).order_by(MajorApplication.created_at.desc()).all()
-
-    return jsonify([a.to_dict() for a in applications]), 200
+    try:
+        projection, _ = select_fields(MAJOR_APPLICATION)
+        query = projection.query(MajorApplication.query)
+        if current_user.role != 'admin':
+            query = query.filter(MajorApplication.student_id == current_user.id)
+        scoped = query
+
+        query = apply_filters(query, LIST_FILTERS, MajorApplication.created_at)
+        descending = sort_descending()
+        if is_change_feed():
+            applications, deleted, watermark, has_more = change_feed(
+                scoped, query, MajorApplication.updated_at, MajorApplication.id)
+            return jsonify({'items': projection.serialize(applications), 'deleted': deleted,
+                            'watermark': watermark, 'hasMore': has_more}), 200
+        if is_paginated():
+            applications, next_cursor = paginate(query, MajorApplication.created_at, MajorApplication.id, descending)
+            return jsonify({'items': projection.serialize(applications), 'nextCursor': next_cursor}), 200
+        order = MajorApplication.created_at.desc() if descending else MajorApplication.created_at.asc()
+        applications = query.order_by(order).all()
+    except (FilterError, PaginationError) as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify(projection.serialize(applications)), 200
 
 
 @major_bp.route('/major-applications', methods=['POST'])
@@ -28,14 +60,6 @@ def create_major_application(current_user=None):
     if not data.get('requestedMajor') or not data.get('school'):
         return jsonify({'message': 'requestedMajor and school are required'}), 400
 
-    pending_statuses = ['submitted', 'pending_approval']
-    existing_pending = MajorApplication.query.filter(
-        MajorApplication.student_id == current_user.id,
-        MajorApplication.status.in_(pending_statuses)
-    ).first()
-    if existing_pending:
-        return jsonify({'message': 'You already have a pending major declaration. Please wait until it is approved or rejected before submitting a new one.'}), 400
-
     latest_approved = MajorApplication.query.filter(
         MajorApplication.student_id == current_user.id,
         MajorApplication.status == 'approved'
@@ -60,8 +84,17 @@ def create_major_application(current_user=None):
         statement=data.get('statement'),
         status='submitted',
         created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
     )
     db.session.add(application)
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_MAJOR_APPLICATION_INDEX):
+            return jsonify({'message': 'You already have a pending major declaration. Please wait until it is approved or rejected before submitting a new one.'}), 400
+        raise
+    record_status_change('major_applications', current_user.id, None, application.status)
     db.session.commit()
 
     return jsonify(application.to_dict()), 201
@@ -70,17 +103,40 @@ def create_major_application(current_user=None):
 @major_bp.route('/major-applications/<int:app_id>/status', methods=['PATCH'])
 @role_required('admin')
 def update_major_application_status(app_id, current_user=None):
-    application = MajorApplication.query.get(app_id)
+    application = get_for_status_change(MajorApplication, app_id)
     if not application:
         return jsonify({'message': 'Application not found'}), 404
 
     data = request.get_json()
     status = data.get('status')
-    if status not in ['pending_approval', 'approved', 'rejected']:
+    if status not in VALID_STATUSES:
         return jsonify({'message': 'Invalid status'}), 400
 
+    if status != application.status:
+        notify_status_change('major_applications', application.student_id, application.id, status)
+    record_status_change('major_applications', application.student_id, application.status, status)
     application.status = status
     application.admin_comment = data.get('adminComment', application.admin_comment)
-    db.session.commit()
+    application.updated_at = datetime.utcnow()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_MAJOR_APPLICATION_INDEX):
+            return jsonify({'message': 'Another pending major declaration for this student already exists'}), 400
+        raise
 
     return jsonify(application.to_dict()), 200
+
+
+@major_bp.route('/major-applications/bulk-status', methods=['PATCH'])
+@role_required('admin')
+def bulk_update_major_application_status(current_user=None):
+    try:
+        ids, status, comment_given, comment = parse_bulk_request(request.get_json(), VALID_STATUSES)
+        results = bulk_update_status('major_applications', ids, status, comment_given, comment, PENDING_MAJOR_APPLICATION_INDEX)
+    except BulkUpdateError as e:
+        return jsonify({'message': str(e)}), 400
+
+    updated = sum(1 for r in results if r['outcome'] == 'updated')
+    return jsonify({'status': status, 'updated': updated, 'results': results}), 200
@@ -1,6 +1,12 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func, or_, update
+from flask_app import db
 from flask_app.models import Notification
 from flask_app.decorators import jwt_required_with_user
+from flask_app.pagination import PaginationError, is_paginated, paginate
+from flask_app.bulk import MAX_BULK_IDS
+from flask_app.projection import NOTIFICATION
+from datetime import datetime, timezone
 
 notif_bp = Blueprint('notifications', __name__)
 
@@ -8,5 +14,64 @@ notif_bp = Blueprint('notifications', __name__)
 @notif_bp.route('/notifications', methods=['GET'])
 @jwt_required_with_user
 def list_notifications(current_user=None):
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).all()
-    return jsonify([n.to_dict() for n in notifications]), 200
+    query = NOTIFICATION.query(Notification.query).filter(Notification.user_id == current_user.id)
+
+    if is_paginated():
+        try:
+            notifications, next_cursor = paginate(query, Notification.created_at, Notification.id)
+        except PaginationError as e:
+            return jsonify({'message': str(e)}), 400
+        return jsonify({'items': NOTIFICATION.serialize(notifications), 'nextCursor': next_cursor}), 200
+
+    notifications = query.order_by(Notification.created_at.desc()).all()
+    return jsonify(NOTIFICATION.serialize(notifications)), 200
+
+
+@notif_bp.route('/notifications/unread-count', methods=['GET'])
+@jwt_required_with_user
+def unread_notification_count(current_user=None):
+    # Served from the partial index ix_notifications_unread_user_id.
+    count = db.session.query(func.count()).select_from(Notification).filter(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False,  # noqa: E712
+    ).scalar()
+    return jsonify({'count': count}), 200
+
+
+@notif_bp.route('/notifications/read', methods=['PATCH'])
+@jwt_required_with_user
+def mark_notifications_read(current_user=None):
+    data = request.get_json()
+    if not data:
+        return jsonify({'message': 'Missing request body'}), 400
+
+    ids = data.get('ids')
+    before = data.get('before')
+    if ids is None and before is None:
+        return jsonify({'message': 'ids or before is required'}), 400
+
+    conditions = []
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({'message': 'ids must be a list of integers'}), 400
+        if len(ids) > MAX_BULK_IDS:
+            return jsonify({'message': f'At most {MAX_BULK_IDS} ids can be updated at once'}), 400
+        conditions.append(Notification.id.in_(ids))
+    if before is not None:
+        try:
+            before = datetime.fromisoformat(str(before).replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'message': 'Invalid before'}), 400
+        if before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        conditions.append(Notification.created_at <= before)
+
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read == False,  # noqa: E712
+               or_(*conditions))
+        .values(is_read=True),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+    return jsonify({'updated': result.rowcount}), 200
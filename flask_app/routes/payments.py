@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_app import db
 from flask_app.models import Payment, DocumentRequest
 from flask_app.decorators import jwt_required_with_user
+from flask_app.counters import record_status_change, get_for_status_change
+from flask_app.notifications import notify, publish_status_change
 from datetime import datetime
 import uuid
 
@@ -25,7 +27,7 @@ def process_payment(current_user=None):
     if method not in ['online', 'voucher']:
         return jsonify({'message': 'Invalid payment method'}), 400
 
-    doc_req = DocumentRequest.query.get(request_id)
+    doc_req = get_for_status_change(DocumentRequest, request_id)
     if not doc_req:
         return jsonify({'message': 'Document request not found'}), 404
 
@@ -39,8 +41,13 @@ def process_payment(current_user=None):
     )
     db.session.add(payment)
 
+    notify(doc_req.user_id, 'Payment received',
+           f'Payment {payment.transaction_id} for document request #{doc_req.id} was received. '
+           'The request is now pending approval.', 'payment')
+    record_status_change('document_requests', doc_req.user_id, doc_req.status, 'pending_approval')
     doc_req.status = 'pending_approval'
     doc_req.updated_at = datetime.utcnow()
+    publish_status_change('document_requests', doc_req.user_id, doc_req.id, 'pending_approval')
     db.session.commit()
 
     return jsonify(payment.to_dict()), 200
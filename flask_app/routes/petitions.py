@@ -1,23 +1,59 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from flask_app import db
 from flask_app.models import GradeChangePetition
 from flask_app.decorators import jwt_required_with_user, role_required
+from flask_app.pagination import PaginationError, change_feed, is_change_feed, is_paginated, paginate
+from flask_app.filters import FilterError, apply_filters, sort_descending
+from flask_app.counters import record_status_change, get_for_status_change
+from flask_app.notifications import notify_status_change
+from flask_app.constraints import PENDING_PETITION_INDEX, is_unique_violation
+from flask_app.bulk import BulkUpdateError, bulk_update_status, parse_bulk_request
+from flask_app.projection import PETITION, select_fields
 from datetime import datetime
 
 pet_bp = Blueprint('petitions', __name__)
 
+VALID_STATUSES = ['pending_approval', 'approved', 'rejected']
+
+LIST_FILTERS = {
+    'status': (GradeChangePetition.status, ['submitted'] + VALID_STATUSES),
+    'courseCode': (GradeChangePetition.course_code, None),
+    'studentId': (GradeChangePetition.student_id, None),
+}
+
 
 @pet_bp.route('/petitions', methods=['GET'])
 @jwt_required_with_user
 def list_petitions(current_user=None):
-    if current_user.role == 'admin':
-        petitions = GradeChangePetition.query.order_by(GradeChangePetition.created_at.desc()).all()
-    elif current_user.role == 'instructor':
-        petitions = GradeChangePetition.query.filter_by(instructor_id=current_user.id).order_by(GradeChangePetition.created_at.desc()).all()
-    else:
-        petitions = []
+    if current_user.role not in ('admin', 'instructor'):
+        if is_change_feed():
+            return jsonify({'items': [], 'deleted': [], 'watermark': request.args['since'], 'hasMore': False}), 200
+        return jsonify({'items': [], 'nextCursor': None} if is_paginated() else []), 200
+
+    try:
+        projection, _ = select_fields(PETITION)
+        query = projection.query(GradeChangePetition.query)
+        if current_user.role == 'instructor':
+            query = query.filter(GradeChangePetition.instructor_id == current_user.id)
+        scoped = query
 
-    return jsonify([p.to_dict() for p in petitions]), 200
+        query = apply_filters(query, LIST_FILTERS, GradeChangePetition.created_at)
+        descending = sort_descending()
+        if is_change_feed():
+            petitions, deleted, watermark, has_more = change_feed(
+                scoped, query, GradeChangePetition.updated_at, GradeChangePetition.id)
+            return jsonify({'items': projection.serialize(petitions), 'deleted': deleted,
+                            'watermark': watermark, 'hasMore': has_more}), 200
+        if is_paginated():
+            petitions, next_cursor = paginate(query, GradeChangePetition.created_at, GradeChangePetition.id, descending)
+            return jsonify({'items': projection.serialize(petitions), 'nextCursor': next_cursor}), 200
+        order = GradeChangePetition.created_at.desc() if descending else GradeChangePetition.created_at.asc()
+        petitions = query.order_by(order).all()
+    except (FilterError, PaginationError) as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify(projection.serialize(petitions)), 200
 
 
 @pet_bp.route('/petitions', methods=['POST'])
@@ -32,16 +68,6 @@ def create_petition(current_user=None):
         if not data.get(field):
             return jsonify({'message': f'{field} is required'}), 400
 
-    pending_statuses = ['submitted', 'pending_approval']
-    existing_pending = GradeChangePetition.query.filter(
-        GradeChangePetition.instructor_id == current_user.id,
-        GradeChangePetition.student_id == data['studentId'],
-        GradeChangePetition.course_code == data['courseCode'],
-        GradeChangePetition.status.in_(pending_statuses)
-    ).first()
-    if existing_pending:
-        return jsonify({'message': 'You already have a pending petition for this student and course. Please wait until it is resolved before submitting another.'}), 400
-
     petition = GradeChangePetition(
         instructor_id=current_user.id,
         student_id=data['studentId'],
@@ -54,6 +80,14 @@ def create_petition(current_user=None):
         updated_at=datetime.utcnow(),
     )
     db.session.add(petition)
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_PETITION_INDEX):
+            return jsonify({'message': 'You already have a pending petition for this student and course. Please wait until it is resolved before submitting another.'}), 400
+        raise
+    record_status_change('petitions', current_user.id, None, petition.status)
     db.session.commit()
 
     return jsonify(petition.to_dict()), 201
@@ -62,18 +96,40 @@ def create_petition(current_user=None):
 @pet_bp.route('/petitions/<int:pet_id>/status', methods=['PATCH'])
 @role_required('admin')
 def update_petition_status(pet_id, current_user=None):
-    petition = GradeChangePetition.query.get(pet_id)
+    petition = get_for_status_change(GradeChangePetition, pet_id)
     if not petition:
         return jsonify({'message': 'Petition not found'}), 404
 
     data = request.get_json()
     status = data.get('status')
-    if status not in ['pending_approval', 'approved', 'rejected']:
+    if status not in VALID_STATUSES:
         return jsonify({'message': 'Invalid status'}), 400
 
+    if status != petition.status:
+        notify_status_change('petitions', petition.instructor_id, petition.id, status)
+    record_status_change('petitions', petition.instructor_id, petition.status, status)
     petition.status = status
     petition.admin_comment = data.get('adminComment', petition.admin_comment)
     petition.updated_at = datetime.utcnow()
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, PENDING_PETITION_INDEX):
+            return jsonify({'message': 'Another pending petition for this student and course already exists'}), 400
+        raise
 
     return jsonify(petition.to_dict()), 200
+
+
+@pet_bp.route('/petitions/bulk-status', methods=['PATCH'])
+@role_required('admin')
+def bulk_update_petition_status(current_user=None):
+    try:
+        ids, status, comment_given, comment = parse_bulk_request(request.get_json(), VALID_STATUSES)
+        results = bulk_update_status('petitions', ids, status, comment_given, comment, PENDING_PETITION_INDEX)
+    except BulkUpdateError as e:
+        return jsonify({'message': str(e)}), 400
+
+    updated = sum(1 for r in results if r['outcome'] == 'updated')
+    return jsonify({'status': status, 'updated': updated, 'results': results}), 200
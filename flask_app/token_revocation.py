@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+class TokenRevocations:
+    """Per-process map of user id -> minimum valid token generation.
+
+    A user's generation is bumped whenever their role or active flag changes,
+    which invalidates every token issued before the change. Only users whose
+    generation has ever been bumped are tracked, so the map stays small. It is
+    loaded from the users table when first consulted and reloaded once it is
+    older than `TOKEN_REVOCATION_TTL` seconds, so bumps committed by other
+    worker processes take effect within that window; bumps made through this
+    process's session are applied immediately by the User mapper events.
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self._min_generation = {}
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('JWT_STATELESS_AUTH', False)
+        self.ttl = app.config.setdefault('TOKEN_REVOCATION_TTL', 5)
+        self.clear()
+
+    def _load(self):
+        from flask_app.models import User
+        rows = User.query.with_entities(User.id, User.token_generation).filter(User.token_generation > 0).all()
+        # Generations only grow, so merging keeps any newer local bump.
+        for user_id, generation in rows:
+            self._min_generation[user_id] = max(generation, self._min_generation.get(user_id, 0))
+        self._expires_at = time.monotonic() + self.ttl
+
+    def is_revoked(self, user_id, generation):
+        if time.monotonic() >= self._expires_at:
+            with self._lock:
+                if time.monotonic() >= self._expires_at:
+                    self._load()
+        return generation < self._min_generation.get(user_id, 0)
+
+    def revoke_before(self, user_id, generation):
+        with self._lock:
+            self._min_generation[user_id] = max(generation, self._min_generation.get(user_id, 0))
+
+    def clear(self):
+        with self._lock:
+            self._min_generation.clear()
+            self._expires_at = 0
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class UserCache:
+    """Per-process LRU cache of detached User rows keyed by id.
+
+    Entries expire after a short TTL so that changes made by other worker
+    processes are picked up; changes made through this process's session are
+    invalidated when their transaction commits (see models.py).
+    """
+
+    def __init__(self, max_size=1024, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('USER_CACHE_SIZE', 1024)
+        self.ttl = app.config.setdefault('USER_CACHE_TTL', 30)
+        self.clear()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return user
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, user):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxSize': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
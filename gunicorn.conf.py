@@ -0,0 +1,33 @@
+import os
+
+# Production server settings, loaded by start_prod.sh.
+#
+# gevent workers serve every request on a greenlet, so an idle
+# /api/events stream costs a small queue and a greenlet rather than an OS
+# thread, and one worker can hold thousands of them. Events are relayed
+# between workers through Postgres LISTEN/NOTIFY (PUBSUB_BACKEND=postgres).
+
+bind = f"0.0.0.0:{os.environ.get('FLASK_PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '5000'))
+timeout = 60
+accesslog = '-'
+# The default format logs the full request line. Log the path without its
+# query string so signed tokens in URLs (event stream tickets, calendar feed
+# tokens) do not end up in the logs.
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def post_fork(server, worker):
+    # psycopg2 is a C extension that gevent cannot patch; make it wait on
+    # sockets through the gevent hub so a query does not block every
+    # greenlet in the worker.
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+
+def worker_exit(server, worker):
+    # Write the notifications still queued in this worker before it exits.
+    from flask_app import notification_writer
+    notification_writer.shutdown()
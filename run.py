@@ -12,7 +12,7 @@ def ensure_deps():
             sys.executable, "-m", "pip", "install",
             "flask", "flask-cors", "flask-jwt-extended",
             "flask-sqlalchemy", "flask-bcrypt",
-            "psycopg2-binary", "gunicorn", "marshmallow"
+            "psycopg2-binary", "gunicorn", "gevent", "psycogreen", "marshmallow"
         ], stdout=sys.stdout, stderr=sys.stderr)
         return True
 
@@ -52,10 +52,9 @@ app.use((req, res, next) => {
 
 (async () => {
   if (process.env.NODE_ENV === "production") {
-    log("Production mode: starting Flask on port 5000 directly");
-    const pythonCmd = "python3";
+    log("Production mode: starting Flask (gunicorn) on port 5000 directly");
 
-    const flaskProcess = spawn(pythonCmd, ["run.py"], {
+    const flaskProcess = spawn("bash", ["start_prod.sh"], {
       stdio: ["ignore", "pipe", "pipe"],
       env: { ...process.env, FLASK_PORT: "5000", NODE_ENV: "production" },
     });
@@ -11,7 +11,8 @@ import {
   payments,
   gradeChangePetitions,
   majorApplications,
-  calendarEvents
+  calendarEvents,
+  notifications
 } from './schema';
 
 export const errorSchemas = {
@@ -30,6 +31,17 @@ export const errorSchemas = {
   })
 };
 
+const bulkStatusResult = z.object({
+  status: z.string(),
+  updated: z.number(),
+  results: z.array(z.object({
+    id: z.number(),
+    outcome: z.enum(["updated", "unchanged", "conflict", "not_found"]),
+    previousStatus: z.string().optional(),
+    commentApplied: z.boolean().optional(),
+  })),
+});
+
 export const api = {
   auth: {
     login: {
@@ -116,6 +128,19 @@ export const api = {
         404: errorSchemas.notFound,
       },
     },
+    bulkUpdateStatus: {
+      method: 'PATCH' as const,
+      path: '/api/document-requests/bulk-status' as const,
+      input: z.object({
+        ids: z.array(z.number()).min(1).max(1000),
+        status: z.enum(["submitted", "payment_pending", "pending_approval", "approved", "completed", "rejected"]),
+        adminComment: z.string().optional(),
+      }),
+      responses: {
+        200: bulkStatusResult,
+        400: errorSchemas.validation,
+      },
+    },
   },
   payments: {
     process: {
@@ -160,7 +185,20 @@ export const api = {
         200: z.custom<typeof gradeChangePetitions.$inferSelect>(),
         404: errorSchemas.notFound,
       },
-    }
+    },
+    bulkUpdateStatus: {
+      method: 'PATCH' as const,
+      path: '/api/petitions/bulk-status' as const,
+      input: z.object({
+        ids: z.array(z.number()).min(1).max(1000),
+        status: z.enum(["pending_approval", "approved", "rejected"]),
+        adminComment: z.string().optional(),
+      }),
+      responses: {
+        200: bulkStatusResult,
+        400: errorSchemas.validation,
+      },
+    },
   },
   majorApplications: {
     list: {
@@ -191,6 +229,44 @@ export const api = {
         404: errorSchemas.notFound,
       },
     },
+    bulkUpdateStatus: {
+      method: 'PATCH' as const,
+      path: '/api/major-applications/bulk-status' as const,
+      input: z.object({
+        ids: z.array(z.number()).min(1).max(1000),
+        status: z.enum(["pending_approval", "approved", "rejected"]),
+        adminComment: z.string().optional(),
+      }),
+      responses: {
+        200: bulkStatusResult,
+        400: errorSchemas.validation,
+      },
+    },
+  },
+  dashboard: {
+    summary: {
+      method: 'GET' as const,
+      path: '/api/dashboard/summary' as const,
+      responses: {
+        200: z.object({
+          documentRequests: z.object({
+            counts: z.record(z.string(), z.number()),
+            total: z.number(),
+            recent: z.array(z.custom<typeof documentRequests.$inferSelect>()),
+          }),
+          petitions: z.object({
+            counts: z.record(z.string(), z.number()),
+            total: z.number(),
+            recent: z.array(z.custom<typeof gradeChangePetitions.$inferSelect>()),
+          }),
+          majorApplications: z.object({
+            counts: z.record(z.string(), z.number()),
+            total: z.number(),
+            recent: z.array(z.custom<typeof majorApplications.$inferSelect>()),
+          }),
+        }),
+      },
+    },
   },
   calendar: {
     list: {
@@ -209,6 +285,48 @@ export const api = {
         400: errorSchemas.validation,
       }
     }
+  },
+  notifications: {
+    list: {
+      method: 'GET' as const,
+      path: '/api/notifications' as const,
+      responses: {
+        200: z.array(z.custom<typeof notifications.$inferSelect>()),
+      },
+    },
+    unreadCount: {
+      method: 'GET' as const,
+      path: '/api/notifications/unread-count' as const,
+      responses: {
+        200: z.object({ count: z.number() }),
+      },
+    },
+    markRead: {
+      method: 'PATCH' as const,
+      path: '/api/notifications/read' as const,
+      input: z.object({
+        ids: z.array(z.number()).optional(),
+        before: z.string().optional(),
+      }),
+      responses: {
+        200: z.object({ updated: z.number() }),
+        400: errorSchemas.validation,
+      },
+    },
+  },
+  events: {
+    stream: {
+      method: 'GET' as const,
+      path: '/api/events' as const,
+    },
+    ticket: {
+      method: 'POST' as const,
+      path: '/api/events/ticket' as const,
+      responses: {
+        200: z.object({ ticket: z.string() }),
+        401: errorSchemas.unauthorized,
+      },
+    },
   }
 };
 
@@ -1,5 +1,5 @@
-import { pgTable, text, serial, integer, boolean, timestamp, jsonb, varchar } from "drizzle-orm/pg-core";
-import { relations } from "drizzle-orm";
+import { pgTable, text, serial, integer, boolean, timestamp, jsonb, varchar, index, uniqueIndex, primaryKey } from "drizzle-orm/pg-core";
+import { relations, sql } from "drizzle-orm";
 import { createInsertSchema } from "drizzle-zod";
 import { z } from "zod";
 import { users } from "./models/auth";
@@ -18,7 +18,15 @@ export const documentRequests = pgTable("document_requests", {
   adminComment: text("admin_comment"),
   createdAt: timestamp("created_at").defaultNow(),
   updatedAt: timestamp("updated_at").defaultNow(),
-});
+}, (table) => [
+  index("ix_document_requests_created_at_id").on(table.createdAt, table.id),
+  index("ix_document_requests_user_id_created_at_id").on(table.userId, table.createdAt, table.id),
+  index("ix_document_requests_status_created_at_id").on(table.status, table.createdAt, table.id),
+  index("ix_document_requests_updated_at_id").on(table.updatedAt, table.id),
+  index("ix_document_requests_user_id_updated_at_id").on(table.userId, table.updatedAt, table.id),
+  uniqueIndex("uq_document_requests_one_pending").on(table.userId)
+    .where(sql`status IN ('submitted', 'payment_pending', 'pending_approval')`),
+]);
 
 export const documentRequestsRelations = relations(documentRequests, ({ one }) => ({
   user: one(users, {
@@ -37,7 +45,9 @@ export const payments = pgTable("payments", {
   transactionId: text("transaction_id"),
   method: text("method", { enum: ["online", "voucher"] }),
   createdAt: timestamp("created_at").defaultNow(),
-});
+}, (table) => [
+  index("ix_payments_request_id").on(table.requestId),
+]);
 
 export const paymentsRelations = relations(payments, ({ one }) => ({
   request: one(documentRequests, {
@@ -60,7 +70,16 @@ export const gradeChangePetitions = pgTable("grade_change_petitions", {
   adminComment: text("admin_comment"),
   createdAt: timestamp("created_at").defaultNow(),
   updatedAt: timestamp("updated_at").defaultNow(),
-});
+}, (table) => [
+  index("ix_grade_change_petitions_created_at_id").on(table.createdAt, table.id),
+  index("ix_grade_change_petitions_instructor_id_created_at_id").on(table.instructorId, table.createdAt, table.id),
+  index("ix_grade_change_petitions_status_created_at_id").on(table.status, table.createdAt, table.id),
+  index("ix_grade_change_petitions_course_code_created_at_id").on(table.courseCode, table.createdAt, table.id),
+  index("ix_grade_change_petitions_updated_at_id").on(table.updatedAt, table.id),
+  index("ix_grade_change_petitions_instructor_id_updated_at_id").on(table.instructorId, table.updatedAt, table.id),
+  uniqueIndex("uq_grade_change_petitions_one_pending").on(table.instructorId, table.studentId, table.courseCode)
+    .where(sql`status IN ('submitted', 'pending_approval')`),
+]);
 
 export const petitionsRelations = relations(gradeChangePetitions, ({ one }) => ({
   instructor: one(users, {
@@ -82,7 +101,17 @@ export const majorApplications = pgTable("major_applications", {
   status: text("status", { enum: ["submitted", "pending_approval", "approved", "rejected"] }).default("submitted").notNull(),
   adminComment: text("admin_comment"),
   createdAt: timestamp("created_at").defaultNow(),
-});
+  updatedAt: timestamp("updated_at").defaultNow(),
+}, (table) => [
+  index("ix_major_applications_created_at_id").on(table.createdAt, table.id),
+  index("ix_major_applications_student_id_created_at_id").on(table.studentId, table.createdAt, table.id),
+  index("ix_major_applications_student_id_status_created_at").on(table.studentId, table.status, table.createdAt),
+  index("ix_major_applications_status_created_at_id").on(table.status, table.createdAt, table.id),
+  index("ix_major_applications_updated_at_id").on(table.updatedAt, table.id),
+  index("ix_major_applications_student_id_updated_at_id").on(table.studentId, table.updatedAt, table.id),
+  uniqueIndex("uq_major_applications_one_pending").on(table.studentId)
+    .where(sql`status IN ('submitted', 'pending_approval')`),
+]);
 
 export const majorApplicationsRelations = relations(majorApplications, ({ one }) => ({
   student: one(users, {
@@ -93,6 +122,15 @@ export const majorApplicationsRelations = relations(majorApplications, ({ one })
 
 export const insertMajorApplicationSchema = createInsertSchema(majorApplications).omit({ id: true, createdAt: true, status: true, adminComment: true, studentId: true });
 
+export const statusCounters = pgTable("status_counters", {
+  module: text("module").notNull(),
+  ownerId: varchar("owner_id").default("").notNull(),
+  status: text("status").notNull(),
+  count: integer("count").default(0).notNull(),
+}, (table) => [
+  primaryKey({ columns: [table.module, table.ownerId, table.status] }),
+]);
+
 export const calendarEvents = pgTable("calendar_events", {
   id: serial("id").primaryKey(),
   title: text("title").notNull(),
@@ -100,9 +138,15 @@ export const calendarEvents = pgTable("calendar_events", {
   startDate: timestamp("start_date").notNull(),
   endDate: timestamp("end_date"),
   type: text("type", { enum: ["holiday", "exam", "deadline", "event"] }).notNull(),
+  recurrence: text("recurrence"),
+  recurrenceEnd: timestamp("recurrence_end"),
   createdBy: varchar("created_by"),
   createdAt: timestamp("created_at").defaultNow(),
-});
+}, (table) => [
+  index("ix_calendar_events_start_date_id").on(table.startDate, table.id),
+  index("ix_calendar_events_end_date_start_date").on(table.endDate, table.startDate),
+  index("ix_calendar_events_recurring_start_date").on(table.startDate).where(sql`recurrence IS NOT NULL`),
+]);
 
 export const calendarEventsRelations = relations(calendarEvents, ({ one }) => ({
   creator: one(users, {
@@ -111,7 +155,7 @@ export const calendarEventsRelations = relations(calendarEvents, ({ one }) => ({
   }),
 }));
 
-export const insertCalendarEventSchema = createInsertSchema(calendarEvents).omit({ id: true, createdAt: true, createdBy: true });
+export const insertCalendarEventSchema = createInsertSchema(calendarEvents).omit({ id: true, createdAt: true, createdBy: true, recurrenceEnd: true });
 
 export const notifications = pgTable("notifications", {
   id: serial("id").primaryKey(),
@@ -121,7 +165,24 @@ export const notifications = pgTable("notifications", {
   type: text("type"),
   isRead: boolean("is_read").default(false).notNull(),
   createdAt: timestamp("created_at").defaultNow(),
-});
+}, (table) => [
+  index("ix_notifications_user_id_created_at_id").on(table.userId, table.createdAt, table.id),
+  index("ix_notifications_unread_user_id").on(table.userId).where(sql`is_read = false`),
+  index("ix_notifications_read_created_at").on(table.createdAt).where(sql`is_read = true`),
+]);
+
+export const notificationsArchive = pgTable("notifications_archive", {
+  id: integer("id").primaryKey(),
+  userId: varchar("user_id").notNull(),
+  title: text("title").notNull(),
+  message: text("message").notNull(),
+  type: text("type"),
+  isRead: boolean("is_read").default(true).notNull(),
+  createdAt: timestamp("created_at"),
+  archivedAt: timestamp("archived_at"),
+}, (table) => [
+  index("ix_notifications_archive_user_id_created_at").on(table.userId, table.createdAt),
+]);
 
 export const notificationsRelations = relations(notifications, ({ one }) => ({
   user: one(users, {
@@ -1,4 +1,10 @@
 #!/bin/bash
 export FLASK_PORT=5000
 export NODE_ENV=production
-exec python3 run.py
+
+# Streams per worker stay below gunicorn's worker_connections so ordinary
+# requests always have room (see gunicorn.conf.py).
+export PUBSUB_BACKEND=${PUBSUB_BACKEND:-postgres}
+export PUBSUB_MAX_SUBSCRIBERS=${PUBSUB_MAX_SUBSCRIBERS:-4000}
+
+exec python3 -m gunicorn --config gunicorn.conf.py run:app
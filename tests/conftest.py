@@ -1,5 +1,8 @@
 import pytest
 import os
+from contextlib import contextmanager
+
+from sqlalchemy import event
 
 from flask_app import create_app, db, bcrypt
 from flask_app.models import User
@@ -9,6 +12,7 @@ TEST_CONFIG = {
     'SQLALCHEMY_DATABASE_URI': 'sqlite://',
     'TESTING': True,
     'JWT_SECRET_KEY': 'test-secret-key',
+    'BCRYPT_LOG_ROUNDS': 4,
 }
 
 
@@ -93,3 +97,18 @@ def get_token(client, username='teststudent', password='pass123'):
 
 def auth_header(token):
     return {'Authorization': f'Bearer {token}'}
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
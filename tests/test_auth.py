@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import text
 from tests.conftest import get_token, auth_header
 
 
@@ -72,18 +73,353 @@ class TestGetCurrentUser:
 
 class TestRefreshToken:
     def test_refresh_success(self, client, seed_users):
-        token = get_token(client, 'teststudent')
-        resp = client.post('/api/auth/refresh', headers=auth_header(token))
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        resp = client.post('/api/auth/refresh', headers=auth_header(resp.get_json()['refresh_token']))
         assert resp.status_code == 200
         assert 'access_token' in resp.get_json()
 
+    def test_refresh_rejects_access_token(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        assert client.post('/api/auth/refresh', headers=auth_header(token)).status_code == 401
+
     def test_refresh_no_token(self, client, seed_users):
         resp = client.post('/api/auth/refresh')
         assert resp.status_code == 401
 
+    def test_refresh_token_rotation(self, client, seed_users):
+        from flask_jwt_extended import decode_token
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+
+        resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['refresh_token'] != refresh
+        assert decode_token(data['refresh_token'])['type'] == 'refresh'
+        assert client.get('/api/auth/user', headers=auth_header(data['access_token'])).status_code == 200
+
+        resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+        assert resp.status_code == 401
+        assert resp.get_json()['message'] == 'Refresh token has already been used'
+        # The replay revokes the whole session, including the newest token.
+        assert client.post('/api/auth/refresh', headers=auth_header(data['refresh_token'])).status_code == 401
+
+    def test_refresh_tokens_rotate_per_session(self, client, seed_users):
+        sessions = [
+            client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+            .get_json()['refresh_token']
+            for _ in range(2)
+        ]
+        for _ in range(2):
+            for i, refresh in enumerate(sessions):
+                resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+                assert resp.status_code == 200
+                sessions[i] = resp.get_json()['refresh_token']
+
+    def test_refresh_adopts_unknown_session(self, client, seed_users):
+        # Another worker (or this one before a restart) issued the token.
+        from flask_app import refresh_families
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+        refresh_families.clear()
+        assert client.post('/api/auth/refresh', headers=auth_header(refresh)).status_code == 200
+
+    def test_refresh_token_is_not_an_access_token(self, client, seed_users):
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+        assert client.get('/api/auth/user', headers=auth_header(refresh)).status_code == 401
+
+    def test_refresh_uses_user_cache(self, client, seed_users):
+        from flask_app import user_cache
+        from tests.conftest import count_queries
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+        refresh = client.post('/api/auth/refresh', headers=auth_header(refresh)).get_json()['refresh_token']
+
+        with count_queries() as statements:
+            resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+        assert resp.status_code == 200
+        assert statements == []
+
+        user_cache.clear()
+        with count_queries() as statements:
+            resp = client.post('/api/auth/refresh', headers=auth_header(resp.get_json()['refresh_token']))
+        assert resp.status_code == 200
+        assert len(statements) == 1 and 'FROM users' in statements[0]
+
+    def test_refresh_rejects_deactivated_user(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+
+        user = User.query.filter_by(username='teststudent').first()
+        user.is_active = False
+        db.session.commit()
+
+        assert client.post('/api/auth/refresh', headers=auth_header(refresh)).status_code == 401
+
 
 class TestLogout:
     def test_logout(self, client, seed_users):
         resp = client.post('/api/auth/logout')
         assert resp.status_code == 200
         assert resp.get_json()['message'] == 'Logged out successfully'
+
+
+class TestUserCache:
+    def test_repeat_requests_hit_cache(self, client, seed_users):
+        from flask_app import user_cache
+        token = get_token(client, 'teststudent')
+        client.get('/api/auth/user', headers=auth_header(token))
+        misses = user_cache.misses
+        hits = user_cache.hits
+
+        client.get('/api/auth/user', headers=auth_header(token))
+        client.get('/api/document-requests', headers=auth_header(token))
+        assert user_cache.misses == misses
+        assert user_cache.hits == hits + 2
+
+    def test_deactivation_invalidates_cache(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        token = get_token(client, 'teststudent')
+        assert client.get('/api/auth/user', headers=auth_header(token)).status_code == 200
+
+        with app.app_context():
+            user = User.query.filter_by(username='teststudent').first()
+            user.is_active = False
+            db.session.commit()
+
+        resp = client.get('/api/auth/user', headers=auth_header(token))
+        assert resp.status_code == 403
+
+    def test_role_change_invalidates_cache(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        token = get_token(client, 'teststudent')
+        resp = client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'Event', 'startDate': '2026-06-01T09:00:00Z', 'type': 'event',
+        })
+        assert resp.status_code == 403
+
+        with app.app_context():
+            user = User.query.filter_by(username='teststudent').first()
+            user.role = 'admin'
+            db.session.commit()
+
+        resp = client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'Event', 'startDate': '2026-06-01T09:00:00Z', 'type': 'event',
+        })
+        assert resp.status_code == 201
+
+    def test_invalidated_after_commit_not_flush(self, client, seed_users, app):
+        from flask_app import db, user_cache
+        from flask_app.decorators import load_user
+        from flask_app.models import User
+        with app.app_context():
+            user = User.query.filter_by(username='teststudent').first()
+            user.role = 'admin'
+            db.session.flush()
+            # Another request reads the committed row between flush and commit.
+            user_cache.set(user.id, User(id=user.id, username='teststudent', role='student'))
+            db.session.commit()
+            assert user_cache.get(user.id) is None
+            assert load_user(user.id).role == 'admin'
+
+    def test_rolled_back_change_is_not_left_in_cache(self, client, seed_users, app):
+        from flask_app import db, user_cache
+        from flask_app.decorators import load_user
+        from flask_app.models import User
+        with app.app_context():
+            user = User.query.filter_by(username='teststudent').first()
+            user.role = 'admin'
+            db.session.flush()
+            assert load_user(user.id).role == 'admin'
+            db.session.rollback()
+            assert load_user(user.id).role == 'student'
+
+    def test_stats_admin_only(self, client, seed_users):
+        s_token = get_token(client, 'teststudent')
+        assert client.get('/api/auth/user-cache', headers=auth_header(s_token)).status_code == 403
+
+        a_token = get_token(client, 'testadmin')
+        resp = client.get('/api/auth/user-cache', headers=auth_header(a_token))
+        assert resp.status_code == 200
+        assert {'hits', 'misses', 'size'} <= set(resp.get_json())
+
+
+class TestStatelessAuth:
+    def _create_event(self, client, token):
+        return client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'Event', 'startDate': '2026-06-01T09:00:00Z', 'type': 'event',
+        })
+
+    def test_token_carries_role_claims(self, client, seed_users):
+        from flask_jwt_extended import decode_token
+        token = get_token(client, 'testadmin')
+        claims = decode_token(token)
+        assert claims['role'] == 'admin'
+        assert claims['gen'] == 0
+
+    def test_role_required_skips_user_lookup(self, client, seed_users, app):
+        from flask_app import user_cache
+        from tests.conftest import count_queries
+        app.config['JWT_STATELESS_AUTH'] = True
+        token = get_token(client, 'testadmin')
+        self._create_event(client, token)
+        user_cache.clear()
+
+        with count_queries() as statements:
+            resp = self._create_event(client, token)
+        assert resp.status_code == 201
+        assert not any('FROM users' in s for s in statements)
+
+    def test_deactivation_revokes_token(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        app.config['JWT_STATELESS_AUTH'] = True
+        token = get_token(client, 'testadmin')
+        assert self._create_event(client, token).status_code == 201
+
+        with app.app_context():
+            user = User.query.filter_by(username='testadmin').first()
+            user.is_active = False
+            db.session.commit()
+            assert user.token_generation == 1
+
+        assert self._create_event(client, token).status_code == 403
+
+    def test_refresh_checks_user_not_claims(self, client, seed_users, app):
+        from flask_app import db, user_cache
+        from flask_jwt_extended import decode_token
+        app.config['JWT_STATELESS_AUTH'] = True
+        resp = client.post('/api/auth/login', json={'username': 'testadmin', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+
+        # A demotion committed by another worker: no mapper events run here.
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE users SET role = 'student', token_generation = 1 WHERE username = 'testadmin'"))
+        user_cache.clear()
+
+        resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+        assert resp.status_code == 200
+        claims = decode_token(resp.get_json()['access_token'])
+        assert claims['role'] == 'student'
+        assert claims['gen'] == 1
+
+    def test_revocations_reload_after_ttl(self, client, seed_users, app, monkeypatch):
+        import time
+        from flask_app import db
+        app.config['JWT_STATELESS_AUTH'] = True
+        token = get_token(client, 'testadmin')
+        assert self._create_event(client, token).status_code == 201
+
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE users SET role = 'student', token_generation = 1 WHERE username = 'testadmin'"))
+        # Within the TTL this worker still trusts its revocation map...
+        assert self._create_event(client, token).status_code == 201
+        # ...and once it expires the other worker's bump is seen.
+        monotonic = time.monotonic
+        monkeypatch.setattr(time, 'monotonic', lambda: monotonic() + 60)
+        assert self._create_event(client, token).status_code == 403
+
+    def test_refresh_after_demotion_uses_new_role(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        from flask_jwt_extended import decode_token
+        app.config['JWT_STATELESS_AUTH'] = True
+        resp = client.post('/api/auth/login', json={'username': 'testadmin', 'password': 'pass123'})
+        refresh = resp.get_json()['refresh_token']
+
+        user = User.query.filter_by(username='testadmin').first()
+        user.role = 'student'
+        db.session.commit()
+
+        resp = client.post('/api/auth/refresh', headers=auth_header(refresh))
+        assert resp.status_code == 200
+        claims = decode_token(resp.get_json()['access_token'])
+        assert claims['role'] == 'student'
+        assert claims['gen'] == 1
+
+    def test_demotion_revokes_token(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        app.config['JWT_STATELESS_AUTH'] = True
+        token = get_token(client, 'testadmin')
+
+        with app.app_context():
+            user = User.query.filter_by(username='testadmin').first()
+            user.role = 'student'
+            db.session.commit()
+
+        assert self._create_event(client, token).status_code == 403
+
+
+class TestLoginHashPool:
+    def test_pool_rejects_when_full(self, app):
+        import threading
+        from flask_app.hashing import HashPoolSaturated, PasswordHashPool
+
+        app.config.update(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE_SIZE=0)
+        pool = PasswordHashPool()
+        pool.init_app(app)
+        release = threading.Event()
+        started = threading.Event()
+
+        def hold():
+            started.set()
+            release.wait(5)
+            return True
+
+        worker = threading.Thread(target=pool.run, args=(hold,))
+        worker.start()
+        started.wait(5)
+        with pytest.raises(HashPoolSaturated):
+            pool.run(lambda: True)
+        release.set()
+        worker.join()
+        assert pool.run(lambda: 'ok') == 'ok'
+        pool.shutdown()
+
+    def test_login_returns_503_when_saturated(self, client, seed_users, monkeypatch):
+        from flask_app import password_pool
+        from flask_app.hashing import HashPoolSaturated
+
+        def saturated(*args):
+            raise HashPoolSaturated()
+
+        monkeypatch.setattr(password_pool, 'run', saturated)
+        resp = client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'pass123'})
+        assert resp.status_code == 503
+        assert resp.headers['Retry-After'] == str(password_pool.retry_after)
+
+
+class TestPasswordRehash:
+    def test_login_upgrades_hash_cost(self, client, seed_users, app):
+        from flask_app.hashing import hash_cost
+        from flask_app.models import User
+        user = User.query.filter_by(username='teststudent').first()
+        assert hash_cost(user.password_hash) == 4
+
+        app.config['BCRYPT_LOG_ROUNDS'] = 5
+        assert client.post('/api/auth/login', json={
+            'username': 'teststudent', 'password': 'pass123',
+        }).status_code == 200
+
+        user = User.query.filter_by(username='teststudent').first()
+        assert hash_cost(user.password_hash) == 5
+        assert get_token(client, 'teststudent')
+
+    def test_failed_login_does_not_rehash(self, client, seed_users, app):
+        from flask_app.hashing import hash_cost
+        from flask_app.models import User
+        app.config['BCRYPT_LOG_ROUNDS'] = 5
+        client.post('/api/auth/login', json={'username': 'teststudent', 'password': 'wrong'})
+        user = User.query.filter_by(username='teststudent').first()
+        assert hash_cost(user.password_hash) == 4
+
+    def test_calibrate_command(self, app):
+        result = app.test_cli_runner().invoke(args=['calibrate-bcrypt', '--target-ms', '10000', '--max-rounds', '5'])
+        assert result.exit_code == 0
+        assert 'Recommended BCRYPT_LOG_ROUNDS=5' in result.output
@@ -69,6 +69,361 @@ class TestCalendarEvents:
             })
             assert resp.status_code == 201
 
+    def test_paginated_events_ordered_by_start_date(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        for day in [5, 1, 3, 2, 4]:
+            client.post('/api/calendar', headers=auth_header(token), json={
+                'title': f'Day {day}',
+                'startDate': f'2026-08-0{day}T09:00:00Z',
+                'type': 'event',
+            })
+
+        resp = client.get('/api/calendar?limit=3', headers=auth_header(token))
+        first = resp.get_json()
+        assert [e['title'] for e in first['items']] == ['Day 1', 'Day 2', 'Day 3']
+        assert first['nextCursor']
+
+        resp = client.get(f"/api/calendar?limit=3&cursor={first['nextCursor']}", headers=auth_header(token))
+        second = resp.get_json()
+        assert [e['title'] for e in second['items']] == ['Day 4', 'Day 5']
+        assert second['nextCursor'] is None
+
+
+class TestCalendarWindow:
+    EVENTS = [
+        ('Before', '2026-02-10T09:00:00', None),
+        ('Spans start', '2026-02-25T09:00:00', '2026-03-02T17:00:00'),
+        ('Inside', '2026-03-15T09:00:00', None),
+        ('Inside range', '2026-03-20T09:00:00', '2026-03-22T17:00:00'),
+        ('Last day', '2026-03-31T18:00:00', None),
+        ('Spans whole', '2026-02-01T09:00:00', '2026-05-01T09:00:00'),
+        ('Ended before', '2026-02-20T09:00:00', '2026-02-28T23:00:00'),
+        ('After', '2026-04-01T00:00:00', None),
+    ]
+
+    def _seed(self, client, token):
+        for title, start, end in self.EVENTS:
+            body = {'title': title, 'startDate': start, 'type': 'event'}
+            if end:
+                body['endDate'] = end
+            assert client.post('/api/calendar', headers=auth_header(token), json=body).status_code == 201
+
+    def test_window_returns_overlapping_events(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        resp = client.get('/api/calendar?from=2026-03-01&to=2026-03-31', headers=auth_header(token))
+        assert resp.status_code == 200
+        assert [e['title'] for e in resp.get_json()] == [
+            'Spans whole', 'Spans start', 'Inside', 'Inside range', 'Last day',
+        ]
+
+    def test_open_ended_windows(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        resp = client.get('/api/calendar?from=2026-03-31T12:00:00Z', headers=auth_header(token))
+        assert [e['title'] for e in resp.get_json()] == ['Spans whole', 'Last day', 'After']
+        resp = client.get('/api/calendar?to=2026-02-10', headers=auth_header(token))
+        assert [e['title'] for e in resp.get_json()] == ['Spans whole', 'Before']
+
+    def test_window_with_pagination(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        resp = client.get('/api/calendar?from=2026-03-01&to=2026-03-31&limit=3', headers=auth_header(token))
+        first = resp.get_json()
+        assert [e['title'] for e in first['items']] == ['Spans whole', 'Spans start', 'Inside']
+        resp = client.get(f"/api/calendar?from=2026-03-01&to=2026-03-31&limit=3&cursor={first['nextCursor']}",
+                          headers=auth_header(token))
+        assert [e['title'] for e in resp.get_json()['items']] == ['Inside range', 'Last day']
+
+    def test_invalid_window(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        assert client.get('/api/calendar?from=soon', headers=auth_header(token)).status_code == 400
+        resp = client.get('/api/calendar?from=2026-04-01&to=2026-03-01', headers=auth_header(token))
+        assert resp.status_code == 400
+
+
+class TestRecurringEvents:
+    def _create(self, client, token, **body):
+        return client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'Weekly deadline', 'startDate': '2025-09-01T17:00:00Z', 'type': 'deadline', **body,
+        })
+
+    def test_create_normalizes_rule(self, client, seed_users):
+        from flask_app.models import CalendarEvent
+        token = get_token(client, 'testadmin')
+        resp = self._create(client, token, recurrence='freq=weekly;count=4')
+        assert resp.status_code == 201
+        assert resp.get_json()['recurrence'] == 'FREQ=WEEKLY;COUNT=4'
+        event = CalendarEvent.query.get(resp.get_json()['id'])
+        assert event.recurrence_end.isoformat() == '2025-09-22T17:00:00'
+
+    def test_invalid_rule(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        assert self._create(client, token, recurrence='FREQ=HOURLY').status_code == 400
+        assert self._create(client, token, recurrence='FREQ=WEEKLY;BYDAY=MO').status_code == 400
+        assert self._create(client, token, recurrence='nonsense').status_code == 400
+
+    def test_window_expands_occurrences(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, recurrence='FREQ=WEEKLY')
+        client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'Midterms', 'startDate': '2026-03-10T09:00:00Z', 'type': 'exam',
+        })
+        resp = client.get('/api/calendar?from=2026-03-01&to=2026-03-21', headers=auth_header(token))
+        assert [(e['title'], e['startDate']) for e in resp.get_json()] == [
+            ('Weekly deadline', '2026-03-02T17:00:00'),
+            ('Weekly deadline', '2026-03-09T17:00:00'),
+            ('Midterms', '2026-03-10T09:00:00'),
+            ('Weekly deadline', '2026-03-16T17:00:00'),
+        ]
+
+    def test_finished_series_is_not_expanded(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, recurrence='FREQ=WEEKLY;COUNT=4')
+        resp = client.get('/api/calendar?from=2026-03-01&to=2026-03-31', headers=auth_header(token))
+        assert resp.get_json() == []
+
+    def test_unwindowed_list_returns_series_once(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, recurrence='FREQ=DAILY')
+        resp = client.get('/api/calendar', headers=auth_header(token))
+        assert len(resp.get_json()) == 1
+        assert resp.get_json()[0]['recurrence'] == 'FREQ=DAILY'
+
+    def test_window_is_capped(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, recurrence='FREQ=DAILY')
+        resp = client.get('/api/calendar?from=2026-01-01&to=9999-12-31', headers=auth_header(token))
+        assert resp.status_code == 400
+        resp = client.get('/api/calendar?from=0001-01-01&to=0001-12-31', headers=auth_header(token))
+        assert resp.status_code == 200
+        resp = client.get('/api/calendar?from=2026-01-01&to=2026-12-31', headers=auth_header(token))
+        assert len(resp.get_json()) == 365
+
+    def test_feed_writes_rrule(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, recurrence='FREQ=MONTHLY;INTERVAL=2')
+        body = client.get('/api/calendar.ics', headers=auth_header(token)).get_data(as_text=True)
+        assert body.count('BEGIN:VEVENT') == 1
+        assert 'RRULE:FREQ=MONTHLY;INTERVAL=2' in body
+
+    def test_expansion(self):
+        from datetime import datetime
+        from flask_app.recurrence import expand, series_end
+        starts = [s for s, _ in expand('FREQ=MONTHLY', datetime(2026, 1, 31), None,
+                                       datetime(2026, 1, 1), datetime(2026, 6, 1))]
+        assert starts == [datetime(2026, 1, 31), datetime(2026, 3, 31), datetime(2026, 5, 31)]
+
+        occurrences = expand('FREQ=DAILY;INTERVAL=3', datetime(2026, 1, 1, 9), datetime(2026, 1, 2, 12),
+                             datetime(2026, 1, 5), datetime(2026, 1, 8))
+        assert occurrences == (
+            (datetime(2026, 1, 4, 9), datetime(2026, 1, 5, 12)),
+            (datetime(2026, 1, 7, 9), datetime(2026, 1, 8, 12)),
+        )
+        assert series_end('FREQ=YEARLY', datetime(2026, 1, 1), None) is None
+        assert len(expand('FREQ=DAILY', datetime(2026, 1, 1), None, datetime(2026, 1, 1), datetime(9999, 1, 1))) == 1000
+        assert expand('FREQ=DAILY', datetime(1, 1, 2), datetime(1, 1, 3), datetime(1, 1, 1), datetime(1, 1, 3)) == (
+            (datetime(1, 1, 2), datetime(1, 1, 3)),
+        )
+        assert series_end('FREQ=DAILY;UNTIL=20260110', datetime(2026, 1, 1), None) == datetime(2026, 1, 10)
+
+
+class TestCalendarConflicts:
+    def _create(self, client, token, title, start, etype, **body):
+        return client.post('/api/calendar', headers=auth_header(token), json={
+            'title': title, 'startDate': start, 'type': etype, **body,
+        })
+
+    def test_exam_on_holiday_is_reported(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        holiday = self._create(client, token, 'Eid', '2026-03-20T00:00:00Z', 'holiday').get_json()
+        assert holiday['conflicts'] == []
+
+        resp = self._create(client, token, 'Final', '2026-03-20T09:00:00Z', 'exam',
+                            endDate='2026-03-20T12:00:00Z')
+        assert resp.status_code == 201
+        assert [c['id'] for c in resp.get_json()['conflicts']] == [holiday['id']]
+
+    def test_non_conflicting_types_and_times(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, 'Exam A', '2026-03-10T09:00:00Z', 'exam', endDate='2026-03-10T12:00:00Z')
+        resp = self._create(client, token, 'Exam B', '2026-03-10T12:00:00Z', 'exam', endDate='2026-03-10T15:00:00Z')
+        assert resp.get_json()['conflicts'] == []
+        resp = self._create(client, token, 'Fair', '2026-03-10T10:00:00Z', 'event')
+        assert resp.get_json()['conflicts'] == []
+        resp = self._create(client, token, 'Exam C', '2026-03-10T11:00:00Z', 'exam', endDate='2026-03-10T13:00:00Z')
+        assert [c['title'] for c in resp.get_json()['conflicts']] == ['Exam A', 'Exam B']
+
+    def test_recurring_events_conflict_by_occurrence(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, 'Weekly quiz', '2026-01-05T09:00:00Z', 'exam',
+                     endDate='2026-01-05T10:00:00Z', recurrence='FREQ=WEEKLY')
+        resp = self._create(client, token, 'Spring Break', '2026-03-16T00:00:00Z', 'holiday',
+                            endDate='2026-03-21T00:00:00Z')
+        assert [c['startDate'] for c in resp.get_json()['conflicts']] == ['2026-03-16T09:00:00']
+
+        resp = self._create(client, token, 'Weekly deadline', '2026-01-07T17:00:00Z', 'deadline',
+                            recurrence='FREQ=WEEKLY;COUNT=20')
+        assert [c['title'] for c in resp.get_json()['conflicts']] == ['Spring Break']
+
+    def test_conflicts_report(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._create(client, token, 'Eid', '2026-03-20T00:00:00Z', 'holiday')
+        self._create(client, token, 'Final', '2026-03-20T09:00:00Z', 'exam')
+        self._create(client, token, 'Old final', '2025-03-20T09:00:00Z', 'exam')
+        self._create(client, token, 'Old holiday', '2025-03-20T00:00:00Z', 'holiday')
+
+        resp = client.get('/api/calendar/conflicts?from=2026-01-01&to=2026-12-31', headers=auth_header(token))
+        assert resp.status_code == 200
+        assert [(c['first']['title'], c['second']['title']) for c in resp.get_json()['conflicts']] == [('Eid', 'Final')]
+
+        student = get_token(client, 'teststudent')
+        assert client.get('/api/calendar/conflicts', headers=auth_header(student)).status_code == 403
+
+    def test_conflict_check_is_one_windowed_query(self, client, seed_users, app):
+        from datetime import datetime, timedelta
+        from flask_app import db
+        from flask_app.models import CalendarEvent
+        from tests.conftest import count_queries
+        start = datetime(2016, 1, 1, 9)
+        db.session.add_all([
+            CalendarEvent(title=f'Exam {i}', type='exam', start_date=start + timedelta(days=i),
+                          end_date=start + timedelta(days=i, hours=2))
+            for i in range(3650)
+        ])
+        db.session.commit()
+
+        token = get_token(client, 'testadmin')
+        with count_queries() as statements:
+            resp = self._create(client, token, 'Holiday', '2020-06-01T00:00:00Z', 'holiday')
+        assert [c['title'] for c in resp.get_json()['conflicts']] == ['Exam 1613']
+        assert len([s for s in statements if s.lstrip().startswith('SELECT') and 'calendar_events' in s]) == 2
+
+
+class TestCalendarFeed:
+    def _seed(self, client, token):
+        for title, start, etype in [('Spring Break', '2026-03-20T00:00:00Z', 'holiday'),
+                                    ('Midterms; Week 7, all', '2026-03-05T09:00:00Z', 'exam')]:
+            client.post('/api/calendar', headers=auth_header(token), json={
+                'title': title, 'startDate': start, 'type': etype, 'description': 'Line one\nLine two',
+            })
+
+    def test_feed_streams_events(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        resp = client.get('/api/calendar.ics', headers=auth_header(token))
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.mimetype == 'text/calendar'
+        body = resp.get_data(as_text=True)
+        assert body.startswith('BEGIN:VCALENDAR\r\n')
+        assert body.endswith('END:VCALENDAR\r\n')
+        assert body.count('BEGIN:VEVENT') == 2
+        assert body.index('Midterms') < body.index('Spring Break')
+        assert 'SUMMARY:Midterms\\; Week 7\\, all' in body
+        assert 'DESCRIPTION:Line one\\nLine two' in body
+        assert 'DTSTART:20260305T090000Z' in body
+
+    def test_type_filter(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        body = client.get('/api/calendar.ics?type=holiday', headers=auth_header(token)).get_data(as_text=True)
+        assert body.count('BEGIN:VEVENT') == 1
+        assert 'CATEGORIES:HOLIDAY' in body
+        assert client.get('/api/calendar.ics?type=party', headers=auth_header(token)).status_code == 400
+
+    def test_conditional_requests(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        self._seed(client, token)
+        resp = client.get('/api/calendar.ics', headers=auth_header(token))
+        etag = resp.headers['ETag']
+        assert resp.headers['Last-Modified']
+
+        resp = client.get('/api/calendar.ics', headers={**auth_header(token), 'If-None-Match': etag})
+        assert resp.status_code == 304
+
+        client.post('/api/calendar', headers=auth_header(token), json={
+            'title': 'New', 'startDate': '2026-04-01T00:00:00Z', 'type': 'event',
+        })
+        resp = client.get('/api/calendar.ics', headers={**auth_header(token), 'If-None-Match': etag})
+        assert resp.status_code == 200
+        resp = client.get('/api/calendar.ics?type=holiday', headers={**auth_header(token), 'If-None-Match': etag})
+        assert resp.status_code == 200
+
+    def test_feed_token(self, client, seed_users, app):
+        from flask_app import db
+        from flask_app.models import User
+        token = get_token(client, 'teststudent')
+        url = client.get('/api/calendar/feed-token', headers=auth_header(token)).get_json()['url']
+        assert client.get(url).status_code == 200
+        assert client.get('/api/calendar.ics').status_code == 401
+        assert client.get(url + 'x').status_code == 401
+
+        user = User.query.filter_by(username='teststudent').first()
+        user.is_active = False
+        db.session.commit()
+        assert client.get(url).status_code == 401
+
+    def test_long_lines_are_folded(self):
+        from flask_app.ical import fold_line
+        folded = fold_line('SUMMARY:' + 'é' * 100)
+        parts = folded.split('\r\n ')
+        assert all(len(p.rstrip('\r\n').encode('utf-8')) <= 75 for p in parts)
+        assert ''.join(parts) == 'SUMMARY:' + 'é' * 100 + '\r\n'
+
+
+class TestCalendarCache:
+    def _create_event(self, client, token, title='Event'):
+        return client.post('/api/calendar', headers=auth_header(token), json={
+            'title': title, 'startDate': '2026-06-01T09:00:00Z', 'type': 'event',
+        })
+
+    def test_repeat_list_skips_query(self, client, seed_users):
+        from tests.conftest import count_queries
+        token = get_token(client, 'testadmin')
+        self._create_event(client, token)
+        client.get('/api/calendar', headers=auth_header(token))
+
+        with count_queries() as statements:
+            resp = client.get('/api/calendar', headers=auth_header(token))
+        assert resp.status_code == 200
+        assert len(resp.get_json()) == 1
+        assert not any('calendar_events' in s for s in statements)
+
+    def test_if_none_match_returns_304(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        resp = client.get('/api/calendar', headers=auth_header(token))
+        etag = resp.headers['ETag']
+        assert etag
+
+        headers = {**auth_header(token), 'If-None-Match': etag}
+        resp = client.get('/api/calendar', headers=headers)
+        assert resp.status_code == 304
+        assert resp.get_data() == b''
+
+    def test_create_invalidates_cache(self, client, seed_users):
+        admin = get_token(client, 'testadmin')
+        student = get_token(client, 'teststudent')
+        resp = client.get('/api/calendar', headers=auth_header(student))
+        etag = resp.headers['ETag']
+
+        assert self._create_event(client, admin, 'New').status_code == 201
+
+        resp = client.get('/api/calendar', headers={**auth_header(student), 'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+        assert [e['title'] for e in resp.get_json()] == ['New']
+
+    def test_rolled_back_change_keeps_version(self, client, seed_users, app):
+        from datetime import datetime
+        from flask_app import calendar_cache, db
+        from flask_app.models import CalendarEvent
+        version = calendar_cache.version
+        db.session.add(CalendarEvent(title='Draft', start_date=datetime(2026, 1, 1), type='event'))
+        db.session.flush()
+        db.session.rollback()
+        assert calendar_cache.version == version
+
 
 class TestPayments:
     def _create_doc_request(self, client, token):
@@ -147,3 +502,403 @@ class TestNotifications:
     def test_unauthenticated_blocked(self, client, seed_users):
         resp = client.get('/api/notifications')
         assert resp.status_code == 401
+
+
+class TestStatusNotifications:
+    def _create_doc_requests(self, client, count):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, User
+        student = User.query.filter_by(username='teststudent').first()
+        rows = [DocumentRequest(user_id=student.id, type='transcript', urgency='normal', copies=1,
+                                amount=500, status='completed') for _ in range(count)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [r.id for r in rows]
+
+    def _notifications(self, client, username='teststudent'):
+        token = get_token(client, username)
+        return client.get('/api/notifications', headers=auth_header(token)).get_json()
+
+    def test_status_change_notifies_owner(self, client, seed_users):
+        req_id = self._create_doc_requests(client, 1)[0]
+        admin = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(admin),
+                     json={'status': 'approved'})
+
+        notifications = self._notifications(client)
+        assert [(n['title'], n['type'], n['isRead']) for n in notifications] == [
+            ('Document request approved', 'document_request', False),
+        ]
+        assert f'#{req_id}' in notifications[0]['message']
+
+        client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(admin),
+                     json={'status': 'approved'})
+        assert len(self._notifications(client)) == 1
+
+    def test_petition_change_notifies_instructor(self, client, seed_users):
+        instructor = get_token(client, 'testinstructor')
+        pet_id = client.post('/api/petitions', headers=auth_header(instructor), json={
+            'studentId': 'STU-001', 'courseCode': 'CS200', 'currentGrade': 'B', 'newGrade': 'A',
+            'justification': 'Score recalculation',
+        }).get_json()['id']
+        admin = get_token(client, 'testadmin')
+        client.patch(f'/api/petitions/{pet_id}/status', headers=auth_header(admin), json={'status': 'rejected'})
+        assert [n['title'] for n in self._notifications(client, 'testinstructor')] == ['Grade change petition rejected']
+
+    def test_payment_notifies_student(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        req_id = client.post('/api/document-requests', headers=auth_header(token), json={
+            'type': 'transcript', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+        }).get_json()['id']
+        client.post('/api/payments', headers=auth_header(token), json={
+            'requestId': req_id, 'amount': 500, 'method': 'online',
+        })
+        assert [n['type'] for n in self._notifications(client)] == ['payment']
+
+    def test_rolled_back_change_does_not_notify(self, client, seed_users):
+        first, second = self._create_doc_requests(client, 2)
+        admin = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{first}/status', headers=auth_header(admin),
+                     json={'status': 'pending_approval'})
+        resp = client.patch(f'/api/document-requests/{second}/status', headers=auth_header(admin),
+                            json={'status': 'pending_approval'})
+        assert resp.status_code == 400
+        assert len(self._notifications(client)) == 1
+
+    def test_bulk_change_is_one_insert(self, client, seed_users):
+        from tests.conftest import count_queries
+        ids = self._create_doc_requests(client, 25)
+        admin = get_token(client, 'testadmin')
+        with count_queries() as statements:
+            resp = client.patch('/api/document-requests/bulk-status', headers=auth_header(admin),
+                                json={'ids': ids, 'status': 'approved'})
+        assert resp.get_json()['updated'] == 25
+        assert len([s for s in statements if s.startswith('INSERT INTO notifications')]) == 1
+        assert len(self._notifications(client)) == 25
+
+    def test_background_writer(self, client, seed_users, app):
+        from flask_app import notification_writer
+        ids = self._create_doc_requests(client, 3)
+        admin = get_token(client, 'testadmin')
+        notification_writer.background = True
+        try:
+            for req_id in ids:
+                client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(admin),
+                             json={'status': 'rejected'})
+            notification_writer.drain()
+        finally:
+            notification_writer.shutdown()
+            notification_writer.background = False
+        assert len(self._notifications(client)) == 3
+        assert notification_writer.batches_written <= 3
+
+    def test_shutdown_writes_queued_batches(self, client, seed_users, app):
+        from flask_app import notification_writer
+        ids = self._create_doc_requests(client, 3)
+        admin = get_token(client, 'testadmin')
+        notification_writer.background = True
+        notification_writer.flush_interval = 60
+        try:
+            for req_id in ids:
+                client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(admin),
+                             json={'status': 'rejected'})
+        finally:
+            notification_writer.shutdown()
+            notification_writer.background = False
+        assert len(self._notifications(client)) == 3
+
+    def test_failed_write_is_retried_once(self, client, seed_users, monkeypatch):
+        from flask_app import notification_writer
+        write = notification_writer._write
+        attempts = []
+
+        def flaky(rows):
+            attempts.append(len(rows))
+            if len(attempts) == 1:
+                raise RuntimeError('connection reset')
+            write(rows)
+
+        monkeypatch.setattr(notification_writer, '_write', flaky)
+        ids = self._create_doc_requests(client, 1)
+        admin = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{ids[0]}/status', headers=auth_header(admin),
+                     json={'status': 'rejected'})
+        assert attempts == [1, 1]
+        assert len(self._notifications(client)) == 1
+
+
+class TestUnreadNotifications:
+    def _seed(self, app, username='teststudent', count=5):
+        from datetime import datetime, timedelta
+        from flask_app import db
+        from flask_app.models import Notification, User
+        user = User.query.filter_by(username=username).first()
+        rows = [Notification(user_id=user.id, title=f'N{i}', message='m', is_read=False,
+                             created_at=datetime(2026, 1, 1) + timedelta(days=i)) for i in range(count)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [r.id for r in rows]
+
+    def _count(self, client, token):
+        return client.get('/api/notifications/unread-count', headers=auth_header(token)).get_json()['count']
+
+    def test_unread_count(self, client, seed_users, app):
+        self._seed(app)
+        self._seed(app, 'testadmin', 2)
+        token = get_token(client, 'teststudent')
+        assert self._count(client, token) == 5
+        assert client.get('/api/notifications/unread-count').status_code == 401
+
+    def test_mark_ids_read(self, client, seed_users, app):
+        from tests.conftest import count_queries
+        ids = self._seed(app)
+        admin_ids = self._seed(app, 'testadmin', 2)
+        token = get_token(client, 'teststudent')
+        with count_queries() as statements:
+            resp = client.patch('/api/notifications/read', headers=auth_header(token),
+                                json={'ids': ids[:3] + admin_ids})
+        assert resp.get_json() == {'updated': 3}
+        assert len([s for s in statements if s.startswith('UPDATE notifications')]) == 1
+        assert self._count(client, token) == 2
+        assert self._count(client, get_token(client, 'testadmin')) == 2
+
+    def test_mark_before_timestamp(self, client, seed_users, app):
+        self._seed(app)
+        token = get_token(client, 'teststudent')
+        resp = client.patch('/api/notifications/read', headers=auth_header(token),
+                            json={'before': '2026-01-03T00:00:00Z'})
+        assert resp.get_json() == {'updated': 3}
+        assert self._count(client, token) == 2
+        resp = client.patch('/api/notifications/read', headers=auth_header(token),
+                            json={'before': '2026-01-03T00:00:00Z'})
+        assert resp.get_json() == {'updated': 0}
+
+    def test_invalid_body(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        for body in [{}, {'ids': 'all'}, {'ids': [True]}, {'before': 'yesterday'}]:
+            assert client.patch('/api/notifications/read', headers=auth_header(token), json=body).status_code == 400
+
+
+class TestServerEvents:
+    def _ticket(self, client, token):
+        resp = client.post('/api/events/ticket', headers=auth_header(token))
+        assert resp.status_code == 200
+        return resp.get_json()['ticket']
+
+    def _open(self, client, token):
+        resp = client.get(f'/api/events?ticket={self._ticket(client, token)}', buffered=False)
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/event-stream'
+        chunks = iter(resp.response)
+        assert next(chunks) == b'retry: 5000\n\n'
+        return resp, chunks
+
+    def _event(self, chunk):
+        import json
+        name, data = chunk.decode().strip().split('\n')
+        return name[len('event: '):], json.loads(data[len('data: '):])
+
+    def test_requires_access_token(self, client, seed_users):
+        assert client.get('/api/events').status_code == 401
+        assert client.get('/api/events?ticket=garbage').status_code == 401
+        refresh = client.post('/api/auth/login', json={
+            'username': 'teststudent', 'password': 'pass123',
+        }).get_json()['refresh_token']
+        assert client.post('/api/events/ticket', headers=auth_header(refresh)).status_code == 401
+        assert client.get(f'/api/events?token={get_token(client, "teststudent")}').status_code == 401
+
+    def test_ticket_is_single_use(self, client, seed_users):
+        ticket = self._ticket(client, get_token(client, 'teststudent'))
+        resp = client.get(f'/api/events?ticket={ticket}', buffered=False)
+        assert resp.status_code == 200
+        resp.close()
+        assert client.get(f'/api/events?ticket={ticket}').status_code == 401
+
+    def test_ticket_expires(self, client, seed_users, app):
+        ticket = self._ticket(client, get_token(client, 'teststudent'))
+        app.config['EVENT_TICKET_MAX_AGE'] = -1
+        assert client.get(f'/api/events?ticket={ticket}').status_code == 401
+
+    def test_status_change_is_pushed(self, client, seed_users):
+        from flask_app import db, pubsub
+        from flask_app.models import DocumentRequest, User
+        student = User.query.filter_by(username='teststudent').first()
+        doc = DocumentRequest(user_id=student.id, type='transcript', urgency='normal', copies=1,
+                              amount=500, status='completed')
+        db.session.add(doc)
+        db.session.commit()
+
+        student_resp, student_chunks = self._open(client, get_token(client, 'teststudent'))
+        admin_resp, admin_chunks = self._open(client, get_token(client, 'testadmin'))
+        assert pubsub.subscriber_count() == 2
+
+        admin = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{doc.id}/status', headers=auth_header(admin),
+                     json={'status': 'approved'})
+
+        status = {'module': 'document_requests', 'id': doc.id, 'status': 'approved'}
+        notification = self._event(next(student_chunks))
+        assert notification[0] == 'notification'
+        assert notification[1]['title'] == 'Document request approved'
+        assert self._event(next(student_chunks)) == ('status', status)
+        assert self._event(next(admin_chunks)) == ('status', status)
+
+        student_resp.close()
+        admin_resp.close()
+        assert pubsub.subscriber_count() == 0
+
+    def test_rolled_back_change_is_not_pushed(self, client, seed_users, app):
+        from flask_app.notifications import publish_after_commit
+        from flask_app.pubsub import ADMIN_CHANNEL
+        from flask_app import db
+        app.config['SSE_HEARTBEAT_INTERVAL'] = 0.01
+        resp, chunks = self._open(client, get_token(client, 'testadmin'))
+        publish_after_commit(ADMIN_CHANNEL, 'status', {})
+        db.session.rollback()
+        assert next(chunks) == b': keep-alive\n\n'
+        resp.close()
+
+    def test_stream_ends_when_token_expires(self, client, seed_users, app):
+        from datetime import timedelta
+        from flask_app import pubsub
+        app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(seconds=1)
+        resp, chunks = self._open(client, get_token(client, 'teststudent'))
+        assert list(chunks) == []
+        assert pubsub.subscriber_count() == 0
+        resp.close()
+
+    def test_stream_ends_when_token_is_revoked(self, client, seed_users, app):
+        from flask_app import db, pubsub
+        from flask_app.models import User
+        app.config['SSE_HEARTBEAT_INTERVAL'] = 0.01
+        resp, chunks = self._open(client, get_token(client, 'testadmin'))
+        assert next(chunks) == b': keep-alive\n\n'
+
+        user = User.query.filter_by(username='testadmin').first()
+        user.role = 'student'
+        db.session.commit()
+        assert list(chunks) == []
+        assert pubsub.subscriber_count() == 0
+        resp.close()
+
+    def test_subscriber_limit(self, client, seed_users):
+        from flask_app import pubsub
+        pubsub.max_subscribers = 1
+        token = get_token(client, 'teststudent')
+        resp, _ = self._open(client, token)
+        full = client.get(f'/api/events?ticket={self._ticket(client, token)}')
+        assert full.status_code == 503
+        assert full.headers['Retry-After'] == '30'
+        resp.close()
+
+    def test_bulk_update_is_one_relay_send_with_admin_summary(self, client, seed_users, monkeypatch):
+        from flask_app import db, pubsub
+        from flask_app.models import DocumentRequest, User
+        from flask_app.pubsub import ADMIN_CHANNEL
+
+        class RecordingRelay:
+            def __init__(self):
+                self.sent = []
+
+            def send(self, messages):
+                self.sent.append(messages)
+
+        relay = RecordingRelay()
+        monkeypatch.setattr(pubsub, '_relay', relay)
+        student = User.query.filter_by(username='teststudent').first()
+        docs = [DocumentRequest(user_id=student.id, type='transcript', status='completed') for _ in range(3)]
+        db.session.add_all(docs)
+        db.session.commit()
+        ids = [d.id for d in docs]
+
+        admin = get_token(client, 'testadmin')
+        client.patch('/api/document-requests/bulk-status', headers=auth_header(admin),
+                     json={'ids': ids, 'status': 'approved'})
+        # One send for the committed status events, one for the written
+        # notifications.
+        assert len(relay.sent) == 2
+        status_events, notification_events = sorted(relay.sent, key=lambda sent: sent[0]['event'] == 'notification')
+        assert [m['data'] for m in status_events if m['channel'] == ADMIN_CHANNEL] == [
+            {'module': 'document_requests', 'ids': ids, 'status': 'approved'},
+        ]
+        assert len(status_events) == 4
+        assert [m['event'] for m in notification_events] == ['notification'] * 3
+
+    def test_relay_payloads_fit_in_notify(self):
+        import json
+        from flask_app.pubsub import PG_PAYLOAD_LIMIT, PostgresRelay
+        messages = [{'channel': 'user:x', 'event': 'status', 'data': {'id': i, 'pad': 'x' * 100}} for i in range(200)]
+        payloads = PostgresRelay._payloads(messages)
+        assert len(payloads) > 1
+        assert all(len(p) <= PG_PAYLOAD_LIMIT for p in payloads)
+        assert [m for p in payloads for m in json.loads(p)] == messages
+
+    def test_full_queue_drops_messages(self):
+        from flask_app.pubsub import PubSub
+        pubsub = PubSub()
+        pubsub.max_queue = 2
+        subscription = pubsub.subscribe(['a', 'b'])
+        for i in range(3):
+            pubsub.publish('a', 'tick', i)
+        pubsub.publish('c', 'tick', 9)
+        assert [subscription.get(0)['data'] for _ in range(2)] == [0, 1]
+        assert subscription.get(0) is None
+        assert subscription.dropped == 1
+        subscription.close()
+        assert pubsub.subscriber_count() == 0
+
+
+class TestNotificationRetention:
+    def _seed(self, username, days_ago, is_read=True):
+        from datetime import datetime, timedelta
+        from flask_app import db
+        from flask_app.models import Notification, User
+        user = User.query.filter_by(username=username).first()
+        now = datetime.utcnow()
+        rows = [Notification(user_id=user.id, title=f'N{d}', message='m', is_read=is_read,
+                             created_at=now - timedelta(days=d, minutes=i)) for i, d in enumerate(days_ago)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return user.id
+
+    def _titles(self, model, user_id):
+        return sorted(n.title for n in model.query.filter_by(user_id=user_id))
+
+    def test_archives_expired_read_notifications(self, client, seed_users, app):
+        from flask_app.models import ArchivedNotification, Notification
+        from flask_app.notification_retention import compact_notifications
+        user_id = self._seed('teststudent', [1, 100, 200])
+        self._seed('teststudent', [300], is_read=False)
+
+        counts = compact_notifications(max_age_days=90, per_user_cap=0, batch_size=1)
+        assert counts == {'expired': 2, 'over_cap': 0}
+        assert self._titles(Notification, user_id) == ['N1', 'N300']
+        assert self._titles(ArchivedNotification, user_id) == ['N100', 'N200']
+
+    def test_caps_read_notifications_per_user(self, client, seed_users, app):
+        from flask_app.models import ArchivedNotification, Notification
+        from flask_app.notification_retention import compact_notifications
+        student = self._seed('teststudent', [1, 2, 3, 4, 5])
+        self._seed('teststudent', [6], is_read=False)
+        admin = self._seed('testadmin', [1, 2])
+
+        counts = compact_notifications(max_age_days=0, per_user_cap=3, batch_size=2)
+        assert counts == {'expired': 0, 'over_cap': 2}
+        assert self._titles(Notification, student) == ['N1', 'N2', 'N3', 'N6']
+        assert self._titles(ArchivedNotification, student) == ['N4', 'N5']
+        assert self._titles(Notification, admin) == ['N1', 'N2']
+
+    def test_delete_without_archive(self, client, seed_users, app):
+        from flask_app.models import ArchivedNotification, Notification
+        from flask_app.notification_retention import compact_notifications
+        self._seed('teststudent', [100, 200])
+        compact_notifications(max_age_days=90, archive=False)
+        assert Notification.query.count() == 0
+        assert ArchivedNotification.query.count() == 0
+
+    def test_cli(self, client, seed_users, app):
+        from flask_app.notification_retention import compact_notifications_command
+        self._seed('teststudent', [100])
+        result = app.test_cli_runner().invoke(compact_notifications_command, ['--days', '30', '--cap', '50'])
+        assert result.exit_code == 0
+        assert 'Archived 1 expired and 0 over-cap notifications.' in result.output
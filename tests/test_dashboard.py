@@ -0,0 +1,70 @@
+import pytest
+from tests.conftest import get_token, auth_header
+
+
+class TestDashboardSummary:
+    def _create_requests(self, client):
+        s_token = get_token(client, 'teststudent')
+        resp = client.post('/api/document-requests', headers=auth_header(s_token), json={
+            'type': 'transcript', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+        })
+        client.post('/api/major-applications', headers=auth_header(s_token), json={
+            'requestedMajor': 'Computer Science', 'school': 'SBASSE',
+        })
+        i_token = get_token(client, 'testinstructor')
+        client.post('/api/petitions', headers=auth_header(i_token), json={
+            'studentId': 'STU-001', 'courseCode': 'CS100', 'currentGrade': 'B',
+            'newGrade': 'A', 'justification': 'Grading error',
+        })
+        return resp.get_json()['id']
+
+    def test_admin_sees_all_modules(self, client, seed_users):
+        self._create_requests(client)
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/dashboard/summary', headers=auth_header(token))
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['documentRequests']['counts'] == {'payment_pending': 1}
+        assert data['petitions']['counts'] == {'submitted': 1}
+        assert data['majorApplications']['counts'] == {'submitted': 1}
+        assert data['documentRequests']['total'] == 1
+        assert len(data['documentRequests']['recent']) == 1
+
+    def test_counts_follow_status_changes(self, client, seed_users):
+        req_id = self._create_requests(client)
+        token = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(token),
+                     json={'status': 'completed'})
+        resp = client.get('/api/dashboard/summary', headers=auth_header(token))
+        assert resp.get_json()['documentRequests']['counts'] == {'completed': 1}
+
+    def test_student_scoped_to_own_rows(self, client, seed_users):
+        self._create_requests(client)
+        token = get_token(client, 'teststudent')
+        data = client.get('/api/dashboard/summary', headers=auth_header(token)).get_json()
+        assert data['documentRequests']['total'] == 1
+        assert data['majorApplications']['total'] == 1
+        assert data['petitions'] == {'counts': {}, 'total': 0, 'recent': []}
+
+    def test_instructor_scoped_to_own_petitions(self, client, seed_users):
+        self._create_requests(client)
+        token = get_token(client, 'testinstructor')
+        data = client.get('/api/dashboard/summary', headers=auth_header(token)).get_json()
+        assert data['petitions']['total'] == 1
+        assert data['documentRequests']['total'] == 0
+
+    def test_recent_limit(self, client, seed_users):
+        self._create_requests(client)
+        token = get_token(client, 'testadmin')
+        data = client.get('/api/dashboard/summary?recent=0', headers=auth_header(token)).get_json()
+        assert data['documentRequests']['recent'] == []
+        assert data['documentRequests']['total'] == 1
+
+    def test_invalid_recent(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/dashboard/summary?recent=abc', headers=auth_header(token))
+        assert resp.status_code == 400
+
+    def test_unauthenticated_blocked(self, client, seed_users):
+        resp = client.get('/api/dashboard/summary')
+        assert resp.status_code == 401
@@ -1,5 +1,6 @@
 import pytest
-from tests.conftest import get_token, auth_header
+from datetime import datetime
+from tests.conftest import get_token, auth_header, count_queries
 
 
 class TestListDocumentRequests:
@@ -25,6 +26,146 @@ class TestListDocumentRequests:
         resp = client.get('/api/document-requests')
         assert resp.status_code == 401
 
+    def test_projection_matches_to_dict(self, client, seed_users):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, Payment, User
+        from flask_app.projection import DOCUMENT_REQUEST, MAJOR_APPLICATION, NOTIFICATION, PETITION
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        paid = DocumentRequest(user_id=student_id, type='transcript', urgency='urgent', status='completed',
+                               copies=2, amount=500, details={'purpose': 'visa'}, created_at=datetime(2026, 1, 1))
+        unpaid = DocumentRequest(user_id=student_id, type='degree', urgency='normal', status='completed',
+                                 created_at=datetime(2026, 1, 2), updated_at=None)
+        db.session.add_all([paid, unpaid])
+        db.session.flush()
+        db.session.add_all([
+            Payment(request_id=paid.id, amount=500, status='paid', method='online', created_at=datetime(2026, 1, 3)),
+            Payment(request_id=paid.id, amount=100, status='paid', method='voucher'),
+        ])
+        db.session.commit()
+
+        token = get_token(client, 'testadmin')
+        data = client.get('/api/document-requests?sort=createdAt', headers=auth_header(token)).get_json()
+        expected = []
+        for req in (paid, unpaid):
+            req_dict = req.to_dict()
+            if req.payments:
+                req_dict['payment'] = req.payments[0].to_dict()
+            expected.append(req_dict)
+        assert data == expected
+
+        for projection in (DOCUMENT_REQUEST, PETITION, MAJOR_APPLICATION, NOTIFICATION):
+            assert set(projection.keys) == set(projection.model().to_dict())
+
+    def test_admin_list_query_count_is_constant(self, client, seed_users):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, Payment, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        now = datetime.utcnow()
+        db.session.add_all([
+            DocumentRequest(user_id=student_id, type='transcript', urgency='normal',
+                            status='completed', copies=1, amount=500,
+                            created_at=now, updated_at=now)
+            for _ in range(3000)
+        ])
+        db.session.flush()
+        request_ids = [r.id for r in DocumentRequest.query.all()]
+        db.session.add_all([
+            Payment(request_id=req_id, amount=500, status='paid', method='online', created_at=now)
+            for req_id in request_ids[::2]
+        ])
+        db.session.commit()
+
+        token = get_token(client, 'testadmin')
+        with count_queries() as statements:
+            resp = client.get('/api/document-requests', headers=auth_header(token))
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data) == 3000
+        assert sum(1 for d in data if 'payment' in d) == 1500
+        assert len(statements) <= 2
+
+
+class TestPaginateDocumentRequests:
+    def _seed_requests(self, count):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        now = datetime.utcnow()
+        db.session.add_all([
+            DocumentRequest(user_id=student_id, type='transcript', urgency='normal',
+                            status='approved', copies=1, created_at=now, updated_at=now)
+            for _ in range(count)
+        ])
+        db.session.commit()
+
+    def test_walks_all_pages_with_cursor(self, client, seed_users):
+        self._seed_requests(25)
+        token = get_token(client, 'testadmin')
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/document-requests?limit=10'
+            if cursor:
+                url += f'&cursor={cursor}'
+            resp = client.get(url, headers=auth_header(token))
+            assert resp.status_code == 200
+            data = resp.get_json()
+            assert len(data['items']) <= 10
+            seen.extend(item['id'] for item in data['items'])
+            cursor = data['nextCursor']
+            if not cursor:
+                break
+
+        assert len(seen) == 25
+        assert seen == sorted(seen, reverse=True)
+
+    def _walk(self, client, token, url):
+        seen = []
+        cursor = None
+        while True:
+            resp = client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=auth_header(token))
+            assert resp.status_code == 200
+            data = resp.get_json()
+            seen.extend(item['id'] for item in data['items'])
+            cursor = data['nextCursor']
+            if not cursor:
+                return seen
+
+    def test_null_created_at_at_page_boundary(self, client, seed_users):
+        from sqlalchemy import text
+        from flask_app import db
+        self._seed_requests(4)
+        # The two newest rows fall at the end of the first ascending page and
+        # the start of the first descending one.
+        db.session.execute(text('UPDATE document_requests SET created_at = NULL WHERE id IN (3, 4)'))
+        db.session.commit()
+        token = get_token(client, 'testadmin')
+
+        assert self._walk(client, token, '/api/document-requests?limit=3') == [4, 3, 2, 1]
+        assert self._walk(client, token, '/api/document-requests?limit=1') == [4, 3, 2, 1]
+        assert self._walk(client, token, '/api/document-requests?limit=3&sort=createdAt') == [1, 2, 3, 4]
+        assert self._walk(client, token, '/api/document-requests?limit=1&sort=createdAt') == [1, 2, 3, 4]
+
+    def test_unpaginated_default_returns_list(self, client, seed_users):
+        self._seed_requests(3)
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests', headers=auth_header(token))
+        assert isinstance(resp.get_json(), list)
+
+    def test_invalid_cursor(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?cursor=garbage', headers=auth_header(token))
+        assert resp.status_code == 400
+
+    def test_invalid_limit(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?limit=0', headers=auth_header(token))
+        assert resp.status_code == 400
+
 
 class TestCreateDocumentRequest:
     def test_student_create_success(self, client, seed_users):
@@ -66,6 +207,20 @@ class TestCreateDocumentRequest:
         assert resp.status_code == 400
         assert 'pending' in resp.get_json()['message'].lower()
 
+    def test_new_request_allowed_after_rejection(self, client, seed_users):
+        token = get_token(client, 'teststudent')
+        first = client.post('/api/document-requests', headers=auth_header(token), json={
+            'type': 'transcript', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+        }).get_json()
+        a_token = get_token(client, 'testadmin')
+        client.patch(f"/api/document-requests/{first['id']}/status",
+                     headers=auth_header(a_token), json={'status': 'rejected'})
+
+        resp = client.post('/api/document-requests', headers=auth_header(token), json={
+            'type': 'degree', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+        })
+        assert resp.status_code == 201
+
     def test_instructor_cannot_create(self, client, seed_users):
         token = get_token(client, 'testinstructor')
         resp = client.post('/api/document-requests', headers=auth_header(token), json={
@@ -118,9 +273,258 @@ class TestUpdateDocumentRequestStatus:
                             json={'status': 'invalid_status'})
         assert resp.status_code == 400
 
+    def test_reopen_conflicts_with_other_pending(self, client, seed_users):
+        s_token = get_token(client, 'teststudent')
+        a_token = get_token(client, 'testadmin')
+        first_id = self._create_request(client, s_token)
+        client.patch(f'/api/document-requests/{first_id}/status',
+                     headers=auth_header(a_token), json={'status': 'rejected'})
+        self._create_request(client, s_token)
+
+        resp = client.patch(f'/api/document-requests/{first_id}/status',
+                            headers=auth_header(a_token), json={'status': 'pending_approval'})
+        assert resp.status_code == 400
+        assert 'pending' in resp.get_json()['message'].lower()
+
     def test_nonexistent_request(self, client, seed_users):
         a_token = get_token(client, 'testadmin')
         resp = client.patch('/api/document-requests/99999/status',
                             headers=auth_header(a_token),
                             json={'status': 'approved'})
         assert resp.status_code == 404
+
+
+class TestBulkUpdateDocumentRequestStatus:
+    def test_bulk_reopen_conflict_applies_the_rest(self, client, seed_users):
+        from flask_app.counters import get_status_counts
+        s_token = get_token(client, 'teststudent')
+        a_token = get_token(client, 'testadmin')
+        ids = []
+        for _ in range(2):
+            resp = client.post('/api/document-requests', headers=auth_header(s_token), json={
+                'type': 'transcript', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+            })
+            ids.append(resp.get_json()['id'])
+            client.patch('/api/document-requests/bulk-status', headers=auth_header(a_token),
+                         json={'ids': [ids[-1]], 'status': 'completed'})
+
+        resp = client.patch('/api/document-requests/bulk-status', headers=auth_header(a_token),
+                            json={'ids': ids + [99999], 'status': 'pending_approval', 'adminComment': 'Reopened'})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['updated'] == 1
+        assert data['results'] == [
+            {'id': ids[0], 'outcome': 'updated', 'previousStatus': 'completed'},
+            {'id': ids[1], 'outcome': 'conflict', 'previousStatus': 'completed'},
+            {'id': 99999, 'outcome': 'not_found'},
+        ]
+
+        docs = {d['id']: d for d in client.get('/api/document-requests', headers=auth_header(a_token)).get_json()}
+        assert docs[ids[0]]['status'] == 'pending_approval'
+        assert docs[ids[0]]['adminComment'] == 'Reopened'
+        assert docs[ids[1]]['status'] == 'completed'
+        assert docs[ids[1]]['adminComment'] is None
+        assert get_status_counts('document_requests') == {'pending_approval': 1, 'completed': 1}
+
+
+class TestFilterDocumentRequests:
+    def _seed(self):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        rows = [
+            ('transcript', 'urgent', 'completed', datetime(2026, 1, 5)),
+            ('transcript', 'normal', 'completed', datetime(2026, 1, 10)),
+            ('degree', 'urgent', 'rejected', datetime(2026, 2, 1)),
+            ('transcript', 'urgent', 'rejected', datetime(2026, 2, 15)),
+        ]
+        db.session.add_all([
+            DocumentRequest(user_id=student_id, type=t, urgency=u, status=s, created_at=c, updated_at=c)
+            for t, u, s, c in rows
+        ])
+        db.session.commit()
+
+    def test_filters_compose(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?status=completed,rejected&type=transcript&urgency=urgent',
+                          headers=auth_header(token))
+        assert resp.status_code == 200
+        assert [d['createdAt'][:10] for d in resp.get_json()] == ['2026-02-15', '2026-01-05']
+
+    def test_date_range_and_sort(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?from=2026-01-06&to=2026-02-01&sort=createdAt',
+                          headers=auth_header(token))
+        assert [d['createdAt'][:10] for d in resp.get_json()] == ['2026-01-10', '2026-02-01']
+
+    def test_filters_with_pagination(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?type=transcript&limit=2&sort=createdAt',
+                          headers=auth_header(token))
+        first = resp.get_json()
+        assert [d['createdAt'][:10] for d in first['items']] == ['2026-01-05', '2026-01-10']
+        resp = client.get(f"/api/document-requests?type=transcript&limit=2&sort=createdAt&cursor={first['nextCursor']}",
+                          headers=auth_header(token))
+        assert [d['createdAt'][:10] for d in resp.get_json()['items']] == ['2026-02-15']
+
+    def test_student_filters_stay_scoped(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?status=completed', headers=auth_header(token))
+        assert len(resp.get_json()) == 2
+
+        other = get_token(client, 'testinstructor')
+        resp = client.get('/api/document-requests?status=completed', headers=auth_header(other))
+        assert resp.get_json() == []
+
+    def test_invalid_filter_values(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        for query in ['status=bogus', 'urgency=asap', 'from=yesterday', 'sort=type']:
+            resp = client.get(f'/api/document-requests?{query}', headers=auth_header(token))
+            assert resp.status_code == 400
+
+
+class TestDocumentRequestChangeFeed:
+    def _seed(self, count=3):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        rows = [
+            DocumentRequest(user_id=student_id, type='transcript', urgency='normal', status='completed',
+                            created_at=datetime(2026, 1, 1 + i), updated_at=datetime(2026, 1, 1 + i))
+            for i in range(count)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [r.id for r in rows]
+
+    def _feed(self, client, token, since, extra=''):
+        resp = client.get(f'/api/document-requests?since={since}{extra}', headers=auth_header(token))
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    def test_returns_rows_changed_since(self, client, seed_users, app):
+        ids = self._seed()
+        token = get_token(client, 'testadmin')
+        body = self._feed(client, token, '2026-01-02T00:00:00Z')
+        assert [d['id'] for d in body['items']] == ids[1:]
+        assert body['deleted'] == [] and body['hasMore'] is False
+
+        client.patch(f'/api/document-requests/{ids[0]}/status', headers=auth_header(token),
+                     json={'status': 'approved'})
+        body = self._feed(client, token, body['watermark'])
+        assert [(d['id'], d['status']) for d in body['items']] == [(ids[0], 'approved')]
+
+        # The change is newer than the safety margin, so the watermark stays
+        # behind it and the next call sends it again...
+        again = self._feed(client, token, body['watermark'])
+        assert [d['id'] for d in again['items']] == [ids[0]] and again['hasMore'] is False
+        # ...until the margin has passed.
+        app.config['CHANGE_FEED_SAFETY_MARGIN'] = 0
+        body = self._feed(client, token, again['watermark'])
+        empty = self._feed(client, token, body['watermark'])
+        assert empty == {'items': [], 'deleted': [], 'watermark': body['watermark'], 'hasMore': False}
+
+    def test_pages_with_watermark(self, client, seed_users):
+        ids = self._seed(5)
+        token = get_token(client, 'testadmin')
+        seen = []
+        since, has_more = '2025-01-01', True
+        while has_more:
+            body = self._feed(client, token, since, '&limit=2')
+            seen += [d['id'] for d in body['items']]
+            since, has_more = body['watermark'], body['hasMore']
+        assert seen == ids
+
+    def test_recent_changes_hold_back_paging(self, client, seed_users):
+        ids = self._seed(2)
+        token = get_token(client, 'testadmin')
+        client.patch('/api/document-requests/bulk-status', headers=auth_header(token),
+                     json={'ids': ids, 'status': 'rejected'})
+        body = self._feed(client, token, '2025-01-01', '&limit=1')
+        assert [d['id'] for d in body['items']] == ids[:1]
+        # Both changes are within the safety margin: the watermark stays
+        # before them and paging stops instead of looping over them.
+        assert body['hasMore'] is False
+        assert [d['id'] for d in self._feed(client, token, body['watermark'], '&limit=1')['items']] == ids[:1]
+
+    def test_rows_leaving_filter_are_tombstoned(self, client, seed_users):
+        ids = self._seed(2)
+        token = get_token(client, 'testadmin')
+        client.patch('/api/document-requests/bulk-status', headers=auth_header(token),
+                     json={'ids': [ids[1]], 'status': 'rejected'})
+        body = self._feed(client, token, '2026-01-01T12:00:00', '&status=completed')
+        assert body['items'] == []
+        assert body['deleted'] == [ids[1]]
+
+    def test_student_sees_only_own_changes(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'teststudent')
+        assert len(self._feed(client, token, '2025-01-01')['items']) == 3
+        instructor = get_token(client, 'testinstructor')
+        assert self._feed(client, instructor, '2025-01-01')['items'] == []
+
+    def test_invalid_since(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        resp = client.get('/api/document-requests?since=yesterday', headers=auth_header(token))
+        assert resp.status_code == 400
+        assert resp.get_json()['message'] == 'Invalid since'
+
+
+class TestDocumentRequestFields:
+    def _seed(self):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, Payment, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        rows = [
+            DocumentRequest(user_id=student_id, type='transcript', urgency='normal', status='completed',
+                            amount=500, details={'purpose': 'x' * 1000}, created_at=datetime(2026, 1, 1 + i))
+            for i in range(3)
+        ]
+        db.session.add_all(rows)
+        db.session.flush()
+        db.session.add(Payment(request_id=rows[0].id, amount=500, status='paid', method='online'))
+        db.session.commit()
+        return [r.id for r in rows]
+
+    def test_restricts_select_and_output(self, client, seed_users):
+        self._seed()
+        token = get_token(client, 'testadmin')
+        with count_queries() as statements:
+            resp = client.get('/api/document-requests?fields=id,status,createdAt', headers=auth_header(token))
+        assert resp.status_code == 200
+        assert all(set(d) == {'id', 'status', 'createdAt'} for d in resp.get_json())
+        select_list = statements[-1].split(' FROM ')[0]
+        assert 'details' not in select_list and 'payments' not in statements[-1]
+
+    def test_payment_field(self, client, seed_users):
+        ids = self._seed()
+        token = get_token(client, 'testadmin')
+        data = client.get('/api/document-requests?fields=id,payment&sort=createdAt', headers=auth_header(token)).get_json()
+        assert [set(d) for d in data] == [{'id', 'payment'}, {'id'}, {'id'}]
+        assert data[0]['payment']['requestId'] == ids[0]
+
+    def test_fields_with_pagination_and_change_feed(self, client, seed_users):
+        ids = self._seed()
+        token = get_token(client, 'testadmin')
+        page = client.get('/api/document-requests?fields=status&limit=2', headers=auth_header(token)).get_json()
+        assert page['items'] == [{'status': 'completed'}] * 2
+        rest = client.get(f"/api/document-requests?fields=status&limit=2&cursor={page['nextCursor']}",
+                          headers=auth_header(token)).get_json()
+        assert len(rest['items']) == 1 and rest['nextCursor'] is None
+
+        feed = client.get('/api/document-requests?fields=id&since=2025-01-01', headers=auth_header(token)).get_json()
+        assert feed['items'] == [{'id': i} for i in ids]
+
+    def test_invalid_fields(self, client, seed_users):
+        token = get_token(client, 'testadmin')
+        for fields in ['', 'id,passwordHash', 'user_id', ',']:
+            resp = client.get(f'/api/document-requests?fields={fields}', headers=auth_header(token))
+            assert resp.status_code == 400
+            assert resp.get_json()['message'] == 'Invalid fields'
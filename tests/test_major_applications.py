@@ -97,6 +97,20 @@ class TestUpdateMajorApplicationStatus:
         assert resp.status_code == 200
         assert resp.get_json()['status'] == 'approved'
 
+    def test_status_change_appears_in_change_feed(self, client, seed_users):
+        s_token = get_token(client, 'teststudent')
+        app_id = self._create_app(client, s_token)
+        created = client.get('/api/major-applications?since=2025-01-01', headers=auth_header(s_token)).get_json()
+        assert [a['id'] for a in created['items']] == [app_id]
+
+        a_token = get_token(client, 'testadmin')
+        client.patch(f'/api/major-applications/{app_id}/status', headers=auth_header(a_token),
+                     json={'status': 'rejected'})
+        changed = client.get(f"/api/major-applications?since={created['watermark']}",
+                             headers=auth_header(s_token)).get_json()
+        assert [(a['id'], a['status']) for a in changed['items']] == [(app_id, 'rejected')]
+        assert changed['items'][0]['updatedAt'] > created['items'][0]['updatedAt']
+
     def test_student_cannot_update_status(self, client, seed_users):
         s_token = get_token(client, 'teststudent')
         app_id = self._create_app(client, s_token)
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import inspect, text
+
+
+def _index_names(table):
+    from flask_app import db
+    return {ix['name'] for ix in inspect(db.engine).get_indexes(table)}
+
+
+class TestMigrations:
+    def test_upgrade_records_versions_and_is_idempotent(self, app):
+        from flask_app.migrations import MIGRATIONS, applied_versions, upgrade
+        assert upgrade() == [version for version, _, _ in MIGRATIONS]
+        assert applied_versions() == {version for version, _, _ in MIGRATIONS}
+        assert upgrade() == []
+
+    def test_upgrade_restores_missing_schema(self, app):
+        from flask_app import db
+        from flask_app.migrations import upgrade
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP INDEX ix_payments_request_id'))
+            conn.execute(text('DROP INDEX uq_document_requests_one_pending'))
+            conn.execute(text('DROP TABLE status_counters'))
+        assert 'ix_payments_request_id' not in _index_names('payments')
+
+        upgrade()
+        assert 'ix_payments_request_id' in _index_names('payments')
+        assert 'uq_document_requests_one_pending' in _index_names('document_requests')
+        assert 'status_counters' in inspect(db.engine).get_table_names()
+
+    def test_upgrade_backfills_status_counters(self, app, seed_users):
+        from flask_app import db
+        from flask_app.counters import get_status_counts
+        from flask_app.migrations import upgrade
+        from flask_app.models import DocumentRequest, User
+        with app.app_context():
+            student_id = User.query.filter_by(username='teststudent').first().id
+            for status in ('pending', 'completed', 'completed'):
+                db.session.add(DocumentRequest(user_id=student_id, type='transcript', status=status))
+            db.session.commit()
+            with db.engine.begin() as conn:
+                conn.execute(text('DROP TABLE status_counters'))
+
+            upgrade()
+            assert get_status_counts('document_requests', student_id) == {'pending': 1, 'completed': 2}
+            assert get_status_counts('document_requests') == {'pending': 1, 'completed': 2}
+
+    def test_upgrade_refuses_duplicate_pending_rows(self, app, seed_users):
+        from flask_app import db
+        from flask_app.migrations import MigrationError, applied_versions, upgrade
+        from flask_app.models import DocumentRequest, User
+        with app.app_context():
+            student_id = User.query.filter_by(username='teststudent').first().id
+            with db.engine.begin() as conn:
+                conn.execute(text('DROP INDEX uq_document_requests_one_pending'))
+            pending = [DocumentRequest(user_id=student_id, type='transcript', status=status)
+                       for status in ('submitted', 'pending_approval', 'completed')]
+            db.session.add_all(pending)
+            db.session.commit()
+
+            with pytest.raises(MigrationError) as excinfo:
+                upgrade()
+            assert str(excinfo.value).endswith(f'document_requests ids {pending[0].id}, {pending[1].id}')
+            assert '0003' not in applied_versions()
+            assert 'uq_document_requests_one_pending' not in _index_names('document_requests')
+
+            result = app.test_cli_runner().invoke(args=['migrate', 'upgrade'])
+            assert result.exit_code != 0
+            assert 'duplicate pending rows' in result.output
+
+            pending[1].status = 'cancelled'
+            db.session.commit()
+            assert '0003' in upgrade()
+            assert 'uq_document_requests_one_pending' in _index_names('document_requests')
+
+    def test_cli_status_and_upgrade(self, app):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['migrate', 'status'])
+        assert '[ ] 0001' in result.output
+
+        result = runner.invoke(args=['migrate', 'upgrade'])
+        assert result.exit_code == 0
+        assert 'Applied migrations' in result.output
+
+        result = runner.invoke(args=['migrate', 'status'])
+        assert '[x] 0001' in result.output
+
+
+class TestIndexCheck:
+    def test_hot_queries_use_indexes(self, app):
+        from flask_app.index_check import check_indexes
+        from flask_app.migrations import upgrade
+        upgrade()
+        results = check_indexes()
+        assert results
+        unindexed = [(name, plan) for name, uses_index, plan in results if not uses_index]
+        assert unindexed == []
+
+    def test_detects_missing_index(self, app):
+        from flask_app import db
+        from flask_app.index_check import check_indexes
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP INDEX ix_notifications_user_id_created_at_id'))
+        results = {name: uses_index for name, uses_index, _ in check_indexes()}
+        assert results['list notifications'] is False
+
+    def test_cli_check_indexes(self, app):
+        result = app.test_cli_runner().invoke(args=['migrate', 'check-indexes'])
+        assert result.exit_code == 0
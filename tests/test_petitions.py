@@ -136,3 +136,124 @@ class TestUpdatePetitionStatus:
                             headers=auth_header(a_token),
                             json={'status': 'approved'})
         assert resp.status_code == 404
+
+
+class TestBulkUpdatePetitionStatus:
+    def _create_petitions(self, client, token, count):
+        ids = []
+        for i in range(count):
+            resp = client.post('/api/petitions', headers=auth_header(token), json={
+                'studentId': 'STU-001', 'courseCode': f'CS{100 + i}', 'currentGrade': 'B',
+                'newGrade': 'A', 'justification': 'Recalculation of final exam score',
+            })
+            ids.append(resp.get_json()['id'])
+        return ids
+
+    def test_bulk_approve_single_update(self, client, seed_users):
+        from tests.conftest import count_queries
+        i_token = get_token(client, 'testinstructor')
+        ids = self._create_petitions(client, i_token, 5)
+
+        a_token = get_token(client, 'testadmin')
+        with count_queries() as statements:
+            resp = client.patch('/api/petitions/bulk-status', headers=auth_header(a_token), json={
+                'ids': ids + [99999], 'status': 'approved', 'adminComment': 'Batch approved',
+            })
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['updated'] == 5
+        assert [r['outcome'] for r in data['results']] == ['updated'] * 5 + ['not_found']
+        assert sum(1 for s in statements if s.lstrip().upper().startswith('UPDATE GRADE_CHANGE_PETITIONS')) == 1
+
+        petitions = client.get('/api/petitions', headers=auth_header(a_token)).get_json()
+        assert all(p['status'] == 'approved' and p['adminComment'] == 'Batch approved' for p in petitions)
+
+        from flask_app.counters import get_status_counts
+        assert get_status_counts('petitions') == {'approved': 5}
+
+    def test_unchanged_rows_reported(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        ids = self._create_petitions(client, i_token, 2)
+        a_token = get_token(client, 'testadmin')
+        rejected = client.patch(f'/api/petitions/{ids[0]}/status', headers=auth_header(a_token),
+                                json={'status': 'rejected'}).get_json()
+
+        resp = client.patch('/api/petitions/bulk-status', headers=auth_header(a_token), json={
+            'ids': ids, 'status': 'rejected', 'adminComment': 'Batch rejected',
+        })
+        results = resp.get_json()['results']
+        assert [r['outcome'] for r in results] == ['unchanged', 'updated']
+        assert results[0]['commentApplied'] is True
+
+        petitions = {p['id']: p for p in client.get('/api/petitions', headers=auth_header(a_token)).get_json()}
+        assert petitions[ids[0]]['status'] == 'rejected'
+        assert petitions[ids[0]]['updatedAt'] != rejected['updatedAt']
+        assert petitions[ids[0]]['adminComment'] == 'Batch rejected'
+        assert petitions[ids[1]]['adminComment'] == 'Batch rejected'
+
+    def test_unchanged_rows_untouched_without_comment(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        ids = self._create_petitions(client, i_token, 1)
+        a_token = get_token(client, 'testadmin')
+        rejected = client.patch(f'/api/petitions/{ids[0]}/status', headers=auth_header(a_token),
+                                json={'status': 'rejected', 'adminComment': 'Late'}).get_json()
+
+        resp = client.patch('/api/petitions/bulk-status', headers=auth_header(a_token), json={
+            'ids': ids, 'status': 'rejected',
+        })
+        assert resp.get_json()['results'] == [{'id': ids[0], 'outcome': 'unchanged', 'commentApplied': False}]
+        petition = client.get('/api/petitions', headers=auth_header(a_token)).get_json()[0]
+        assert petition['updatedAt'] == rejected['updatedAt']
+        assert petition['adminComment'] == 'Late'
+
+    def test_invalid_payloads(self, client, seed_users):
+        a_token = get_token(client, 'testadmin')
+        for body in [{'ids': [], 'status': 'approved'},
+                     {'ids': ['1'], 'status': 'approved'},
+                     {'ids': [1], 'status': 'cancelled'}]:
+            resp = client.patch('/api/petitions/bulk-status', headers=auth_header(a_token), json=body)
+            assert resp.status_code == 400
+
+    def test_instructor_forbidden(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        resp = client.patch('/api/petitions/bulk-status', headers=auth_header(i_token), json={
+            'ids': [1], 'status': 'approved',
+        })
+        assert resp.status_code == 403
+
+
+class TestFilterPetitions:
+    def test_filter_by_course_code_and_status(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        ids = {}
+        for course in ['CS100', 'CS200', 'MATH101']:
+            resp = client.post('/api/petitions', headers=auth_header(i_token), json={
+                'studentId': 'STU-001', 'courseCode': course, 'currentGrade': 'B',
+                'newGrade': 'A', 'justification': 'Recalculation of final exam score',
+            })
+            ids[course] = resp.get_json()['id']
+        a_token = get_token(client, 'testadmin')
+        client.patch(f"/api/petitions/{ids['CS200']}/status", headers=auth_header(a_token),
+                     json={'status': 'approved'})
+
+        resp = client.get('/api/petitions?courseCode=CS100,CS200', headers=auth_header(a_token))
+        assert {p['courseCode'] for p in resp.get_json()} == {'CS100', 'CS200'}
+
+        resp = client.get('/api/petitions?status=submitted', headers=auth_header(i_token))
+        assert {p['courseCode'] for p in resp.get_json()} == {'CS100', 'MATH101'}
+
+    def test_sparse_fields_compose_with_filters(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        for course in ['CS100', 'CS200']:
+            client.post('/api/petitions', headers=auth_header(i_token), json={
+                'studentId': 'STU-001', 'courseCode': course, 'currentGrade': 'B',
+                'newGrade': 'A', 'justification': 'Recalculation of final exam score ' * 50,
+            })
+        resp = client.get('/api/petitions?courseCode=CS200&fields=courseCode,status,updatedAt',
+                          headers=auth_header(i_token))
+        data = resp.get_json()
+        assert [(p['courseCode'], p['status']) for p in data] == [('CS200', 'submitted')]
+        assert set(data[0]) == {'courseCode', 'status', 'updatedAt'}
+
+        resp = client.get('/api/petitions?fields=justification,grade', headers=auth_header(i_token))
+        assert resp.status_code == 400
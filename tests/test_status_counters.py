@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime
+from tests.conftest import get_token, auth_header
+
+
+def _counts(module, owner_id=''):
+    from flask_app.counters import get_status_counts
+    return get_status_counts(module, owner_id)
+
+
+class TestStatusCounters:
+    def test_document_request_lifecycle(self, client, seed_users):
+        s_token = get_token(client, 'teststudent')
+        req_id = client.post('/api/document-requests', headers=auth_header(s_token), json={
+            'type': 'transcript', 'urgency': 'normal', 'copies': 1, 'amount': 500,
+        }).get_json()['id']
+        assert _counts('document_requests') == {'payment_pending': 1}
+
+        client.post('/api/payments', headers=auth_header(s_token), json={
+            'requestId': req_id, 'amount': 500, 'method': 'online',
+        })
+        assert _counts('document_requests') == {'pending_approval': 1}
+
+        a_token = get_token(client, 'testadmin')
+        client.patch(f'/api/document-requests/{req_id}/status', headers=auth_header(a_token),
+                     json={'status': 'approved'})
+        assert _counts('document_requests') == {'approved': 1}
+
+        from flask_app.models import User
+        student_id = User.query.filter_by(username='teststudent').first().id
+        assert _counts('document_requests', student_id) == {'approved': 1}
+
+    def test_petition_and_major_status_changes(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        pet_id = client.post('/api/petitions', headers=auth_header(i_token), json={
+            'studentId': 'STU-001', 'courseCode': 'CS100', 'currentGrade': 'B',
+            'newGrade': 'A', 'justification': 'Grading error',
+        }).get_json()['id']
+        s_token = get_token(client, 'teststudent')
+        app_id = client.post('/api/major-applications', headers=auth_header(s_token), json={
+            'requestedMajor': 'Computer Science', 'school': 'SBASSE',
+        }).get_json()['id']
+
+        a_token = get_token(client, 'testadmin')
+        client.patch(f'/api/petitions/{pet_id}/status', headers=auth_header(a_token),
+                     json={'status': 'rejected'})
+        client.patch(f'/api/major-applications/{app_id}/status', headers=auth_header(a_token),
+                     json={'status': 'pending_approval'})
+
+        assert _counts('petitions') == {'rejected': 1}
+        assert _counts('major_applications') == {'pending_approval': 1}
+
+    def test_same_status_patch_is_noop(self, client, seed_users):
+        i_token = get_token(client, 'testinstructor')
+        pet_id = client.post('/api/petitions', headers=auth_header(i_token), json={
+            'studentId': 'STU-001', 'courseCode': 'CS100', 'currentGrade': 'B',
+            'newGrade': 'A', 'justification': 'Grading error',
+        }).get_json()['id']
+        a_token = get_token(client, 'testadmin')
+        for _ in range(2):
+            client.patch(f'/api/petitions/{pet_id}/status', headers=auth_header(a_token),
+                         json={'status': 'approved'})
+        assert _counts('petitions') == {'approved': 1}
+
+
+class TestRebuildStatusCounters:
+    def test_rebuild_repairs_drift(self, app, seed_users):
+        from flask_app import db
+        from flask_app.models import DocumentRequest, StatusCounter, User
+
+        student_id = User.query.filter_by(username='teststudent').first().id
+        now = datetime.utcnow()
+        db.session.add_all([
+            DocumentRequest(user_id=student_id, type='transcript', status=status,
+                            created_at=now, updated_at=now)
+            for status in ['approved', 'approved', 'rejected']
+        ])
+        db.session.add(StatusCounter(module='document_requests', owner_id='', status='submitted', count=7))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['rebuild-status-counters'])
+        assert result.exit_code == 0
+        assert 'Rebuilt' in result.output
+
+        assert _counts('document_requests') == {'approved': 2, 'rejected': 1}
+        assert _counts('document_requests', student_id) == {'approved': 2, 'rejected': 1}